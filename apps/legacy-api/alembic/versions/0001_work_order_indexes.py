@@ -0,0 +1,56 @@
+"""Normalize work order status/priority case and add composite indexes
+
+Tables themselves are still created by Base.metadata.create_all at startup;
+this revision brings existing databases in line with the model indexes.
+
+Revision ID: 0001_work_order_indexes
+Revises:
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_work_order_indexes"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_work_orders_tenant_status_created", ["tenant_id", "status", "created_at"]),
+    ("ix_work_orders_tenant_asset_status", ["tenant_id", "asset_id", "status"]),
+    ("ix_work_orders_tenant_created", ["tenant_id", "created_at"]),
+]
+
+
+def _existing_indexes() -> set:
+    inspector = sa.inspect(op.get_bind())
+    return {ix["name"] for ix in inspector.get_indexes("work_orders")}
+
+
+def upgrade() -> None:
+    # Backfill: filters now compare stored values directly instead of lower(column)
+    op.execute(
+        "UPDATE work_orders SET status = lower(status), priority = lower(priority) "
+        "WHERE status <> lower(status) OR priority <> lower(priority)"
+    )
+
+    existing = _existing_indexes()
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+    for name, columns in INDEXES:
+        if name in existing:
+            continue
+        if is_postgres:
+            # Avoid locking writes on large tables
+            with op.get_context().autocommit_block():
+                op.create_index(name, "work_orders", columns, postgresql_concurrently=True)
+        else:
+            op.create_index(name, "work_orders", columns)
+
+
+def downgrade() -> None:
+    existing = _existing_indexes()
+    for name, _ in reversed(INDEXES):
+        if name in existing:
+            op.drop_index(name, table_name="work_orders")
@@ -0,0 +1,33 @@
+"""Full-text search index (tsvector/GIN on Postgres, FTS5 on SQLite)
+
+The DDL is shared with app.services.search.ensure_schema, which also runs at
+startup. Populate existing rows afterwards with scripts/reindex_search.py.
+
+Revision ID: 0002_search_documents
+Revises: 0001_work_order_indexes
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+from app.services import search
+
+
+revision = "0002_search_documents"
+down_revision = "0001_work_order_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    backend = search.get_backend(op.get_bind().dialect.name)
+    for statement in backend.ddl():
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        for trigger in ("search_documents_ai", "search_documents_ad", "search_documents_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS search_fts")
+    op.execute("DROP TABLE IF EXISTS search_documents")
@@ -0,0 +1,54 @@
+"""Delta sync: work order (tenant_id, updated_at, id) index and tombstones
+
+Backfills updated_at for rows written before it was maintained, so every
+work order has a position in the /work-orders/changes feed.
+
+Revision ID: 0003_work_order_sync
+Revises: 0002_search_documents
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_work_order_sync"
+down_revision = "0002_search_documents"
+branch_labels = None
+depends_on = None
+
+INDEX = ("ix_work_orders_tenant_updated", ["tenant_id", "updated_at", "id"])
+
+
+def upgrade() -> None:
+    op.execute("UPDATE work_orders SET updated_at = created_at WHERE updated_at IS NULL")
+
+    inspector = sa.inspect(op.get_bind())
+    if "work_order_tombstones" not in inspector.get_table_names():
+        op.create_table(
+            "work_order_tombstones",
+            sa.Column("work_order_id", sa.Uuid(), primary_key=True),
+            sa.Column("tenant_id", sa.Uuid(), sa.ForeignKey("tenants.id"), nullable=False),
+            sa.Column("deleted_at", sa.DateTime(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_work_order_tombstones_tenant_deleted", "work_order_tombstones", ["tenant_id", "deleted_at"])
+
+    name, columns = INDEX
+    if name in {ix["name"] for ix in inspector.get_indexes("work_orders")}:
+        return
+    if op.get_bind().dialect.name == "postgresql":
+        # Avoid locking writes on large tables
+        with op.get_context().autocommit_block():
+            op.create_index(name, "work_orders", columns, postgresql_concurrently=True)
+    else:
+        op.create_index(name, "work_orders", columns)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if INDEX[0] in {ix["name"] for ix in inspector.get_indexes("work_orders")}:
+        op.drop_index(INDEX[0], table_name="work_orders")
+    if "work_order_tombstones" in inspector.get_table_names():
+        op.drop_table("work_order_tombstones")
@@ -0,0 +1,41 @@
+"""Transactional outbox for work order side effects
+
+Revision ID: 0004_outbox_events
+Revises: 0003_work_order_sync
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_outbox_events"
+down_revision = "0003_work_order_sync"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "outbox_events" in inspector.get_table_names():
+        return
+    op.create_table(
+        "outbox_events",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("tenant_id", sa.Uuid(), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("event_type", sa.String(), nullable=False),
+        sa.Column("aggregate_id", sa.Uuid(), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("available_at", sa.DateTime(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_outbox_events_available", "outbox_events", ["available_at"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "outbox_events" in inspector.get_table_names():
+        op.drop_table("outbox_events")
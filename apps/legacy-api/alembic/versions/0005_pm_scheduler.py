@@ -0,0 +1,56 @@
+"""PM scheduler: due-schedule index and one work order per PM occurrence
+
+Revision ID: 0005_pm_scheduler
+Revises: 0004_outbox_events
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_pm_scheduler"
+down_revision = "0004_outbox_events"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("pm_schedules", "ix_pm_schedules_tenant_active_due", ["tenant_id", "is_active", "next_due"], False),
+    ("work_orders", "uq_work_orders_pm_occurrence", ["pm_schedule_id", "pm_due_at"], True),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    work_order_columns = {c["name"] for c in inspector.get_columns("work_orders")}
+    with op.batch_alter_table("work_orders") as batch:
+        if "pm_schedule_id" not in work_order_columns:
+            batch.add_column(sa.Column("pm_schedule_id", sa.Uuid(), nullable=True))
+            batch.create_foreign_key(
+                "fk_work_orders_pm_schedule_id", "pm_schedules", ["pm_schedule_id"], ["id"], ondelete="SET NULL"
+            )
+        if "pm_due_at" not in work_order_columns:
+            batch.add_column(sa.Column("pm_due_at", sa.DateTime(), nullable=True))
+    if "generated_through" not in {c["name"] for c in inspector.get_columns("pm_schedules")}:
+        op.add_column("pm_schedules", sa.Column("generated_through", sa.DateTime(), nullable=True))
+
+    for table, name, columns, unique in INDEXES:
+        if name in {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes(table)}:
+            continue
+        if op.get_bind().dialect.name == "postgresql":
+            # Avoid locking writes on large tables
+            with op.get_context().autocommit_block():
+                op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True)
+        else:
+            op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade() -> None:
+    for table, name, _, _ in INDEXES:
+        if name in {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes(table)}:
+            op.drop_index(name, table_name=table)
+    op.drop_column("pm_schedules", "generated_through")
+    with op.batch_alter_table("work_orders") as batch:
+        batch.drop_constraint("fk_work_orders_pm_schedule_id", type_="foreignkey")
+        batch.drop_column("pm_due_at")
+        batch.drop_column("pm_schedule_id")
@@ -0,0 +1,31 @@
+"""PM schedules: recurrence anchor for calendar-correct due dates
+
+Revision ID: 0006_pm_recurrence_anchor
+Revises: 0005_pm_scheduler
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006_pm_recurrence_anchor"
+down_revision = "0005_pm_scheduler"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "recurrence_anchor" not in {c["name"] for c in inspector.get_columns("pm_schedules")}:
+        op.add_column("pm_schedules", sa.Column("recurrence_anchor", sa.DateTime(), nullable=True))
+    # Pin existing series to their current due date, so sign-off keeps its
+    # day of month from here on
+    op.execute(
+        "UPDATE pm_schedules SET recurrence_anchor = next_due"
+        " WHERE recurrence_anchor IS NULL AND next_due IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("pm_schedules", "recurrence_anchor")
@@ -0,0 +1,52 @@
+"""PM workload forecast: estimated hours and the precomputed occurrence index
+
+Revision ID: 0007_pm_occurrences
+Revises: 0006_pm_recurrence_anchor
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007_pm_occurrences"
+down_revision = "0006_pm_recurrence_anchor"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # occurrences_through starts NULL, so the PM scheduler's roll-forward
+    # fills pm_occurrences for existing schedules on its first run
+    inspector = sa.inspect(op.get_bind())
+    columns = {c["name"] for c in inspector.get_columns("pm_schedules")}
+    if "estimated_hours" not in columns:
+        op.add_column("pm_schedules", sa.Column("estimated_hours", sa.Numeric(8, 2), nullable=True))
+    if "occurrences_through" not in columns:
+        op.add_column("pm_schedules", sa.Column("occurrences_through", sa.DateTime(), nullable=True))
+    if "ix_pm_schedules_occurrences_through" not in {ix["name"] for ix in inspector.get_indexes("pm_schedules")}:
+        op.create_index("ix_pm_schedules_occurrences_through", "pm_schedules", ["occurrences_through"])
+
+    if "pm_occurrences" in inspector.get_table_names():
+        return
+    op.create_table(
+        "pm_occurrences",
+        sa.Column("pm_schedule_id", sa.Uuid(), sa.ForeignKey("pm_schedules.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("due_at", sa.DateTime(), primary_key=True),
+        sa.Column("tenant_id", sa.Uuid(), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("asset_id", sa.Uuid(), nullable=True),
+        sa.Column("assigned_to_user_id", sa.Uuid(), nullable=True),
+        sa.Column("estimated_hours", sa.Numeric(8, 2), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_pm_occurrences_tenant_due", "pm_occurrences", ["tenant_id", "due_at"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "pm_occurrences" in inspector.get_table_names():
+        op.drop_table("pm_occurrences")
+    op.drop_index("ix_pm_schedules_occurrences_through", table_name="pm_schedules")
+    op.drop_column("pm_schedules", "occurrences_through")
+    op.drop_column("pm_schedules", "estimated_hours")
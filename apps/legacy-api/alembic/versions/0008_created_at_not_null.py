@@ -0,0 +1,40 @@
+"""Backfill created_at on paginated tables and make it NOT NULL
+
+Cursor pagination orders by (created_at, id); a NULL created_at cannot be
+encoded in a cursor and falls outside the keyset predicate.
+
+Revision ID: 0008_created_at_not_null
+Revises: 0007_pm_occurrences
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+revision = "0008_created_at_not_null"
+down_revision = "0007_pm_occurrences"
+branch_labels = None
+depends_on = None
+
+# Tables listed through app.api.pagination
+TABLES = ["work_orders", "users", "assets", "inventory_items", "pm_schedules"]
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        # Legacy rows: last update is the closest known time, else sort them last
+        op.execute(
+            f"UPDATE {table} SET created_at = coalesce(updated_at, '1970-01-01 00:00:00')"
+            " WHERE created_at IS NULL"
+        )
+    # SQLite would need a table rebuild; its rows are covered by the backfill
+    # (also run at startup) and the column default
+    if op.get_bind().dialect.name == "postgresql":
+        for table in TABLES:
+            op.alter_column(table, "created_at", nullable=False)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for table in TABLES:
+            op.alter_column(table, "created_at", nullable=True)
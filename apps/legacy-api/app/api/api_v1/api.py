@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.api_v1.endpoints import auth, tenants, work_orders, users, utils, pages, assets, inventory, pm_schedules
+from app.api.api_v1.endpoints import auth, tenants, work_orders, users, utils, pages, assets, inventory, pm_schedules, search, events
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -11,6 +11,8 @@ api_router.include_router(inventory.router, prefix="/inventory", tags=["inventor
 api_router.include_router(pm_schedules.router, prefix="/pm-schedules", tags=["pm-schedules"])
 api_router.include_router(utils.router, prefix="/utils", tags=["utils"])
 api_router.include_router(pages.router, prefix="/pages", tags=["pages"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
 from app.api.api_v1.endpoints import debug, verify_auth
 api_router.include_router(debug.router, prefix="/debug", tags=["debug"])
 api_router.include_router(verify_auth.router, prefix="/auth", tags=["auth-verify"])
@@ -1,8 +1,10 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api import deps
+from app.api import conditional, deps, pagination, streaming
+from app.core.query_metrics import AUTH_QUERIES, query_budget
 from app.models.core import Asset, AssetStatus
+from app.services import collection_versions
 from pydantic import BaseModel, UUID4
 
 router = APIRouter()
@@ -34,19 +36,33 @@ class AssetOut(AssetBase):
         from_attributes = True
 
 @router.get("/", response_model=List[AssetOut])
+# ETag version, page
+@query_budget(AUTH_QUERIES + 2)
 async def read_assets(
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
-    current_user = Depends(deps.get_current_active_user),
+    current_user = Depends(deps.get_current_active_principal),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    stream: Optional[str] = Query(None, description="ndjson or json: stream every matching row instead of one page"),
+    cache_headers: dict = Depends(conditional.etag(collection_versions.ASSETS)),
 ):
     """
     Retrieve assets for the current tenant.
     """
     from sqlalchemy.future import select
-    query = select(Asset).filter(Asset.tenant_id == current_user.tenant_id).offset(skip).limit(limit)
+    query = select(Asset).filter(Asset.tenant_id == current_user.tenant_id)
+    if stream:
+        streaming.check_format(stream)
+        out = streaming.streaming_response(streaming.stream_query(query, Asset, cursor), streaming.model_encoder(AssetOut), stream)
+        out.headers.update(cache_headers)
+        return out
+    query = pagination.paginate(query, Asset, skip, limit, cursor)
     result = await db.execute(query)
-    return result.scalars().all()
+    assets = result.scalars().all()
+    pagination.set_next_cursor(response, assets, limit, cursor)
+    return assets
 
 @router.post("/", response_model=AssetOut)
 async def create_asset(
@@ -67,10 +83,11 @@ async def create_asset(
     return asset
 
 @router.get("/{id}", response_model=AssetOut)
+@query_budget(AUTH_QUERIES + 1)
 async def read_asset(
     id: UUID4,
     db: AsyncSession = Depends(deps.get_db),
-    current_user = Depends(deps.get_current_active_user),
+    current_user = Depends(deps.get_current_active_principal),
 ):
     """
     Get asset by ID.
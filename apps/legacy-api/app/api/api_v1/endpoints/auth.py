@@ -1,19 +1,54 @@
 from datetime import timedelta
-from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+import math
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app import models, schemas
 from app.api import deps
-from app.core import security
+from app.core import rate_limit, security
 from app.core.config import settings
 
 router = APIRouter()
 
+def _login_keys(request: Request, current_tenant: Optional[models.Tenant], email: str):
+    tenant_key = current_tenant.slug if current_tenant else "-"
+    failure_key = f"login:fail:{tenant_key}:{email.strip().lower()}"
+    # Without trusted proxies the peer may be the load balancer, shared by everyone
+    if not settings.FORWARDED_ALLOW_IPS:
+        return None, failure_key
+    client_ip = request.client.host if request.client else "unknown"
+    return f"login:ip:{client_ip}", failure_key
+
+def _too_many_attempts(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts, try again later",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+async def _enforce_login_limits(ip_key: Optional[str], failure_key: str) -> None:
+    """
+    Runs before any user lookup or hashing so rejected bursts cost no DB or CPU.
+    """
+    store = rate_limit.get_store()
+    if ip_key is not None:
+        allowed, retry_after = await store.take(ip_key, settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE / 60)
+        if not allowed:
+            raise _too_many_attempts(retry_after)
+    # Only failures drain this bucket; here we just check it has room
+    allowed, retry_after = await store.take(failure_key, settings.LOGIN_FAILURE_BURST, settings.LOGIN_FAILURE_PER_MINUTE / 60, cost=0)
+    if not allowed:
+        raise _too_many_attempts(retry_after)
+
+async def _record_login_failure(failure_key: str) -> None:
+    await rate_limit.get_store().take(failure_key, settings.LOGIN_FAILURE_BURST, settings.LOGIN_FAILURE_PER_MINUTE / 60)
+
 @router.post("/login", response_model=schemas.Token)
 async def login_access_token(
+    request: Request,
     response: Response,
     db: AsyncSession = Depends(deps.get_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
@@ -23,6 +58,10 @@ async def login_access_token(
     OAuth2 compatible token login. 
     REQUIRES X-Tenant-Slug header to identify which tenant the user belongs to.
     """
+    ip_key, failure_key = _login_keys(request, current_tenant, form_data.username)
+    if settings.RATE_LIMIT_ENABLED:
+        await _enforce_login_limits(ip_key, failure_key)
+
     if not current_tenant:
         # Fallback: Allow login without tenant header ONLY if email is globally unique?
         # No, strict multi-tenancy rules: Always require tenant context.
@@ -39,18 +78,38 @@ async def login_access_token(
     result = await db.execute(stmt)
     user = result.scalars().first()
 
-    if not user or not security.verify_password(form_data.password, user.password_hash):
+    if not user:
+        if settings.RATE_LIMIT_ENABLED:
+            await _record_login_failure(failure_key)
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+
+    valid, new_hash = await security.verify_and_update_password(form_data.password, user.password_hash)
+    if not valid:
+        if settings.RATE_LIMIT_ENABLED:
+            await _record_login_failure(failure_key)
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+
+    if settings.RATE_LIMIT_ENABLED:
+        await rate_limit.get_store().reset(failure_key)
+
+    if new_hash:
+        # Stored hash predates the current hashing profile; upgrade it in place
+        user.password_hash = new_hash
+        await db.commit()
             
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     
     access_token_expires = timedelta(minutes=60) # extended for dev
     access_token = security.create_access_token(
-        subject=user.id, role=user.role, expires_delta=access_token_expires
+        subject=user.id,
+        role=user.role,
+        expires_delta=access_token_expires,
+        tenant_id=user.tenant_id,
+        is_active=user.is_active,
     )
     
     # Set HTTP-Only Cookie for Next.js App
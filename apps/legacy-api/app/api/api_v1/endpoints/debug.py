@@ -3,7 +3,12 @@ from fastapi import APIRouter, Depends, Header, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
 from app import models, schemas
-from app.db.session import get_db
+from app.db.session import get_db, pool_status
+from app.core import events
+from app.core import revocations
+from app.core.cache import tenant_cache
+from app.core.query_metrics import route_metrics
+from app.services import outbox
 
 router = APIRouter()
 
@@ -77,3 +82,42 @@ async def health_check(
         report["status"] = "degraded"
 
     return report
+
+@router.get("/cache-stats", response_model=Any)
+async def cache_stats():
+    """
+    Hit/miss counters for the in-process caches of this worker.
+    """
+    stats = {"tenant": tenant_cache.stats()}
+    store = revocations.get_store()
+    if isinstance(store, revocations.MemoryRevocationStore):
+        stats["principal_revocations"] = store.cache.stats()
+    return stats
+
+@router.get("/pool-stats", response_model=Any)
+async def pool_stats():
+    """
+    Connection pool occupancy and checkout wait times for this worker.
+    """
+    return pool_status()
+
+@router.get("/query-stats", response_model=Any)
+async def query_stats():
+    """
+    Per-route histograms of SQL statement counts, SQL time and request latency.
+    """
+    return route_metrics.snapshot()
+
+@router.get("/event-stats", response_model=Any)
+async def event_stats():
+    """
+    Open event stream subscribers on this worker.
+    """
+    return events.get_broker().stats()
+
+@router.get("/outbox-stats", response_model=Any)
+async def outbox_stats(db: AsyncSession = Depends(get_db)):
+    """
+    Pending and parked outbox events, and how long the oldest has waited.
+    """
+    return await outbox.stats(db)
@@ -0,0 +1,54 @@
+from typing import Any, AsyncIterator
+import uuid
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+from app.api import deps
+from app.core import events
+from app.core.config import settings
+
+router = APIRouter()
+
+# Reconnect delay hint for EventSource, in milliseconds
+RETRY_MS = 3000
+
+
+async def _event_stream(tenant_id: uuid.UUID) -> AsyncIterator[bytes]:
+    async with events.get_broker().subscribe(tenant_id) as subscription:
+        yield f"retry: {RETRY_MS}\n: connected\n\n".encode()
+        while True:
+            message = await subscription.get(settings.EVENTS_KEEPALIVE_SECONDS)
+            if subscription.dropped:
+                yield events.frame("resync", b"{}")
+                return
+            if subscription.closed:
+                return
+            yield message if message is not None else b": keepalive\n\n"
+
+
+@router.get("/stream")
+async def stream_events(
+    db: AsyncSession = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_active_principal),
+    current_tenant: models.Tenant = Depends(deps.get_current_tenant),
+) -> Any:
+    """
+    Server-sent events for the current tenant. work_order.created,
+    work_order.updated, work_order.session_joined and work_order.session_left
+    carry the work order as GET /work-orders/{id} returns it;
+    work_order.deleted carries its id and work_order.imported the number created.
+
+    Delivery is best effort. On `resync`, and after any reconnect, fetch
+    /work-orders/changes to catch up.
+    """
+    if not current_tenant:
+        raise HTTPException(status_code=400, detail="Tenant context required")
+    tenant_id = current_tenant.id
+    # The stream can stay open for hours; don't hold a pooled connection for it
+    await db.close()
+    return StreamingResponse(
+        _event_stream(tenant_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
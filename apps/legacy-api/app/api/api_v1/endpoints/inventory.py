@@ -1,7 +1,8 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from app.api import deps
+from app.api import deps, pagination
+from app.core.query_metrics import AUTH_QUERIES, query_budget
 from app.models.core import InventoryItem
 from pydantic import BaseModel, UUID4
 from datetime import datetime
@@ -35,19 +36,25 @@ class InventoryItemOut(InventoryItemBase):
         orm_mode = True
 
 @router.get("/", response_model=List[InventoryItemOut])
+@query_budget(AUTH_QUERIES + 1)
 async def read_inventory(
+    response: Response,
     db: Session = Depends(deps.get_db),
-    current_user = Depends(deps.get_current_active_user),
+    current_user = Depends(deps.get_current_active_principal),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ):
     """
     Retrieve inventory items for the current tenant.
     """
     from sqlalchemy.future import select
-    query = select(InventoryItem).filter(InventoryItem.tenant_id == current_user.tenant_id).offset(skip).limit(limit)
+    query = select(InventoryItem).filter(InventoryItem.tenant_id == current_user.tenant_id)
+    query = pagination.paginate(query, InventoryItem, skip, limit, cursor)
     result = await db.execute(query)
-    return result.scalars().all()
+    items = result.scalars().all()
+    pagination.set_next_cursor(response, items, limit, cursor)
+    return items
 
 @router.post("/", response_model=InventoryItemOut)
 async def create_inventory_item(
@@ -71,7 +78,7 @@ async def create_inventory_item(
 async def read_inventory_item(
     id: UUID4,
     db: Session = Depends(deps.get_db),
-    current_user = Depends(deps.get_current_active_user),
+    current_user = Depends(deps.get_current_active_principal),
 ):
     """
     Get inventory item by ID.
@@ -3,7 +3,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app import models, schemas
-from app.api import deps
+from app.api import conditional, deps
+from app.services import collection_versions
 
 router = APIRouter()
 
@@ -12,6 +13,7 @@ async def read_page(
     key: str,
     db: AsyncSession = Depends(deps.get_db),
     current_tenant: models.Tenant = Depends(deps.get_current_tenant),
+    cache_headers: dict = Depends(conditional.etag(collection_versions.PAGES)),
 ) -> Any:
     # 1. Try to find tenant-specific page
     result = await db.execute(
@@ -1,10 +1,14 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import Date, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api import deps
+from app import models
+from app.api import deps, pagination
+from app.core.query_metrics import AUTH_QUERIES, query_budget
 from app.models.core import PMSchedule, Asset, PMLog
+from app.services import pm_occurrences, recurrence, work_order_events
 from pydantic import BaseModel, UUID4
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 
@@ -21,6 +25,7 @@ class PMScheduleBase(BaseModel):
     asset_id: Optional[UUID4] = None
     next_due: Optional[datetime] = None
     assigned_to_user_id: Optional[UUID4] = None
+    estimated_hours: Optional[float] = None
     is_active: bool = True
 
 class PMScheduleCreate(PMScheduleBase):
@@ -44,22 +49,66 @@ class PMScheduleOut(PMScheduleBase):
     class Config:
         from_attributes = True
 
+class PMForecastMonth(BaseModel):
+    month: str # YYYY-MM
+    occurrences: int
+
+class PMForecastOut(BaseModel):
+    start: datetime
+    end: datetime
+    # Active schedules whose next_due has already passed
+    overdue: int
+    total: int
+    months: List[PMForecastMonth]
+
+class PMWorkload(BaseModel):
+    occurrences: int
+    hours: float
+
+class PMWorkloadWeek(PMWorkload):
+    week_start: date # Monday
+
+class PMWorkloadAsset(PMWorkload):
+    asset_id: Optional[UUID4] = None
+    asset_name: Optional[str] = None
+
+class PMWorkloadTechnician(PMWorkload):
+    user_id: Optional[UUID4] = None
+    full_name: Optional[str] = None
+
+class PMWorkloadOut(BaseModel):
+    start: datetime
+    end: datetime
+    total: PMWorkload
+    # Active schedules whose next_due has already passed
+    overdue: PMWorkload
+    # Occurrences of schedules without estimated_hours (counted as 0 hours)
+    unestimated: int
+    weeks: List[PMWorkloadWeek]
+    assets: List[PMWorkloadAsset]
+    technicians: List[PMWorkloadTechnician]
+
 @router.get("/", response_model=List[PMScheduleOut])
+# Page, assets
+@query_budget(AUTH_QUERIES + 2)
 async def read_pm_schedules(
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
-    current_user = Depends(deps.get_current_active_user),
+    current_user = Depends(deps.get_current_active_principal),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ):
     query = (
         select(PMSchedule)
         .options(selectinload(PMSchedule.asset))
         .filter(PMSchedule.tenant_id == current_user.tenant_id)
-        .offset(skip)
-        .limit(limit)
     )
+    query = pagination.paginate(query, PMSchedule, skip, limit, cursor)
     result = await db.execute(query)
-    return result.scalars().all()
+    schedules = result.scalars().all()
+    pagination.set_next_cursor(response, schedules, limit, cursor)
+    return schedules
 
 @router.post("/", response_model=PMScheduleOut)
 async def create_pm_schedule(
@@ -76,9 +125,12 @@ async def create_pm_schedule(
         
     schedule = PMSchedule(
         **data,
+        recurrence_anchor=data['next_due'],
         tenant_id=current_user.tenant_id
     )
     db.add(schedule)
+    await db.flush()
+    await pm_occurrences.refresh(db, [schedule])
     await db.commit()
     
     # Re-fetch with eager loaded relationships for Pydantic response
@@ -88,11 +140,117 @@ async def create_pm_schedule(
     
     return schedule
 
+@router.get("/forecast", response_model=PMForecastOut)
+# One select of the schedules; occurrences are expanded in Python
+@query_budget(AUTH_QUERIES + 1)
+async def forecast_pm_schedules(
+    months: int = Query(12, ge=1, le=24),
+    asset_id: Optional[UUID4] = None,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_active_principal),
+):
+    """
+    Projected PM occurrences per calendar month over the next `months`.
+    """
+    query = select(
+        PMSchedule.id, PMSchedule.frequency_type, PMSchedule.frequency_interval,
+        PMSchedule.recurrence_anchor, PMSchedule.next_due,
+    ).filter(
+        PMSchedule.tenant_id == current_user.tenant_id,
+        PMSchedule.is_active == True,
+        PMSchedule.next_due.isnot(None),
+    )
+    if asset_id:
+        query = query.filter(PMSchedule.asset_id == asset_id)
+    schedules = (await db.execute(query)).all()
+
+    start = datetime.utcnow()
+    end = recurrence.add_months(start, months)
+    buckets = {f"{m.year:04d}-{m.month:02d}": 0 for m in (recurrence.add_months(start, i) for i in range(months + 1))}
+    occurrences = recurrence.occurrences((recurrence.schedule_series(s) for s in schedules), start, end)
+    for dates in occurrences.values():
+        for due in dates:
+            buckets[f"{due.year:04d}-{due.month:02d}"] += 1
+
+    return PMForecastOut(
+        start=start,
+        end=end,
+        overdue=sum(1 for s in schedules if s.next_due < start),
+        total=sum(buckets.values()),
+        months=[PMForecastMonth(month=month, occurrences=n) for month, n in buckets.items()],
+    )
+
+@router.get("/workload", response_model=PMWorkloadOut)
+# Per-day, per-asset and per-technician aggregates, overdue
+@query_budget(AUTH_QUERIES + 4)
+async def pm_workload(
+    weeks: int = Query(13, ge=1, le=16),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_active_principal),
+):
+    """
+    PM occurrences and estimated hours over the next `weeks`, per week, asset
+    and technician, read from the precomputed occurrence index.
+    """
+    o = models.PMOccurrence
+    start = datetime.utcnow()
+    end = start + timedelta(weeks=weeks)
+    in_window = (o.tenant_id == current_user.tenant_id, o.due_at >= start, o.due_at < end)
+    occurrences = func.count()
+    hours = func.coalesce(func.sum(o.estimated_hours), 0)
+
+    day = func.date(o.due_at, type_=Date)
+    by_day = (await db.execute(
+        select(day, occurrences, hours, func.count(o.estimated_hours)).where(*in_window).group_by(day)
+    )).all()
+    by_asset = (await db.execute(
+        select(o.asset_id, Asset.name, occurrences, hours)
+        .outerjoin(Asset, Asset.id == o.asset_id)
+        .where(*in_window)
+        .group_by(o.asset_id, Asset.name)
+        .order_by(hours.desc())
+    )).all()
+    by_user = (await db.execute(
+        select(o.assigned_to_user_id, models.User.full_name, occurrences, hours)
+        .outerjoin(models.User, models.User.id == o.assigned_to_user_id)
+        .where(*in_window)
+        .group_by(o.assigned_to_user_id, models.User.full_name)
+        .order_by(hours.desc())
+    )).all()
+    overdue = (await db.execute(
+        select(func.count(), func.coalesce(func.sum(PMSchedule.estimated_hours), 0)).where(
+            PMSchedule.tenant_id == current_user.tenant_id,
+            PMSchedule.is_active == True,
+            PMSchedule.next_due < start,
+        )
+    )).one()
+
+    def monday(d: date) -> date:
+        return d - timedelta(days=d.weekday())
+
+    first, last = monday(start.date()), monday((end - timedelta(microseconds=1)).date())
+    week_totals = {first + timedelta(weeks=i): [0, 0.0] for i in range((last - first).days // 7 + 1)}
+    for d, n, h, _ in by_day:
+        week = week_totals[monday(d)]
+        week[0] += n
+        week[1] += float(h)
+
+    return PMWorkloadOut(
+        start=start,
+        end=end,
+        total=PMWorkload(occurrences=sum(r[1] for r in by_day), hours=round(sum(float(r[2]) for r in by_day), 2)),
+        overdue=PMWorkload(occurrences=overdue[0], hours=round(float(overdue[1]), 2)),
+        unestimated=sum(r[1] - r[3] for r in by_day),
+        weeks=[PMWorkloadWeek(week_start=w, occurrences=n, hours=round(h, 2)) for w, (n, h) in week_totals.items()],
+        assets=[PMWorkloadAsset(asset_id=a, asset_name=name, occurrences=n, hours=round(float(h), 2)) for a, name, n, h in by_asset],
+        technicians=[PMWorkloadTechnician(user_id=u, full_name=name, occurrences=n, hours=round(float(h), 2)) for u, name, n, h in by_user],
+    )
+
 @router.get("/{id}", response_model=PMScheduleOut)
 async def read_pm_schedule(
     id: UUID4,
     db: AsyncSession = Depends(deps.get_db),
-    current_user = Depends(deps.get_current_active_user),
+    current_user = Depends(deps.get_current_active_principal),
 ):
     query = select(PMSchedule).filter(PMSchedule.id == id, PMSchedule.tenant_id == current_user.tenant_id)
     result = await db.execute(query)
@@ -121,8 +279,14 @@ async def update_pm_schedule(
         
     for field, value in update_data.items():
         setattr(schedule, field, value)
+    if update_data.keys() & {"next_due", "frequency_type", "frequency_interval"}:
+        # A new due date or frequency starts a new series from next_due
+        schedule.recurrence_anchor = schedule.next_due
+        # and lets the scheduler generate for it, even if it moved earlier
+        schedule.generated_through = None
         
     db.add(schedule)
+    await pm_occurrences.refresh(db, [schedule])
     await db.commit()
     
     # Re-fetch with eager loaded relationships
@@ -132,32 +296,12 @@ async def update_pm_schedule(
     
     return schedule
 
-def calculate_next_due(current_due: datetime, freq: str, interval: int = 1) -> datetime:
-    f = freq.lower()
-    if f == "daily":
-        return current_due + timedelta(days=1)
-    elif f == "weekly":
-        return current_due + timedelta(weeks=1)
-    elif f == "fortnightly":
-        return current_due + timedelta(weeks=2)
-    elif f == "monthly":
-        return current_due + timedelta(days=30)
-    elif f == "quarterly":
-        return current_due + timedelta(days=91)
-    elif f == "6 monthly":
-        return current_due + timedelta(days=182)
-    elif f == "yearly":
-        return current_due + timedelta(days=365)
-    # Fallback to old dynamic interval if none of the above match
-    if f == "days":
-        return current_due + timedelta(days=interval)
-    elif f == "weeks":
-        return current_due + timedelta(weeks=interval)
-    elif f == "months":
-        return current_due + timedelta(days=30 * interval)
-    elif f == "years":
-        return current_due + timedelta(days=365 * interval)
-    return current_due + timedelta(days=interval)
+def calculate_next_due(current_due: datetime, freq: str, interval: int = 1, anchor: Optional[datetime] = None) -> datetime:
+    """
+    The occurrence after `current_due` in the series starting at `anchor`
+    (default `current_due`), in calendar months for monthly and longer.
+    """
+    return recurrence.next_after(recurrence.rule(freq, interval), anchor or current_due, current_due)
 
 @router.post("/{id}/sign-off")
 async def sign_off_pm(
@@ -166,7 +310,13 @@ async def sign_off_pm(
     db: AsyncSession = Depends(deps.get_db),
     current_user = Depends(deps.get_current_active_user),
 ):
-    query = select(PMSchedule).filter(PMSchedule.id == id, PMSchedule.tenant_id == current_user.tenant_id)
+    # Locked until commit, so concurrent sign-offs run one after the other and
+    # each sees the next_due (and work order status) the previous one left
+    query = (
+        select(PMSchedule)
+        .filter(PMSchedule.id == id, PMSchedule.tenant_id == current_user.tenant_id)
+        .with_for_update()
+    )
     result = await db.execute(query)
     schedule = result.scalars().first()
     
@@ -185,11 +335,32 @@ async def sign_off_pm(
     )
     db.add(log)
     
-    # 2. Update Schedule
+    # 2. Complete the work order the scheduler generated for this occurrence
+    if schedule.next_due:
+        result = await db.execute(select(models.WorkOrder).where(
+            models.WorkOrder.pm_schedule_id == schedule.id,
+            models.WorkOrder.pm_due_at == schedule.next_due,
+            models.WorkOrder.status.notin_(["completed", "cancelled"]),
+        ).with_for_update())
+        wo = result.scalars().first()
+        if wo:
+            before = work_order_events.snapshot(wo)
+            wo.status = models.WorkOrderStatus.completed.value
+            wo.completed_at = now
+            wo.completed_by_user_id = current_user.id
+            wo.completion_notes = wo.completion_notes or sign_off.notes
+            work_order_events.record(db, work_order_events.UPDATED, wo, before)
+
+    # 3. Update Schedule
     current_due = schedule.next_due or now
-    schedule.next_due = calculate_next_due(current_due, schedule.frequency_type, schedule.frequency_interval)
+    # Pin the series on its first sign-off, so later ones keep its day of month
+    schedule.recurrence_anchor = schedule.recurrence_anchor or current_due
+    schedule.next_due = calculate_next_due(
+        current_due, schedule.frequency_type, schedule.frequency_interval, schedule.recurrence_anchor
+    )
     schedule.last_performed = now
     db.add(schedule)
+    await pm_occurrences.refresh(db, [schedule], now)
     
     await db.commit()
     await db.refresh(schedule)
@@ -208,6 +379,7 @@ async def delete_pm_schedule(
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
     
+    await pm_occurrences.clear(db, [schedule.id])
     await db.delete(schedule)
     await db.commit()
     return {"ok": True}
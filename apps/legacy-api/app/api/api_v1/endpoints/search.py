@@ -0,0 +1,40 @@
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+from app.api import deps
+from app.core.query_metrics import AUTH_QUERIES, query_budget
+from app.services import search
+
+router = APIRouter()
+
+@router.get("/", response_model=List[schemas.SearchHit])
+# One ranked query; the LIKE fallback (no FTS5) scans each entity type
+@query_budget(AUTH_QUERIES + 3)
+async def search_all(
+    q: str = Query(..., min_length=1),
+    types: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_active_principal),
+    current_tenant: models.Tenant = Depends(deps.get_current_tenant),
+) -> Any:
+    """
+    Ranked search across work orders, assets and inventory.
+    `types` is an optional comma-separated subset of: work_order, asset, inventory_item.
+    """
+    if not current_tenant:
+        raise HTTPException(status_code=400, detail="Tenant context required")
+
+    type_list = None
+    if types:
+        type_list = [t.strip() for t in types.split(",") if t.strip()]
+        unknown = set(type_list) - set(search.ENTITY_TYPES)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown search types: {', '.join(sorted(unknown))}")
+
+    hits = await search.search(db, current_tenant.id, q, type_list, limit)
+    return [
+        {"type": entity_type, "id": entity_id, "title": title, "score": score}
+        for entity_type, entity_id, title, score in hits
+    ]
@@ -1,13 +1,17 @@
 from typing import Any, List
+import logging
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app import models, schemas
-from app.api import deps
+from app.api import conditional, deps
+from app.core.cache import tenant_cache
+from app.services import collection_versions
 from sqlalchemy.orm.attributes import flag_modified
 import uuid
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 @router.post("/", response_model=schemas.Tenant)
 async def create_tenant(
@@ -27,12 +31,14 @@ async def create_tenant(
     db.add(tenant)
     await db.commit()
     await db.refresh(tenant)
+    tenant_cache.invalidate(tenant.slug)
     return tenant
 
 @router.get("/me", response_model=schemas.Tenant)
 async def read_current_tenant(
     current_tenant: models.Tenant = Depends(deps.get_current_tenant),
     db: AsyncSession = Depends(deps.get_db),
+    cache_headers: dict = Depends(conditional.etag(collection_versions.TENANT)),
 ) -> Any:
     # Extract theme_json from relationship OR query directly for robustness
     theme_json = {}
@@ -64,8 +70,7 @@ async def update_tenant_theme(
     # current_user: models.User = Depends(deps.get_current_active_admin) # TODO: Permission check
 ) -> Any:
     # Find existing theme or create
-    print(f"DEBUG: Updating theme for tenant {current_tenant.slug} ({current_tenant.id})")
-    print(f"DEBUG: Payload - Colors: {theme_in.colors}, Branding: {theme_in.branding}")
+    logger.debug("Updating tenant theme", extra={"tenant_id": str(current_tenant.id), "tenant_slug": current_tenant.slug})
     
     result = await db.execute(select(models.TenantTheme).where(models.TenantTheme.tenant_id == current_tenant.id))
     theme_obj = result.scalars().first()
@@ -98,4 +103,5 @@ async def update_tenant_theme(
     
     await db.commit()
     await db.refresh(theme_obj)
+    tenant_cache.invalidate(current_tenant.slug)
     return theme_obj.theme_json
@@ -1,9 +1,9 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, Body
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Body, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app import models, schemas
-from app.api import deps
+from app.api import deps, pagination
 from app.core import security
 import uuid
 
@@ -20,9 +20,11 @@ async def read_user_me(
 
 @router.get("/", response_model=List[schemas.User])
 async def read_users(
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(deps.require_admin), # ADMIN ONLY
     current_tenant: models.Tenant = Depends(deps.get_current_tenant),
 ) -> Any:
@@ -32,9 +34,11 @@ async def read_users(
     if not current_tenant:
         raise HTTPException(status_code=400, detail="Tenant context required")
         
-    query = select(models.User).where(models.User.tenant_id == current_tenant.id).offset(skip).limit(limit)
+    query = select(models.User).where(models.User.tenant_id == current_tenant.id)
+    query = pagination.paginate(query, models.User, skip, limit, cursor)
     result = await db.execute(query)
     users = result.scalars().all()
+    pagination.set_next_cursor(response, users, limit, cursor)
     return users
 
 @router.post("/", response_model=schemas.User)
@@ -61,7 +65,7 @@ async def create_user(
     
     obj_in_data = user_in.dict()
     password = obj_in_data.pop("password")
-    hashed_password = security.get_password_hash(password)
+    hashed_password = await security.get_password_hash_async(password)
     
     db_obj = models.User(
         **obj_in_data,
@@ -111,6 +115,7 @@ async def update_user_role(
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    await deps.invalidate_principal(user.id)
     return user
 
 @router.put("/{user_id}", response_model=schemas.User)
@@ -139,7 +144,7 @@ async def update_user(
     update_data = user_in.dict(exclude_unset=True)
     if "password" in update_data and update_data["password"]:
         password = update_data.pop("password")
-        hashed_password = security.get_password_hash(password)
+        hashed_password = await security.get_password_hash_async(password)
         user.password_hash = hashed_password
         
     for field, value in update_data.items():
@@ -148,6 +153,7 @@ async def update_user(
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    await deps.invalidate_principal(user.id)
     return user
 
 @router.delete("/{user_id}")
@@ -196,6 +202,7 @@ async def delete_user(
         
     await db.delete(user)
     await db.commit()
+    await deps.invalidate_principal(user_id)
     
     # Return 204 No Content (Standard for DELETE)
     # Prevents serialization issues with deleted objects
@@ -1,11 +1,13 @@
 from typing import Any
 from fastapi import APIRouter, UploadFile, File, HTTPException
+import logging
 import shutil
 import os
 import uuid
 from app.core.config import settings
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = "static"
 
@@ -45,7 +47,7 @@ async def upload_file(
             return {"url": url}
             
         except Exception as e:
-            print(f"S3 Upload Error: {e}")
+            logger.exception("S3 upload failed")
             raise HTTPException(status_code=500, detail="S3 Upload Failed")
 
     # Local Fallback (or if keys are missing)
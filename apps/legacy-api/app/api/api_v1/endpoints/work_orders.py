@@ -1,50 +1,52 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func
+from sqlalchemy import func, inspect
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import NO_VALUE, set_committed_value
 from app import models, schemas
-from app.api import deps
+from app.api import conditional, deps, pagination, streaming
+from app.core.config import settings
+from app.core.query_metrics import AUTH_QUERIES, query_budget
+from app.services import bulk_io, collection_versions, work_order_bulk, work_order_counters, work_order_events, work_order_projection, work_order_serializer, work_order_sync
 import uuid
 from datetime import datetime, timedelta
-import random
-import string
 
 router = APIRouter()
 
-async def _sync_asset_status(db: AsyncSession, asset_id: Optional[uuid.UUID], tenant_id: uuid.UUID):
-    if not asset_id:
-        return
-    
-    # Reload active work orders to be sure
-    active_query = select(models.WorkOrder).where(
-        models.WorkOrder.asset_id == asset_id,
-        models.WorkOrder.tenant_id == tenant_id,
-        models.WorkOrder.status.notin_(["completed", "cancelled"])
-    )
-    result = await db.execute(active_query)
-    active_wos = result.scalars().all()
-    
-    new_status = models.AssetStatus.healthy
-    if any(wo.priority == "critical" for wo in active_wos):
-        new_status = models.AssetStatus.breakdown
-    elif len(active_wos) > 0:
-        new_status = models.AssetStatus.running_with_issues
-        
-    asset_query = select(models.Asset).where(models.Asset.id == asset_id, models.Asset.tenant_id == tenant_id)
-    asset_res = await db.execute(asset_query)
-    asset = asset_res.scalars().first()
-    
-    if asset and asset.status != new_status:
-        asset.status = new_status
-        db.add(asset)
-        await db.flush()
+_detail_options = work_order_serializer.load_options
+
+_MANY_TO_ONE = (
+    ("asset", models.Asset, "asset_id"),
+    ("assigned_to", models.User, "assigned_to_user_id"),
+    ("completed_by", models.User, "completed_by_user_id"),
+)
+
+async def _sync_relationships(db: AsyncSession, wo: models.WorkOrder) -> None:
+    """
+    Point the response relationships at the current foreign keys after a write.
+    Uses the identity map (e.g. the current user) and only loads what changed,
+    instead of re-selecting the whole work order graph.
+    """
+    state = inspect(wo)
+    for rel, model, fk in _MANY_TO_ONE:
+        fk_value = getattr(wo, fk)
+        loaded = state.attrs[rel].loaded_value
+        if loaded is not NO_VALUE and getattr(loaded, "id", None) == fk_value:
+            continue
+        set_committed_value(wo, rel, await db.get(model, fk_value) if fk_value else None)
 
 @router.get("/stats", response_model=schemas.WorkOrderStats)
+# ETag versions, counters
+@query_budget(AUTH_QUERIES + 2)
 async def get_work_order_stats(
     db: AsyncSession = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user = Depends(deps.get_current_active_principal),
     current_tenant: models.Tenant = Depends(deps.get_current_tenant),
+    # by_status.completed counts today's completions, so the body changes at UTC midnight
+    cache_headers: dict = Depends(conditional.etag(collection_versions.WORK_ORDERS, daily=True)),
 ) -> Any:
     """
     Get work order statistics.
@@ -52,90 +54,216 @@ async def get_work_order_stats(
     if not current_tenant:
         raise HTTPException(status_code=400, detail="Tenant context required")
 
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    # Active statuses count (excludes completed/cancelled)
-    # Use func.lower to normalize keys for frontend
-    active_query = select(func.lower(models.WorkOrder.status), func.count(models.WorkOrder.id)).where(
-        models.WorkOrder.tenant_id == current_tenant.id,
-        func.lower(models.WorkOrder.status) != "completed",
-        func.lower(models.WorkOrder.status) != "cancelled"
-    ).group_by(func.lower(models.WorkOrder.status))
-    active_res = await db.execute(active_query)
-    by_status = {r[0]: r[1] for r in active_res.all()}
-    
-    # Calculate active total (sum of all statuses that are not completed or cancelled)
-    active_total = sum(by_status.values())
-    
-    # Daily Completed count (Sign-offs TODAY only)
-    completed_today_query = select(func.count(models.WorkOrder.id)).where(
-        models.WorkOrder.tenant_id == current_tenant.id,
-        func.lower(models.WorkOrder.status) == "completed",
-        models.WorkOrder.completed_at >= today_start
-    )
-    completed_res = await db.execute(completed_today_query)
-    by_status["completed"] = completed_res.scalar_one()
-
-    # Priority Stats (Active jobs only)
-    priority_query = select(func.lower(models.WorkOrder.priority), func.count(models.WorkOrder.id)).where(
-        models.WorkOrder.tenant_id == current_tenant.id,
-        func.lower(models.WorkOrder.status).notin_(["completed", "cancelled"])
-    ).group_by(func.lower(models.WorkOrder.priority))
-    priority_res = await db.execute(priority_query)
-    priority_stats = {r[0]: r[1] for r in priority_res.all()}
-
-    # All time Total
-    total_query = select(func.count(models.WorkOrder.id)).where(models.WorkOrder.tenant_id == current_tenant.id)
-    total_res = await db.execute(total_query)
-    total = total_res.scalars().first() or 0
-
-    return schemas.WorkOrderStats(
-        active_total=active_total,
-        total=total,
-        by_status=by_status,
-        by_priority=priority_stats
+    # O(1) read from the materialized counters maintained by the write handlers
+    # Same clock as the ETag's day
+    stats = await work_order_counters.read_stats(db, current_tenant.id, conditional.utc_day().date())
+    return schemas.WorkOrderStats(**stats)
+
+@router.post("/import", response_model=schemas.WorkOrderImportResult)
+async def import_work_orders(
+    request: Request,
+    db: AsyncSession = Depends(deps.get_db),
+    format: Optional[str] = Query(None, description="csv or ndjson; defaults to the Content-Type"),
+    skip_invalid: bool = False,
+    current_user: models.User = Depends(deps.require_manager),
+    current_tenant: models.Tenant = Depends(deps.get_current_tenant),
+) -> Any:
+    """
+    Bulk create work orders from a streamed CSV (header row) or NDJSON body.
+    Rows may reference assets by asset_id or asset_code. All-or-nothing unless
+    skip_invalid is set, in which case bad rows are reported and skipped.
+    """
+    if not current_tenant:
+        raise HTTPException(status_code=400, detail="Tenant context required")
+
+    fmt = bulk_io.detect_format(format, request.headers.get("content-type"))
+    if not fmt:
+        raise HTTPException(status_code=400, detail="Unsupported format; send text/csv or application/x-ndjson")
+
+    try:
+        result = await work_order_bulk.import_work_orders(
+            db, current_tenant.id, current_user.id,
+            bulk_io.iter_records(fmt, request.stream()),
+            skip_invalid=skip_invalid,
+        )
+    except bulk_io.RecordError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail={"line": e.line, "error": e.message})
+
+    if result.errors and not skip_invalid:
+        await db.rollback()
+        raise HTTPException(
+            status_code=422,
+            detail={"message": "Import rejected; no work orders were created", "errors": result.errors},
+        )
+
+    if result.created:
+        # One event for the batch; subscribers refetch rather than take thousands of rows
+        work_order_events.record_import(db, current_tenant.id, result.created)
+    await db.commit()
+    return result
+
+@router.get("/export")
+async def export_work_orders(
+    format: str = "csv",
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    current_user = Depends(deps.get_current_active_principal),
+    current_tenant: models.Tenant = Depends(deps.get_current_tenant),
+) -> Any:
+    """
+    Stream all of the tenant's work orders as CSV or NDJSON.
+    """
+    if not current_tenant:
+        raise HTTPException(status_code=400, detail="Tenant context required")
+    if format not in bulk_io.FORMATS:
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+
+    return StreamingResponse(
+        work_order_bulk.export_work_orders(current_tenant.id, format, status, priority),
+        media_type=bulk_io.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="work-orders.{format}"'},
     )
 
+@router.get("/changes", response_model=schemas.WorkOrderChanges)
+# Change scan, then the page with its joined relationships and sessions
+@query_budget(AUTH_QUERIES + 3)
+async def read_work_order_changes(
+    db: AsyncSession = Depends(deps.get_db),
+    since: Optional[str] = Query(None, description="next_since from the previous response; omit for a full sync"),
+    limit: int = 500,
+    current_user = Depends(deps.get_current_active_principal),
+    current_tenant: models.Tenant = Depends(deps.get_current_tenant),
+) -> Any:
+    """
+    Work orders created, updated or deleted since a previous sync. Keep
+    requesting with next_since while has_more is true. Rows may repeat
+    across pages; apply them by id.
+    """
+    if not current_tenant:
+        raise HTTPException(status_code=400, detail="Tenant context required")
+
+    try:
+        token = work_order_sync.SyncToken.decode(since) if since else None
+        changes = await work_order_sync.changes_since(
+            db, current_tenant.id, token,
+            limit=max(1, min(limit, settings.SYNC_MAX_PAGE_SIZE)),
+            options=_detail_options(),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except work_order_sync.SyncTokenExpired:
+        raise HTTPException(status_code=410, detail="Sync token expired; resync without `since`")
+
+    body = {
+        "changes": [work_order_serializer.work_order_dict(wo) for wo in changes.changes],
+        "deleted": [{"id": id, "deleted_at": deleted_at} for id, deleted_at in changes.deleted],
+        "next_since": changes.next_token,
+        "has_more": changes.has_more,
+    }
+    return Response(work_order_serializer.dumps(body), media_type="application/json")
+
 @router.get("/", response_model=List[schemas.WorkOrder])
+# ETag versions, page, and one selectin per relationship: asset, assigned_to,
+# completed_by, active_sessions and their users (projections need fewer)
+@query_budget(AUTH_QUERIES + 7)
 async def read_work_orders(
+    response: Response,
     db: AsyncSession = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     status: Optional[str] = None,
     priority: Optional[str] = None,
     search: Optional[str] = None,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    stream: Optional[str] = Query(None, description="ndjson or json: stream every matching row instead of one page"),
+    fields: Optional[str] = Query(None, description="Sparse fieldset, e.g. title,status,asset.name,assigned_to.full_name"),
+    current_user = Depends(deps.get_current_active_principal),
     current_tenant: models.Tenant = Depends(deps.get_current_tenant),
+    # Rows embed their asset and users, so their changes invalidate the list too
+    cache_headers: dict = Depends(conditional.etag(
+        collection_versions.WORK_ORDERS, collection_versions.ASSETS, collection_versions.USERS,
+    )),
 ) -> Any:
     """
-    Retrieve work orders with filtering.
+    Retrieve work orders with filtering. With `fields`, only those columns
+    are selected (one statement, joins for nested objects) and returned.
     """
     if not current_tenant:
         raise HTTPException(status_code=400, detail="Tenant context required")
+    if stream:
+        streaming.check_format(stream)
+    projection = None
+    if fields:
+        try:
+            projection = work_order_projection.parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if stream and projection.wants_sessions:
+            raise HTTPException(status_code=400, detail="active_sessions cannot be streamed with fields")
         
     from sqlalchemy.orm import selectinload
     
-    query = select(models.WorkOrder).where(models.WorkOrder.tenant_id == current_tenant.id).options(
-        selectinload(models.WorkOrder.assigned_to),
-        selectinload(models.WorkOrder.completed_by),
-        selectinload(models.WorkOrder.asset),
-        selectinload(models.WorkOrder.active_sessions).selectinload(models.WorkOrderSession.user)
-    )
-    
-    from sqlalchemy import func
+    query = select(models.WorkOrder).where(models.WorkOrder.tenant_id == current_tenant.id)
+    # Projections select their own columns once the filters are in place
+    if projection is None and stream:
+        # yield_per rules out joined collections; _detail_options selects those in
+        query = query.options(*_detail_options())
+    elif projection is None:
+        query = query.options(
+            selectinload(models.WorkOrder.assigned_to),
+            selectinload(models.WorkOrder.completed_by),
+            selectinload(models.WorkOrder.asset),
+            selectinload(models.WorkOrder.active_sessions).selectinload(models.WorkOrderSession.user)
+        )
     
+    # status/priority are stored lowercase, so plain equality can use the composite indexes
     if status:
-        query = query.where(func.lower(models.WorkOrder.status) == status.lower())
+        query = query.where(models.WorkOrder.status == status.lower())
     if priority:
-        query = query.where(func.lower(models.WorkOrder.priority) == priority.lower())
+        query = query.where(models.WorkOrder.priority == priority.lower())
     if search:
         query = query.where(models.WorkOrder.title.ilike(f"%{search}%"))
+
+    if projection:
+        query = projection.apply(query)
+
+    if stream:
+        if projection:
+            out = streaming.streaming_response(
+                streaming.stream_query(query, models.WorkOrder, cursor),
+                lambda row: work_order_serializer.dumps(projection.row_dict(row)), stream, scalars=False,
+            )
+        else:
+            out = streaming.streaming_response(
+                streaming.stream_query(query, models.WorkOrder, cursor), work_order_serializer.dump_work_order, stream
+            )
+        out.headers.update(cache_headers)
+        return out
         
-    query = query.order_by(models.WorkOrder.created_at.desc()).offset(skip).limit(limit)
+    query = pagination.paginate(
+        query, models.WorkOrder, skip, limit, cursor,
+        default_order=[models.WorkOrder.created_at.desc()],
+    )
     result = await db.execute(query)
-    return result.scalars().all()
+    if projection:
+        rows = result.all()
+        out = Response(work_order_serializer.dumps(await projection.to_dicts(db, rows)), media_type="application/json")
+        out.headers.update(cache_headers)
+        pagination.set_next_cursor(out, rows, limit, cursor)
+        return out
+    work_orders = result.scalars().all()
+    # Encoded directly (same JSON as response_model, without per-row validation);
+    # a returned Response replaces the injected one, so the cursor goes on it
+    out = Response(work_order_serializer.dump_work_orders(work_orders), media_type="application/json")
+    out.headers.update(cache_headers)
+    pagination.set_next_cursor(out, work_orders, limit, cursor)
+    return out
 
 @router.post("/", response_model=schemas.WorkOrder)
+# Outbox event, insert, version bump, then the asset and completed_by for the
+# response when set
+@query_budget(AUTH_QUERIES + 5)
 async def create_work_order(
     *,
     db: AsyncSession = Depends(deps.get_db),
@@ -147,49 +275,34 @@ async def create_work_order(
         raise HTTPException(status_code=400, detail="Tenant context required")
         
     # Generate Unique WO Number
-    # WO-{YYMMDD}-{HHMM}-{RAND}
-    now_str = datetime.utcnow().strftime("%y%m%d-%H%M")
-    rand_suffix = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
-    wo_number = f"WO-{now_str}-{rand_suffix}"
+    wo_number = work_order_bulk.new_work_order_number()
 
     db_obj = models.WorkOrder(
         **work_order_in.dict(),
+        id=uuid.uuid4(),  # needed by the outbox event before the insert is flushed
         work_order_number=wo_number,
         tenant_id=current_tenant.id,
         reported_by_user_id=current_user.id
     )
     db.add(db_obj)
-    
-    # Automatic Asset Status Sync
-    if db_obj.asset_id:
-        await _sync_asset_status(db, db_obj.asset_id, current_tenant.id)
+    # Counters, asset status, search and notifications run from the outbox
+    work_order_events.record(db, work_order_events.CREATED, db_obj)
         
     await db.commit()
     
-    # Re-fetch for relationships to avoid MissingGreenlet
-    result = await db.execute(
-        select(models.WorkOrder)
-        .where(models.WorkOrder.id == db_obj.id)
-        .options(
-            selectinload(models.WorkOrder.assigned_to),
-            selectinload(models.WorkOrder.completed_by),
-            selectinload(models.WorkOrder.asset),
-            selectinload(models.WorkOrder.active_sessions).selectinload(models.WorkOrderSession.user)
-        )
-    )
-    return result.scalars().first()
-
-from sqlalchemy.orm import selectinload
-from datetime import datetime
-
-# ... imports ...
+    # Build the response from what we already hold; a new work order has no sessions
+    set_committed_value(db_obj, "active_sessions", [])
+    await _sync_relationships(db, db_obj)
+    return db_obj
 
 @router.get("/{work_order_id}", response_model=schemas.WorkOrder)
+# Work order with joined relationships, sessions
+@query_budget(AUTH_QUERIES + 2)
 async def read_work_order(
     *,
     db: AsyncSession = Depends(deps.get_db),
     work_order_id: uuid.UUID,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user = Depends(deps.get_current_active_principal),
     current_tenant: models.Tenant = Depends(deps.get_current_tenant),
 ) -> Any:
     """
@@ -201,19 +314,17 @@ async def read_work_order(
     result = await db.execute(
         select(models.WorkOrder)
         .where(models.WorkOrder.id == work_order_id, models.WorkOrder.tenant_id == current_tenant.id)
-        .options(
-            selectinload(models.WorkOrder.assigned_to),
-            selectinload(models.WorkOrder.completed_by),
-            selectinload(models.WorkOrder.asset),
-            selectinload(models.WorkOrder.active_sessions).selectinload(models.WorkOrderSession.user)
-        )
+        .options(*_detail_options())
     )
-    wo = result.scalars().first()
+    wo = result.scalars().unique().first()
     if not wo:
         raise HTTPException(status_code=404, detail="Work Order not found")
-    return wo
+    return Response(work_order_serializer.dump_work_order(wo), media_type="application/json")
 
 @router.put("/{work_order_id}", response_model=schemas.WorkOrder)
+# Load (2), outbox event, update, version bump, then the asset and
+# completed_by if their ids changed
+@query_budget(AUTH_QUERIES + 7)
 async def update_work_order(
     *,
     db: AsyncSession = Depends(deps.get_db),
@@ -228,15 +339,19 @@ async def update_work_order(
     if not current_tenant:
         raise HTTPException(status_code=400, detail="Tenant context required")
         
-    result = await db.execute(select(models.WorkOrder).where(
-        models.WorkOrder.id == work_order_id,
-        models.WorkOrder.tenant_id == current_tenant.id
-    ))
-    wo = result.scalars().first()
+    # Locked until commit: an overlapping update waits and snapshots our
+    # result, so the counters never move the same "before" bucket twice
+    result = await db.execute(
+        select(models.WorkOrder)
+        .where(models.WorkOrder.id == work_order_id, models.WorkOrder.tenant_id == current_tenant.id)
+        .options(*_detail_options())
+        .with_for_update(of=models.WorkOrder)
+    )
+    wo = result.scalars().unique().first()
     if not wo:
         raise HTTPException(status_code=404, detail="Work Order not found")
         
-    old_asset_id = wo.asset_id
+    before = work_order_events.snapshot(wo)
     update_data = work_order_in.dict(exclude_unset=True)
     
     # Status Change Logic
@@ -262,28 +377,18 @@ async def update_work_order(
         
     # Merge/Update the main object
     db.add(wo)
-    
-    # Automatic Asset Status Sync
-    await _sync_asset_status(db, old_asset_id, current_tenant.id)
-    if wo.asset_id and wo.asset_id != old_asset_id:
-        await _sync_asset_status(db, wo.asset_id, current_tenant.id)
+    # Counters, asset status, search and notifications run from the outbox
+    work_order_events.record(db, work_order_events.UPDATED, wo, before)
 
     await db.commit()
     
-    # Re-fetch for relationships
-    result = await db.execute(
-        select(models.WorkOrder)
-        .where(models.WorkOrder.id == work_order_id)
-        .options(
-            selectinload(models.WorkOrder.assigned_to),
-            selectinload(models.WorkOrder.completed_by),
-            selectinload(models.WorkOrder.asset),
-            selectinload(models.WorkOrder.active_sessions).selectinload(models.WorkOrderSession.user)
-        )
-    )
-    return result.scalars().first()
+    # Only relationships whose foreign key changed need loading (usually the current user)
+    await _sync_relationships(db, wo)
+    return wo
 
 @router.post("/{work_order_id}/join", response_model=schemas.WorkOrder)
+# Load (2), outbox event, session insert, updated_at, version bump
+@query_budget(AUTH_QUERIES + 6)
 async def join_work_order(
     *,
     db: AsyncSession = Depends(deps.get_db),
@@ -297,40 +402,39 @@ async def join_work_order(
     if not current_tenant:
         raise HTTPException(status_code=400, detail="Tenant context required")
         
-    # Check if WO exists
-    result = await db.execute(select(models.WorkOrder).where(
-        models.WorkOrder.id == work_order_id,
-        models.WorkOrder.tenant_id == current_tenant.id
-    ))
-    wo = result.scalars().first()
+    # Check if WO exists (loaded with everything the response needs)
+    result = await db.execute(
+        select(models.WorkOrder)
+        .where(models.WorkOrder.id == work_order_id, models.WorkOrder.tenant_id == current_tenant.id)
+        .options(*_detail_options())
+    )
+    wo = result.scalars().unique().first()
     if not wo:
         raise HTTPException(status_code=404, detail="Work Order not found")
 
     # Check if already active
-    active_session_query = select(models.WorkOrderSession).where(
-        models.WorkOrderSession.work_order_id == work_order_id,
-        models.WorkOrderSession.user_id == current_user.id,
-        models.WorkOrderSession.end_time.is_(None)
+    already_joined = any(
+        s.user_id == current_user.id and s.end_time is None for s in wo.active_sessions
     )
-    res = await db.execute(active_session_query)
-    if res.scalars().first():
-        # Already joined, just return WO
-        pass
-    else:
-        # Create new session
+    if not already_joined:
+        # Create new session; appending keeps the loaded collection current
         session = models.WorkOrderSession(
             tenant_id=current_tenant.id,
-            work_order_id=work_order_id,
-            user_id=current_user.id
+            user_id=current_user.id,
+            user=current_user,
         )
-        db.add(session)
+        wo.active_sessions.append(session)
+        # Sessions are part of the work order payload; surfaces it in delta sync
+        wo.updated_at = datetime.utcnow()
+        work_order_events.record(db, work_order_events.SESSION_JOINED, wo)
         await db.commit()
     
-    # Return fresh WO with sessions
-    return await read_work_order(db=db, work_order_id=work_order_id, current_user=current_user, current_tenant=current_tenant)
+    return wo
 
 
 @router.post("/{work_order_id}/leave", response_model=schemas.WorkOrder)
+# Load (2), outbox event, session update, updated_at, version bump
+@query_budget(AUTH_QUERIES + 6)
 async def leave_work_order(
     *,
     db: AsyncSession = Depends(deps.get_db),
@@ -344,24 +448,33 @@ async def leave_work_order(
     if not current_tenant:
         raise HTTPException(status_code=400, detail="Tenant context required")
 
-    # Close active sessions
-    active_session_query = select(models.WorkOrderSession).where(
-        models.WorkOrderSession.work_order_id == work_order_id,
-        models.WorkOrderSession.user_id == current_user.id,
-        models.WorkOrderSession.end_time.is_(None)
+    result = await db.execute(
+        select(models.WorkOrder)
+        .where(models.WorkOrder.id == work_order_id, models.WorkOrder.tenant_id == current_tenant.id)
+        .options(*_detail_options())
     )
-    res = await db.execute(active_session_query)
-    sessions = res.scalars().all()
-    
-    for session in sessions:
-        session.end_time = datetime.utcnow()
-        db.add(session)
+    wo = result.scalars().unique().first()
+    if not wo:
+        raise HTTPException(status_code=404, detail="Work Order not found")
+
+    # Close active sessions
+    now = datetime.utcnow()
+    left = False
+    for session in wo.active_sessions:
+        if session.user_id == current_user.id and session.end_time is None:
+            session.end_time = now
+            wo.updated_at = now  # surfaces the change in delta sync
+            left = True
+    if left:
+        work_order_events.record(db, work_order_events.SESSION_LEFT, wo)
     
     await db.commit()
     
-    return await read_work_order(db=db, work_order_id=work_order_id, current_user=current_user, current_tenant=current_tenant)
+    return wo
 
 @router.delete("/{work_order_id}")
+# Load, outbox event, tombstone, sessions select + delete, delete, version bump
+@query_budget(AUTH_QUERIES + 7)
 async def delete_work_order(
     *,
     db: AsyncSession = Depends(deps.get_db),
@@ -388,12 +501,10 @@ async def delete_work_order(
     if not wo:
         raise HTTPException(status_code=404, detail="Work Order not found")
         
-    asset_id = wo.asset_id
+    # Counters, asset status, search and notifications run from the outbox
+    work_order_events.record(db, work_order_events.DELETED, wo, work_order_events.snapshot(wo))
+    work_order_sync.record_deletion(db, wo)
     await db.delete(wo)
-    
-    # Automatic Asset Status Sync
-    if asset_id:
-        await _sync_asset_status(db, asset_id, current_tenant.id)
         
     await db.commit()
     
@@ -0,0 +1,99 @@
+"""
+Conditional GET (ETag / Last-Modified) for polled read endpoints.
+
+Each endpoint declares the collections its response is built from:
+
+    cache_headers: dict = Depends(conditional.etag(collection_versions.ASSETS))
+
+The ETag is derived from the tenant's versions of those collections plus the
+request path and query, so a matching If-None-Match (or, without one, an
+If-Modified-Since at or after the last change) is answered with 304 after a
+single version lookup, before the endpoint queries or serializes anything.
+Declare the dependency after the auth dependencies so 304s are never served
+to unauthenticated callers.
+
+Responses that also depend on the current UTC day (e.g. "completed today")
+pass daily=True. The day goes into the ETag, and Last-Modified is never
+earlier than midnight, so the first poll after midnight gets a fresh body
+even with no writes.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Optional
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+from app.api import deps
+from app.services import collection_versions
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, last_modified: Optional[datetime]) -> bool:
+    if last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    # Stored times are naive UTC; HTTP dates have one-second precision
+    return last_modified.replace(microsecond=0) <= since
+
+
+def utc_day() -> datetime:
+    """
+    Start of the current UTC day (naive, like stored times).
+    """
+    return datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def etag(*collections: str, daily: bool = False) -> Callable:
+    async def dependency(
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(deps.get_db),
+        current_tenant: models.Tenant = Depends(deps.get_current_tenant),
+    ) -> dict:
+        if not current_tenant:
+            return {}
+        versions, last_modified = await collection_versions.read(db, current_tenant.id, collections)
+        key = f"{current_tenant.id}|{request.url.path}?{request.url.query}|" + ",".join(
+            f"{c}:{versions[c]}" for c in collections
+        )
+        if daily:
+            day = utc_day()
+            key += f"|{day.date().isoformat()}"
+            last_modified = max(last_modified, day) if last_modified else day
+        headers = {
+            "ETag": f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"',
+            "Cache-Control": CACHE_CONTROL,
+        }
+        if last_modified:
+            headers["Last-Modified"] = format_datetime(last_modified.replace(microsecond=0, tzinfo=timezone.utc), usegmt=True)
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = _matches(if_none_match, headers["ETag"])
+        else:
+            not_modified = "if-modified-since" in request.headers and _not_modified_since(
+                request.headers["if-modified-since"], last_modified
+            )
+        if not_modified:
+            raise HTTPException(status_code=304, headers=headers)
+
+        # Handlers that return their own Response apply these themselves
+        response.headers.update(headers)
+        return headers
+
+    return dependency
@@ -1,4 +1,5 @@
 from typing import Generator, Optional
+import logging
 import uuid
 from fastapi import Depends, HTTPException, status, Header, Request
 from fastapi.security import OAuth2PasswordBearer
@@ -7,9 +8,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from pydantic import ValidationError
 from app import models, schemas
-from app.core import security
+from app.core import revocations, security
+from app.core.cache import tenant_cache
 from app.core.config import settings
 from app.db.session import get_db
+from app.middleware.tenant import extract_tenant_slug, fetch_tenant
+
+logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False)
 
@@ -17,60 +22,48 @@ async def get_current_tenant_slug(
     request: Request,
     x_tenant_slug: Optional[str] = Header(None, alias="X-Tenant-Slug"),
 ) -> Optional[str]:
-    # Debug Logging
-    print(f"DEBUG HEADERS: {request.headers}")
+    # Already resolved by TenantMiddleware
+    state = request.scope.get("state") or {}
+    if "tenant_slug" in state:
+        return state["tenant_slug"]
+
+    # Header names only; values include credentials
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Resolving tenant slug", extra={"headers": list(request.headers.keys())})
     
     # 1. Try dependency injection header
     if x_tenant_slug:
         return x_tenant_slug
         
-    # 2. Manual header inspection (Case Insensitive)
-    h = request.headers
-    candidates = [
-        "x-tenant-slug", "X-Tenant-Slug", "X-TENANT-SLUG",
-        "x-tenant", "X-Tenant", "X-TENANT",
-        "tenant-slug", "tenant"
-    ]
-    for key in candidates:
-         if key in h:
-             return h[key]
-             
-    # 3. Query params
-    if "tenant_slug" in request.query_params:
-        return request.query_params["tenant_slug"]
-
-    # 4. EMERGENCY FALLBACK: Default to 'acme' if user is authenticated
-    # This ensures functionality for the demo even if headers are stripped by proxies
-    auth = h.get("Authorization")
-    if auth:
-        return "acme"
-        
-    return None
-
-from sqlalchemy.orm import selectinload
+    # 2. Other headers, query params, authenticated fallback
+    return extract_tenant_slug(request.headers, request.scope.get("query_string", b""))
 
 async def get_current_tenant(
+    request: Request,
     slug: Optional[str] = Depends(get_current_tenant_slug),
     db: AsyncSession = Depends(get_db)
 ) -> Optional[models.Tenant]:
-    print(f"DEBUG: Resolving Tenant. Slug={slug}")
     if not slug:
-        print("DEBUG: No slug provided.")
+        logger.debug("No tenant slug provided")
         return None
     
-    # Query tenant with theme loaded
-    result = await db.execute(
-        select(models.Tenant)
-        .options(selectinload(models.Tenant.theme))
-        .where(models.Tenant.slug == slug)
-    )
-    tenant = result.scalars().first()
-    if not tenant:
-        print(f"DEBUG: Tenant '{slug}' not found in DB.")
+    # TenantMiddleware (or the cache) usually has it already; attach to this
+    # session without a round trip
+    state = request.scope.get("state") or {}
+    if state.get("tenant_slug") == slug:
+        # None here means the middleware looked it up and it does not exist
+        tenant = state.get("tenant")
+    else:
+        tenant = tenant_cache.get(slug)
+        if tenant is None:
+            tenant = await fetch_tenant(db, slug)
+            if tenant is not None:
+                return tenant
+    if tenant is None:
+        logger.info("Tenant not found", extra={"tenant_slug": slug})
         raise HTTPException(status_code=404, detail="Tenant not found")
-    
-    print(f"DEBUG: Found Tenant: {tenant.name} ({tenant.id})")
-    return tenant
+
+    return await db.merge(tenant, load=False)
 
 async def get_current_user(
     request: Request,
@@ -128,16 +121,78 @@ async def get_current_active_user(
 
     return current_user
 
+class Principal:
+    """
+    Lightweight stand-in for models.User built from verified token claims.
+    Only carries the attributes read-mostly endpoints rely on.
+    """
+    __slots__ = ("id", "tenant_id", "role", "is_active")
+
+    def __init__(self, id: uuid.UUID, tenant_id: uuid.UUID, role: models.UserRole, is_active: bool):
+        self.id = id
+        self.tenant_id = tenant_id
+        self.role = role
+        self.is_active = is_active
+
+async def invalidate_principal(user_id: uuid.UUID) -> None:
+    """
+    Force tokens issued before now to be re-checked against the database.
+    Call after changing a user's role, activation or tenant.
+    """
+    await revocations.revoke(user_id)
+
+async def get_current_principal(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    token: Optional[str] = Depends(oauth2_scheme)
+):
+    """
+    Resolve the caller without a user lookup when STATELESS_AUTH is enabled and
+    the token carries principal claims. Falls back to get_current_user for old
+    tokens, revoked principals, or when the mode is off.
+    """
+    if settings.STATELESS_AUTH:
+        raw_token = token or request.cookies.get("access_token")
+        if raw_token:
+            try:
+                payload = jwt.decode(
+                    raw_token, settings.SECRET_KEY if hasattr(settings, 'SECRET_KEY') else "SECRET", algorithms=[security.ALGORITHM]
+                )
+                token_data = schemas.TokenPayload(**payload)
+                if token_data.tenant_id and token_data.role and token_data.is_active is not None:
+                    user_uuid = uuid.UUID(token_data.sub)
+                    try:
+                        revoked_at = await revocations.revoked_at(user_uuid)
+                    except Exception:
+                        # Store unreachable: treat as revoked, the database decides
+                        logger.warning("Principal revocation lookup failed", exc_info=True)
+                        revoked_at = float("inf")
+                    if revoked_at is None or (token_data.iat or 0) > revoked_at:
+                        return Principal(
+                            id=user_uuid,
+                            tenant_id=uuid.UUID(token_data.tenant_id),
+                            role=models.UserRole(token_data.role),
+                            is_active=token_data.is_active,
+                        )
+            except (JWTError, ValidationError, ValueError, TypeError):
+                # Let the full path produce the proper auth error
+                pass
+
+    return await get_current_user(request=request, db=db, token=token)
+
+async def get_current_active_principal(
+    principal = Depends(get_current_principal),
+    current_tenant: Optional[models.Tenant] = Depends(get_current_tenant),
+):
+    return await get_current_active_user(current_user=principal, current_tenant=current_tenant)
+
 class RoleChecker:
     def __init__(self, allowed_roles: list[models.UserRole]):
         self.allowed_roles = allowed_roles
 
     def __call__(self, user: models.User = Depends(get_current_active_user)):
-        # Debug Role
-        import sys
-        print(f"DEBUG ROLE CHECK: {user.email} Role: {user.role} (Type: {type(user.role)})", file=sys.stderr)
-        sys.stderr.flush()
         if user.role not in self.allowed_roles:
+            logger.info("Role check denied", extra={"user_id": str(user.id), "role": str(user.role)})
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, 
                 detail="Operation not permitted"
@@ -0,0 +1,66 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+
+Clients opt in by sending `cursor` (empty for the first page). Rows are then
+ordered newest first by (created_at, id) and the cursor for the following page
+is returned in the X-Next-Cursor response header, so list bodies keep the same
+shape as skip/limit responses. created_at must be set on every row of a
+paginated table (backfilled by migration 0008 and at startup).
+"""
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, id: uuid.UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, uuid.UUID]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), uuid.UUID(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(query, model, skip: int, limit: int, cursor: Optional[str], default_order=None):
+    """
+    Apply keyset pagination when `cursor` is given, else the legacy offset/limit.
+    `default_order` keeps each endpoint's existing ordering for offset mode.
+    """
+    if cursor is None:
+        if default_order is not None:
+            query = query.order_by(*default_order)
+        return query.offset(skip).limit(limit)
+
+    position = decode_cursor(cursor)
+    if position:
+        created_at, id = position
+        query = query.where(
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < id),
+            )
+        )
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+
+
+def set_next_cursor(response: Response, rows: Sequence, limit: int, cursor: Optional[str]) -> None:
+    """
+    Expose the cursor for the next page; omitted once the last page is reached.
+    """
+    if cursor is None or not rows or len(rows) < limit:
+        return
+    last = rows[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
@@ -0,0 +1,72 @@
+"""
+Streamed list responses shared by the list endpoints.
+
+Clients opt in with `stream=ndjson` (one JSON object per line) or
+`stream=json` (a single JSON array). Every matching row is read through a
+server-side cursor (yield_per) and serialized one batch at a time, so worker
+memory and time to first byte stay flat however many rows match. Rows are
+ordered newest first by (created_at, id); a `cursor` from a paged response
+resumes the stream from that position.
+"""
+from typing import Any, AsyncIterator, Callable, Optional, Type
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from app.api import pagination
+
+STREAM_FORMATS = ("ndjson", "json")
+STREAM_BATCH_SIZE = 500
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+
+def check_format(fmt: str) -> str:
+    if fmt not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail="stream must be ndjson or json")
+    return fmt
+
+
+def stream_query(query, model, cursor: Optional[str]):
+    """
+    Keyset order with no limit; only the cursor of a paged request applies.
+    """
+    query = pagination.paginate(query, model, 0, None, cursor or "")
+    return query.execution_options(yield_per=STREAM_BATCH_SIZE)
+
+
+def model_encoder(schema: Type[BaseModel]) -> Callable[[Any], bytes]:
+    """
+    Encode rows through the endpoint's response model, so streamed items
+    match the paged ones.
+    """
+    return lambda row: schema.model_validate(row).model_dump_json().encode()
+
+
+async def _encode(query, encode: Callable[[Any], bytes], fmt: str, scalars: bool) -> AsyncIterator[bytes]:
+    # Own session: the request's session is closed once the handler returns
+    from app.db.session import AsyncSessionLocal
+
+    separator = b"\n" if fmt == "ndjson" else b","
+    first = True
+    if fmt == "json":
+        yield b"["
+    async with AsyncSessionLocal() as db:
+        result = await (db.stream_scalars(query) if scalars else db.stream(query))
+        async for batch in result.partitions():
+            chunk = separator.join(encode(row) for row in batch)
+            if fmt == "ndjson":
+                yield chunk + separator
+            else:
+                yield chunk if first else separator + chunk
+            # The identity map is weak-referencing, so each batch is freed once encoded
+            first = False
+    if fmt == "json":
+        yield b"]"
+
+
+def streaming_response(query, encode: Callable[[Any], bytes], fmt: str, scalars: bool = True) -> StreamingResponse:
+    """
+    `query` should come from stream_query(); `encode` turns one row into JSON
+    bytes, e.g. model_encoder(ResponseModel). Pass scalars=False for column
+    (Core) selects, so `encode` receives Row objects instead of entities.
+    """
+    return StreamingResponse(_encode(query, encode, fmt, scalars), media_type=MEDIA_TYPES[fmt])
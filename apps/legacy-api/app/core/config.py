@@ -29,8 +29,128 @@ class Settings(BaseSettings):
     AWS_REGION: str = "eu-north-1"
     AWS_BUCKET_NAME: str | None = None
 
+    # In-process caches (per worker)
+    TENANT_CACHE_TTL_SECONDS: int = 60
+    TENANT_CACHE_MAX_SIZE: int = 1024
+
+    # Auth
+    # When enabled, read-mostly endpoints trust the tenant/role/is_active claims
+    # in the access token instead of loading the user row on every request.
+    STATELESS_AUTH: bool = False
+    # Must cover the access token lifetime so revocations outlive old tokens
+    PRINCIPAL_REVOCATION_TTL_SECONDS: int = 3600
+    # Where role/activation changes are recorded (core.revocations). "memory"
+    # is per worker, so STATELESS_AUTH with it needs WEB_CONCURRENCY=1; "redis"
+    # needs the redis package and PRINCIPAL_REVOCATION_REDIS_URL.
+    PRINCIPAL_REVOCATION_BACKEND: str = "memory"
+    PRINCIPAL_REVOCATION_REDIS_URL: str | None = None
+    # Worker processes serving the app (also read by uvicorn and gunicorn)
+    WEB_CONCURRENCY: int = 1
+
+    # Password hashing. Changing the argon2 costs rehashes stored passwords
+    # on their next successful login.
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 102400 # KiB
+    ARGON2_PARALLELISM: int = 8
+    # Threads doing hash/verify work, and how many requests may hash at once
+    # (the rest wait without holding a thread)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 4
+
+    # Load balancer / proxy addresses (comma-separated IPs or CIDRs) allowed to
+    # set X-Forwarded-For and X-Forwarded-Proto. "*" lets any client choose
+    # the IP that login throttling keys on. Unset, only loopback is trusted and
+    # the per-IP login bucket is off: behind a proxy every client would share
+    # its address. Set it to "127.0.0.1" when clients connect directly.
+    # The uvicorn CLI reads the same variable for its own proxy-header
+    # handling (--proxy-headers is on by default), so one value covers both.
+    FORWARDED_ALLOW_IPS: str | None = None
+
+    # Login throttling (token buckets). "memory" is per worker; "redis" needs
+    # the redis package and RATE_LIMIT_REDIS_URL.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_REDIS_URL: str | None = None
+    # Every attempt from a client IP
+    LOGIN_IP_BURST: int = 30
+    LOGIN_IP_PER_MINUTE: float = 30.0
+    # Failed attempts per tenant + email; cleared by a successful login
+    LOGIN_FAILURE_BURST: int = 5
+    LOGIN_FAILURE_PER_MINUTE: float = 0.5
+
+    # Server-sent events (/events/stream). "memory" only reaches clients
+    # connected to the publishing worker; "redis" needs the redis package and
+    # EVENTS_REDIS_URL.
+    EVENTS_BACKEND: str = "memory"
+    EVENTS_REDIS_URL: str | None = None
+    # Events buffered per client before a slow one is told to resync
+    EVENTS_QUEUE_SIZE: int = 256
+    # Comment line sent on idle streams so proxies keep them open
+    EVENTS_KEEPALIVE_SECONDS: float = 15.0
+
+    # Transactional outbox for post-write side effects (services.outbox).
+    # Every worker runs a dispatcher unless disabled.
+    OUTBOX_DISPATCHER_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = 200
+    # Fallback poll for events from other workers and retries; local commits wake it at once
+    OUTBOX_POLL_SECONDS: float = 1.0
+    # Failing events back off exponentially up to the cap, then are parked
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_MAX_BACKOFF_SECONDS: int = 300
+
+    # PM scheduler: turns due PM schedules into work orders (services.pm_scheduler)
+    PM_SCHEDULER_ENABLED: bool = True
+    PM_SCHEDULER_INTERVAL_SECONDS: int = 300
+    # Generate work orders for occurrences due up to this far ahead
+    PM_SCHEDULER_HORIZON_HOURS: int = 24
+    PM_SCHEDULER_BATCH_SIZE: int = 500
+    # A run stops starting new batches after this long; the next run picks up the rest
+    PM_SCHEDULER_TIME_BUDGET_SECONDS: float = 30.0
+    # Workload forecast index (services.pm_occurrences), kept rolling forward
+    # by the scheduler; must exceed the longest /pm-schedules/workload window
+    # (16 weeks)
+    PM_OCCURRENCE_HORIZON_DAYS: int = 120
+
     SQLALCHEMY_DATABASE_URI: str | None = None
 
+    # Connection pool / engine tuning
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0 # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800 # Seconds; keeps us under proxy/LB idle cutoffs
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_USE_LIFO: bool = False
+    DB_ECHO: bool = False
+    # asyncpg only. Set to 0 when running behind pgbouncer in transaction mode.
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # asyncpg only. Seconds before a statement is cancelled; None (no limit)
+    # keeps long reports, bulk imports and reindexes working.
+    DB_COMMAND_TIMEOUT: float | None = None
+    DB_CONNECT_TIMEOUT: float = 10.0
+    # SQLite only: WAL lets readers proceed while a writer holds the lock
+    SQLITE_WAL: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Logging: records go through a queue drained by a background thread
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json" # "json" or "text"
+    LOG_QUEUE: bool = True
+    # Fraction of per-request access log lines kept (warnings/errors always kept)
+    LOG_ACCESS_SAMPLE_RATE: float = 1.0
+
+    # Delta sync (/work-orders/changes). Rows changed within the overlap window
+    # are re-sent once so writes that commit late are not skipped; it should
+    # exceed the longest write transaction.
+    SYNC_OVERLAP_SECONDS: int = 5
+    SYNC_MAX_PAGE_SIZE: int = 1000
+    # Deletions older than this are purged; older sync tokens get 410 and must resync
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+
+    # Per-request SQL statement counts and timings, aggregated per route
+    QUERY_METRICS_ENABLED: bool = True
+    # Dev only: adds X-Query-Count / X-Query-Time-Ms / X-Response-Time-Ms headers
+    QUERY_METRICS_HEADERS: bool = False
+
     @validator("SQLALCHEMY_DATABASE_URI", pre=True)
     def assemble_db_connection(cls, v: str | None, values: dict[str, any]) -> str:
         if isinstance(v, str) and v:
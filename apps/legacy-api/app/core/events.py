@@ -0,0 +1,195 @@
+"""
+Per-tenant event fan-out for the server-sent events stream (/events/stream).
+
+Handlers publish after their transaction commits. Each worker delivers to its
+own connected clients; an event is framed once and the same bytes are queued
+for every subscriber. With the memory backend only clients on the publishing
+worker see an event; the redis backend publishes through Redis pub/sub and
+every worker relays what it receives to its local subscribers.
+
+Delivery is best effort. A client that falls EVENTS_QUEUE_SIZE events behind
+is sent `resync` and disconnected; after any reconnect clients catch up with
+/work-orders/changes.
+"""
+import asyncio
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def frame(event: str, data: bytes) -> bytes:
+    """
+    One SSE message. `data` must be single-line JSON.
+    """
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+
+class Subscription:
+    def __init__(self, maxsize: int):
+        self._queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize)
+        # Set when the client missed events and has to resync
+        self.dropped = False
+        self.closed = False
+
+    def push(self, message: bytes) -> None:
+        if self.dropped or self.closed:
+            return
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped = True
+
+    def close(self) -> None:
+        self.closed = True
+        try:
+            # Wakes a waiting get(); a full queue means nobody is waiting
+            self._queue.put_nowait(b"")
+        except asyncio.QueueFull:
+            pass
+
+    async def get(self, timeout: float) -> Optional[bytes]:
+        """
+        Next message, or None when nothing arrived within `timeout` seconds.
+        """
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """
+    In-process fan-out. Events only reach subscribers on this worker.
+    """
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    @asynccontextmanager
+    async def subscribe(self, tenant_id: uuid.UUID) -> AsyncIterator[Subscription]:
+        await self._start()
+        key = str(tenant_id)
+        subscription = Subscription(self.queue_size)
+        self._subscribers.setdefault(key, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self._subscribers.get(key)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[key]
+
+    async def publish(self, tenant_id: uuid.UUID, event: str, data: bytes) -> None:
+        self._deliver(str(tenant_id), frame(event, data))
+
+    def _deliver(self, tenant_key: str, message: bytes) -> None:
+        for subscription in tuple(self._subscribers.get(tenant_key, ())):
+            subscription.push(message)
+
+    def _drop_all(self) -> None:
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                subscription.dropped = True
+                subscription.close()
+
+    async def _start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                subscription.close()
+
+    def stats(self) -> dict:
+        return {
+            "tenants": len(self._subscribers),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+        }
+
+
+class RedisEventBroker(EventBroker):
+    """
+    Cross-worker fan-out over Redis pub/sub, one channel per tenant. Each
+    worker holds a single pattern subscription and relays to its local
+    subscribers. Needs the `redis` package (redis.asyncio).
+    """
+
+    def __init__(self, url: str, queue_size: int = 256, prefix: str = "events:"):
+        import redis.asyncio as redis
+        super().__init__(queue_size)
+        self._redis = redis.from_url(url)
+        self.prefix = prefix
+        self._listener: Optional[asyncio.Task] = None
+
+    async def publish(self, tenant_id, event, data):
+        await self._redis.publish(self.prefix + str(tenant_id), frame(event, data))
+
+    async def _start(self):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(self.prefix + "*")
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    self._deliver(channel[len(self.prefix):], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Event relay lost its Redis connection, retrying", exc_info=True)
+            finally:
+                await pubsub.reset()
+            # Anything published while disconnected is gone; make clients resync
+            self._drop_all()
+            await asyncio.sleep(1)
+
+    async def close(self):
+        await super().close()
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+
+_broker: Optional[EventBroker] = None
+
+
+def get_broker() -> EventBroker:
+    global _broker
+    if _broker is None:
+        if settings.EVENTS_BACKEND == "redis":
+            _broker = RedisEventBroker(settings.EVENTS_REDIS_URL, settings.EVENTS_QUEUE_SIZE)
+        else:
+            _broker = EventBroker(settings.EVENTS_QUEUE_SIZE)
+    return _broker
+
+
+def set_broker(broker: Optional[EventBroker]) -> None:
+    """
+    Swap the backend (e.g. a custom broker); None falls back to settings.
+    """
+    global _broker
+    _broker = broker
+
+
+async def publish(tenant_id: uuid.UUID, event: str, data: bytes) -> None:
+    """
+    Publish a committed change. Never raises: the write already succeeded,
+    and clients that miss an event catch up through delta sync.
+    """
+    try:
+        await get_broker().publish(tenant_id, event, data)
+    except Exception:
+        logger.warning("Failed to publish event", extra={"event": event}, exc_info=True)
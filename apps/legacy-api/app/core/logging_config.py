@@ -0,0 +1,101 @@
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+from app.core.config import settings
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+ACCESS_LOGGER = "app.access"
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: timestamp, level, logger, message plus any
+    fields passed via `extra=`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of records below WARNING; warnings and errors always pass.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+_configured = False
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging() -> None:
+    """
+    Route all app logging through an in-memory queue drained by a background
+    thread, so request handlers never block on stdout. Safe to call twice.
+    """
+    global _configured, _listener
+    if _configured:
+        return
+    _configured = True
+
+    stream = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    if settings.LOG_QUEUE:
+        # QueueHandler renders the message (and traceback) on the caller's
+        # side, `extra=` fields ride along on the record to the formatter
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        handler: logging.Handler = logging.handlers.QueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+        _listener.start()
+    else:
+        # Synchronous writes; only useful for comparison and debugging
+        handler = stream
+
+    root = logging.getLogger("app")
+    root.setLevel(settings.LOG_LEVEL.upper())
+    root.handlers[:] = [handler]
+    root.propagate = False
+
+    access = logging.getLogger(ACCESS_LOGGER)
+    access.filters[:] = [SamplingFilter(settings.LOG_ACCESS_SAMPLE_RATE)]
+
+
+def shutdown_logging() -> None:
+    """
+    Flush queued records; call on application shutdown.
+    """
+    global _configured, _listener
+    if _listener is not None:
+        _listener.stop()
+    _listener = None
+    _configured = False
@@ -0,0 +1,187 @@
+import bisect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class QueryStats:
+    """
+    SQL statements issued while a tracking scope is active.
+    """
+    __slots__ = ("count", "duration", "statements", "_started")
+
+    def __init__(self, keep_statements: bool = False):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Optional[List[str]] = [] if keep_statements else None
+        self._started: Dict[int, float] = {}
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats._started[id(cursor)] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    started = stats._started.pop(id(cursor), None)
+    stats.count += 1
+    if started is not None:
+        stats.duration += time.perf_counter() - started
+    if stats.statements is not None:
+        stats.statements.append(statement)
+
+
+def instrument_engine(sync_engine) -> None:
+    """
+    Attach the counting hooks to an engine (the .sync_engine of an async one).
+    Statements outside a tracking scope cost a single ContextVar lookup.
+    """
+    from sqlalchemy import event
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries(keep_statements: bool = False):
+    """
+    Count the statements issued in this context (and tasks spawned from it).
+    """
+    stats = QueryStats(keep_statements)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+# --- Per-route budgets -----------------------------------------------------
+
+# Statements a request may spend in its auth dependencies before the handler
+# runs: the user row (skipped by stateless auth) and, on a tenant cache miss,
+# the tenant and its theme. Budgets are this plus the route's own query shape.
+AUTH_QUERIES = 3
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    Declare the maximum number of SQL statements a route may issue per request,
+    including its dependencies. Apply below the @router decorator.
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+
+def budget_for(endpoint: Optional[Callable]) -> Optional[int]:
+    return getattr(endpoint, "__query_budget__", None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def expect_max_queries(budget: int, label: str = "block"):
+    """
+    Test helper: fail when the wrapped block issues more than `budget` statements.
+    """
+    with track_queries(keep_statements=True) as stats:
+        yield stats
+    if stats.count > budget:
+        listing = "\n".join(f"  {s.splitlines()[0][:120]}" for s in stats.statements)
+        raise QueryBudgetExceeded(f"{label}: {stats.count} statements, budget {budget}\n{listing}")
+
+
+# --- Per-route histograms --------------------------------------------------
+
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55)
+LATENCY_MS_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram; the last slot counts values above the top bucket.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self, samples: int) -> dict:
+        labels = [f"le_{b}" for b in self.buckets] + ["inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "avg": round(self.total / samples, 3) if samples else 0.0,
+            "max": round(self.max, 3),
+        }
+
+
+class RouteMetrics:
+    __slots__ = ("requests", "over_budget", "queries", "query_ms", "latency_ms")
+
+    def __init__(self):
+        self.requests = 0
+        self.over_budget = 0
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.query_ms = Histogram(LATENCY_MS_BUCKETS)
+        self.latency_ms = Histogram(LATENCY_MS_BUCKETS)
+
+
+class RouteMetricsRegistry:
+    """
+    Aggregated query counts and timings keyed by "METHOD /route/{template}".
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._routes: Dict[str, RouteMetrics] = {}
+
+    def record(self, route: str, stats: QueryStats, elapsed: float, budget: Optional[int] = None) -> None:
+        with self._lock:
+            metrics = self._routes.get(route)
+            if metrics is None:
+                metrics = self._routes[route] = RouteMetrics()
+            metrics.requests += 1
+            if budget is not None and stats.count > budget:
+                metrics.over_budget += 1
+            metrics.queries.observe(stats.count)
+            metrics.query_ms.observe(stats.duration * 1000)
+            metrics.latency_ms.observe(elapsed * 1000)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                route: {
+                    "requests": m.requests,
+                    "over_budget": m.over_budget,
+                    "queries": m.queries.snapshot(m.requests),
+                    "query_ms": m.query_ms.snapshot(m.requests),
+                    "latency_ms": m.latency_ms.snapshot(m.requests),
+                }
+                for route, m in sorted(self._routes.items())
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+route_metrics = RouteMetricsRegistry()
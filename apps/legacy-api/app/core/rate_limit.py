@@ -0,0 +1,121 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+from app.core.config import settings
+
+
+class RateLimitStore(ABC):
+    """
+    Token buckets keyed by string. `take` consumes `cost` tokens if available;
+    cost=0 only checks. Returns (allowed, retry_after_seconds).
+    """
+
+    @abstractmethod
+    async def take(self, key: str, capacity: float, refill_per_sec: float, cost: float = 1.0) -> Tuple[bool, float]:
+        ...
+
+    @abstractmethod
+    async def reset(self, key: str) -> None:
+        ...
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Per-process buckets. Limits are per worker; use the redis backend to
+    share them across workers and hosts.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key, capacity, refill_per_sec, cost=1.0):
+        # No awaits between read and write, so this is atomic on the event loop
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_per_sec)
+        allowed = tokens >= cost if cost else tokens >= 1
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        if allowed:
+            return True, 0.0
+        needed = (cost or 1) - tokens
+        return False, needed / refill_per_sec if refill_per_sec else float("inf")
+
+    async def reset(self, key):
+        self._buckets.pop(key, None)
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """
+    Buckets in Redis, updated atomically by a Lua script. Needs the `redis`
+    package (redis.asyncio).
+    """
+
+    _SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local now = tonumber(ARGV[4])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+    local needed = cost
+    if needed == 0 then needed = 1 end
+    local allowed = 0
+    if tokens >= needed then
+        allowed = 1
+        tokens = tokens - cost
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    local ttl = 60
+    if rate > 0 then ttl = math.ceil(capacity / rate) + 1 end
+    redis.call('EXPIRE', KEYS[1], ttl)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url)
+        self._script = self._redis.register_script(self._SCRIPT)
+        self.prefix = prefix
+
+    async def take(self, key, capacity, refill_per_sec, cost=1.0):
+        allowed, tokens = await self._script(
+            keys=[self.prefix + key],
+            args=[capacity, refill_per_sec, cost, time.time()],
+        )
+        if allowed:
+            return True, 0.0
+        needed = (cost or 1) - float(tokens)
+        return False, needed / refill_per_sec if refill_per_sec else float("inf")
+
+    async def reset(self, key):
+        await self._redis.delete(self.prefix + key)
+
+
+_store: Optional[RateLimitStore] = None
+
+
+def get_store() -> RateLimitStore:
+    global _store
+    if _store is None:
+        if settings.RATE_LIMIT_BACKEND == "redis":
+            _store = RedisRateLimitStore(settings.RATE_LIMIT_REDIS_URL)
+        else:
+            _store = MemoryRateLimitStore()
+    return _store
+
+
+def set_store(store: Optional[RateLimitStore]) -> None:
+    """
+    Swap the backend (e.g. a custom store); None falls back to settings.
+    """
+    global _store
+    _store = store
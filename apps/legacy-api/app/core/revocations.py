@@ -0,0 +1,110 @@
+"""
+Principal revocations for stateless auth (settings.STATELESS_AUTH).
+
+Changing a user's role, activation or tenant records the time of the change.
+Tokens issued before it are re-checked against the database instead of being
+trusted on their claims. The record must be seen by every worker that
+accepts the token: the memory backend only covers the worker that made the
+change, so startup refuses STATELESS_AUTH with it when WEB_CONCURRENCY > 1.
+The redis backend shares revocations across workers and hosts.
+"""
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Optional
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class RevocationStore(ABC):
+    @abstractmethod
+    async def revoke(self, user_id: uuid.UUID, at: float) -> None:
+        """
+        Record that tokens for `user_id` issued before `at` are stale.
+        """
+
+    @abstractmethod
+    async def revoked_at(self, user_id: uuid.UUID) -> Optional[float]:
+        """
+        Time of the user's last revocation, or None.
+        """
+
+
+class MemoryRevocationStore(RevocationStore):
+    """
+    Per-process revocations; only valid with a single worker.
+    """
+
+    def __init__(self, ttl: float):
+        self.cache = TTLCache(maxsize=100_000, ttl=ttl)
+
+    async def revoke(self, user_id, at):
+        self.cache.set(user_id, at)
+
+    async def revoked_at(self, user_id):
+        return self.cache.get(user_id)
+
+
+class RedisRevocationStore(RevocationStore):
+    """
+    Revocations in Redis, expiring after the TTL. Needs the `redis` package
+    (redis.asyncio).
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str = "revoked:"):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    async def revoke(self, user_id, at):
+        await self._redis.set(self.prefix + str(user_id), repr(at), ex=self.ttl)
+
+    async def revoked_at(self, user_id):
+        value = await self._redis.get(self.prefix + str(user_id))
+        return float(value) if value is not None else None
+
+
+_store: Optional[RevocationStore] = None
+
+
+def get_store() -> RevocationStore:
+    global _store
+    if _store is None:
+        ttl = settings.PRINCIPAL_REVOCATION_TTL_SECONDS
+        if settings.PRINCIPAL_REVOCATION_BACKEND == "redis":
+            _store = RedisRevocationStore(settings.PRINCIPAL_REVOCATION_REDIS_URL, ttl)
+        else:
+            _store = MemoryRevocationStore(ttl)
+    return _store
+
+
+def set_store(store: Optional[RevocationStore]) -> None:
+    """
+    Swap the backend (e.g. a custom store); None falls back to settings.
+    """
+    global _store
+    _store = store
+
+
+def check_settings() -> None:
+    """
+    Fail at startup rather than serve revoked principals from other workers.
+    """
+    if (
+        settings.STATELESS_AUTH
+        and settings.PRINCIPAL_REVOCATION_BACKEND != "redis"
+        and settings.WEB_CONCURRENCY > 1
+    ):
+        raise RuntimeError(
+            "STATELESS_AUTH with WEB_CONCURRENCY > 1 needs PRINCIPAL_REVOCATION_BACKEND=redis; "
+            "in-memory revocations are not shared between workers"
+        )
+
+
+async def revoke(user_id: uuid.UUID) -> None:
+    await get_store().revoke(user_id, time.time())
+
+
+async def revoked_at(user_id: uuid.UUID) -> Optional[float]:
+    return await get_store().revoked_at(user_id)
@@ -1,22 +1,52 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Optional, Tuple, Union
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
+# bcrypt hashes and argon2 hashes with other costs count as deprecated, so
+# verify_and_update hands back a fresh hash for them
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
+
+# argon2 releases the GIL, so a couple of threads keep the event loop free
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_hash_slots: Optional[asyncio.Semaphore] = None
+_hash_slots_loop = None
 
 ALGORITHM = "HS256"
 
-def create_access_token(subject: Union[str, Any], role: str = None, expires_delta: timedelta = None) -> str:
+def create_access_token(
+    subject: Union[str, Any],
+    role: str = None,
+    expires_delta: timedelta = None,
+    tenant_id: Union[str, Any] = None,
+    is_active: bool = None,
+) -> str:
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
+        expire = now + timedelta(minutes=15)
     
-    to_encode = {"sub": str(subject), "exp": expire}
+    to_encode = {"sub": str(subject), "exp": expire, "iat": now}
     if role:
         to_encode["role"] = role
+    # Principal claims used by stateless auth mode (see deps.get_current_principal)
+    if tenant_id:
+        to_encode["tenant_id"] = str(tenant_id)
+    if is_active is not None:
+        to_encode["is_active"] = is_active
         
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY if hasattr(settings, 'SECRET_KEY') else "SECRET", algorithm=ALGORITHM)
     return encoded_jwt
@@ -26,3 +56,29 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+def _slots() -> asyncio.Semaphore:
+    # One semaphore per event loop (tests and scripts may run several)
+    global _hash_slots, _hash_slots_loop
+    loop = asyncio.get_running_loop()
+    if _hash_slots is None or _hash_slots_loop is not loop:
+        _hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_CONCURRENCY)
+        _hash_slots_loop = loop
+    return _hash_slots
+
+async def _run_hashing(fn, *args):
+    async with _slots():
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    get_password_hash off the event loop.
+    """
+    return await _run_hashing(pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify off the event loop. Returns (valid, new_hash); new_hash is set when
+    the stored hash uses an outdated scheme or cost and should be replaced.
+    """
+    return await _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
@@ -0,0 +1,30 @@
+"""
+Database dialects the app runs on.
+
+Counters, collection versions and PM generation rely on
+INSERT ... ON CONFLICT, which SQLAlchemy only provides per dialect.
+Startup calls check_supported() so an unsupported database fails there,
+not with a 500 on the first write.
+"""
+from typing import Callable
+
+SUPPORTED = ("postgresql", "sqlite")
+
+
+def check_supported(dialect: str) -> None:
+    if dialect not in SUPPORTED:
+        raise RuntimeError(
+            f"Unsupported database dialect {dialect!r}; expected one of: {', '.join(SUPPORTED)}"
+        )
+
+
+def insert_for(dialect: str) -> Callable:
+    """
+    The dialect's insert(), which supports on_conflict_do_update/do_nothing.
+    """
+    check_supported(dialect)
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
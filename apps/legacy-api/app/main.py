@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+import logging
 import os
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
@@ -8,6 +9,10 @@ from app.db.base import Base
 from app.db.session import engine
 from app.api.api_v1.api import api_router
 from app import models # Ensure models are loaded for create_all
+from app.core.logging_config import setup_logging, shutdown_logging
+
+setup_logging()
+logger = logging.getLogger("app.main")
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -15,25 +20,31 @@ app = FastAPI(
 )
 
 # [SECURITY] Proxy Trust: Render Load Balancer
-# Enforce trust of proxy headers so the app knows it's behind HTTPS.
+# Trust proxy headers so the app knows it's behind HTTPS. Only peers in
+# FORWARDED_ALLOW_IPS may set them; the client is the rightmost untrusted
+# X-Forwarded-For hop, so callers cannot pick their own address. The uvicorn
+# CLI already applies the same rewrite from the same variable; this copy keeps
+# it under other servers (gunicorn workers, hypercorn) and is a no-op after it.
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
-app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=["*"])
+app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=settings.FORWARDED_ALLOW_IPS or "127.0.0.1,::1")
 
-# Logging Middleware
+# Request pipeline: pure ASGI middleware only (no BaseHTTPMiddleware / @app.middleware),
+# so there is no per-request task hop and streaming responses pass straight through.
+# Last added runs first: CORS -> query metrics -> access log -> tenant -> proxy headers.
 from fastapi import Request
-import logging
+from app.middleware.tenant import TenantMiddleware
+from app.middleware.access_log import AccessLogMiddleware
+from app.middleware.query_metrics import QueryMetricsMiddleware
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    # Basic request logging
-    print(f"Incoming Request: {request.method} {request.url.path}")
-    response = await call_next(request)
-    print(f"Response Status: {response.status_code}")
-    return response
+# Resolves the tenant once and publishes it to deps via scope state / tenant_context
+app.add_middleware(TenantMiddleware)
+app.add_middleware(AccessLogMiddleware)
+# Per-route SQL statement counts / timings (see /api/v1/debug/query-stats)
+if settings.QUERY_METRICS_ENABLED:
+    app.add_middleware(QueryMetricsMiddleware)
 
 # Set all CORS enabled origins
 # Custom CORS Middleware for Vercel Previews
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
 import re
 
@@ -47,6 +58,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Query-Count", "X-Query-Time-Ms", "X-Response-Time-Ms", "X-Query-Budget"],
 ) 
 
 
@@ -55,8 +67,17 @@ app.add_middleware(
 
 @app.on_event("startup")
 async def startup_event():
+    setup_logging()
+    from app.core import revocations
+    from app.db import dialects
+    revocations.check_settings()
+    dialects.check_supported(engine.dialect.name)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # Full-text index lives outside the ORM metadata (tsvector / FTS5)
+        from app.services import search
+        backend = await search.ensure_schema(conn)
+        logger.info("Search backend ready", extra={"backend": backend})
     
     # Run Seeder
     from app.db.session import AsyncSessionLocal
@@ -67,7 +88,36 @@ async def startup_event():
             # AUTO-MIGRATION: Fix Remote DB Roles to Lowercase
             from sqlalchemy import text, select
             await db.execute(text("UPDATE users SET role = lower(role)"))
-            await db.execute(text("UPDATE work_orders SET status = lower(status)"))
+            # Same as migration 0001: list/export filters compare both exactly
+            await db.execute(text(
+                "UPDATE work_orders SET status = lower(status), priority = lower(priority) "
+                "WHERE status <> lower(status) OR priority <> lower(priority)"
+            ))
+            # Same as migration 0008: cursor pagination needs created_at
+            for table in ("work_orders", "users", "assets", "inventory_items", "pm_schedules"):
+                await db.execute(text(
+                    f"UPDATE {table} SET created_at = coalesce(updated_at, '1970-01-01 00:00:00') "
+                    "WHERE created_at IS NULL"
+                ))
+
+            # Seed dashboard counters on first boot after they were introduced
+            from app.services import work_order_counters
+            if await work_order_counters.counters_missing(db):
+                logger.info("Building work order counters")
+                await work_order_counters.rebuild_counters(db)
+                await db.commit()
+
+            from app.services import asset_status
+            if await asset_status.counters_missing(db):
+                logger.info("Building asset work order counters")
+                await asset_status.rebuild_asset_counters(db)
+                await db.commit()
+
+            if await search.index_empty(db):
+                indexed = await search.reindex_all(db)
+                await db.commit()
+                if indexed:
+                    logger.info("Indexed records for search", extra={"count": indexed})
             
             # --- AUTO-REPAIR: Ensure Valid Connection State ---
             # 1. Ensure Tenant
@@ -75,7 +125,7 @@ async def startup_event():
             res_tenant = await db.execute(stmt_tenant)
             tenant = res_tenant.scalars().first()
             if not tenant:
-                print("STARTUP: Creating default 'Acme Corp' tenant...")
+                logger.info("Creating default 'Acme Corp' tenant")
                 tenant = models.Tenant(name="Acme Corp", slug="default", plan="enterprise")
                 db.add(tenant)
                 await db.commit()
@@ -90,12 +140,12 @@ async def startup_event():
             if user:
                 # Force link to tenant if missing or wrong
                 if user.tenant_id != tenant.id:
-                    print(f"STARTUP: Fixing Admin Tenant Link ({user.tenant_id} -> {tenant.id})")
+                    logger.info("Fixing admin tenant link", extra={"from_tenant": str(user.tenant_id), "to_tenant": str(tenant.id)})
                     user.tenant_id = tenant.id
                     db.add(user)
                     await db.commit()
             else:
-                 print("STARTUP: Creating Admin User...")
+                 logger.info("Creating admin user")
                  user = models.User(
                     email="admin@example.com",
                     password_hash=get_password_hash("admin123"),
@@ -110,7 +160,29 @@ async def startup_event():
 
             await db.commit()
         except Exception as e:
-            print(f"Startup Logic failed: {e}")
+            logger.exception("Startup logic failed")
+
+    # Post-write side effects (counters, asset status, search, notifications)
+    if settings.OUTBOX_DISPATCHER_ENABLED:
+        from app.services import outbox
+        outbox.start_dispatcher()
+    # Due PM schedules become work orders
+    if settings.PM_SCHEDULER_ENABLED:
+        from app.services import pm_scheduler
+        pm_scheduler.start_scheduler()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from app.services import pm_scheduler
+    await pm_scheduler.stop_scheduler()
+    # Undispatched outbox events stay in the table for the next start
+    from app.services import outbox
+    await outbox.stop_dispatcher()
+    # End open event streams and stop the cross-worker relay
+    from app.core import events
+    await events.get_broker().close()
+    # Drain queued log records before the process exits
+    shutdown_logging()
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -125,11 +197,7 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 from fastapi.responses import JSONResponse
 @app.exception_handler(Exception)
 async def debug_exception_handler(request: Request, exc: Exception):
-    import traceback
-    import sys
-    print(f"DEBUG EXCEPTION CAUGHT: {exc}", file=sys.stderr)
-    traceback.print_exc(file=sys.stderr)
-    sys.stderr.flush()
+    logger.error("Unhandled exception", exc_info=exc, extra={"method": request.method, "path": request.url.path})
     return JSONResponse(
         status_code=500,
         content={"message": f"Debug Error: {exc}"},
@@ -0,0 +1,66 @@
+import logging
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core import query_metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def route_template(scope) -> str:
+    """
+    "/api/v1/work-orders/<uuid>" -> "/api/v1/work-orders/{work_order_id}".
+    Rebuilt from the path params because included routers only know their
+    own suffix. Unmatched paths collapse into one key to bound cardinality.
+    """
+    if scope.get("route") is None:
+        return "<unmatched>"
+    params = {str(value): name for name, value in (scope.get("path_params") or {}).items()}
+    if not params:
+        return scope["path"]
+    return "/".join("{%s}" % params[s] if s in params else s for s in scope["path"].split("/"))
+
+
+class QueryMetricsMiddleware:
+    """
+    Counts and times the SQL issued by each request and aggregates it per
+    route template. Adds X-Query-* headers when QUERY_METRICS_HEADERS is on;
+    those reflect the statements issued before the response started.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.QUERY_METRICS_HEADERS:
+                headers = MutableHeaders(scope=message)
+                headers["X-Query-Count"] = str(stats.count)
+                headers["X-Query-Time-Ms"] = f"{stats.duration * 1000:.2f}"
+                headers["X-Response-Time-Ms"] = f"{(time.perf_counter() - start) * 1000:.2f}"
+                budget = query_metrics.budget_for(scope.get("endpoint"))
+                if budget is not None:
+                    headers["X-Query-Budget"] = str(budget)
+            await send(message)
+
+        with query_metrics.track_queries() as stats:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                elapsed = time.perf_counter() - start
+                # Routing has filled in the matched route by now
+                route_key = f"{scope['method']} {route_template(scope)}"
+                budget = query_metrics.budget_for(scope.get("endpoint"))
+                query_metrics.route_metrics.record(route_key, stats, elapsed, budget)
+                if budget is not None and stats.count > budget:
+                    logger.warning(
+                        "Query budget exceeded",
+                        extra={"route": route_key, "queries": stats.count, "budget": budget},
+                    )
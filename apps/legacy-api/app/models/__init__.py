@@ -1,3 +1,3 @@
 from app.models.tenant import Tenant
 from app.models.user import User, UserRole
-from app.models.core import Asset, WorkOrder, TenantTheme, InventoryItem, PMSchedule, Page, AssetStatus, WorkOrderStatus, WorkOrderSession
+from app.models.core import Asset, WorkOrder, TenantTheme, InventoryItem, PMSchedule, PMOccurrence, Page, AssetStatus, WorkOrderStatus, WorkOrderSession, WorkOrderCounter, WorkOrderDailyCounter, AssetWorkOrderCounter, CollectionVersion, WorkOrderTombstone, OutboxEvent
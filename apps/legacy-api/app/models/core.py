@@ -1,8 +1,8 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, ForeignKey, Text, Enum, DateTime, Integer, Numeric, JSON
+from sqlalchemy import Column, String, Boolean, ForeignKey, Text, Enum, DateTime, Date, Integer, Numeric, JSON, Index
 from sqlalchemy import Uuid as UUID # Generic UUID
 from sqlalchemy.dialects.postgresql import JSONB # We might need to replace JSONB too if using SQLite
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from app.db.base import Base
 import enum
 from datetime import datetime
@@ -59,6 +59,10 @@ class WorkOrder(Base):
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
 
+    # Set on work orders generated from a PM schedule occurrence
+    pm_schedule_id = Column(UUID(as_uuid=True), ForeignKey("pm_schedules.id", ondelete="SET NULL"), nullable=True)
+    pm_due_at = Column(DateTime, nullable=True)
+
     # Relationships
     asset = relationship("Asset")
     reported_by = relationship("User", foreign_keys=[reported_by_user_id])
@@ -68,6 +72,62 @@ class WorkOrder(Base):
     # Active Sessions
     active_sessions = relationship("WorkOrderSession", back_populates="work_order", cascade="all, delete-orphan")
 
+    # Filters compare status/priority directly (no lower()) so these can be used.
+    # Mirrored by alembic revision 0001_work_order_indexes for existing databases.
+    __table_args__ = (
+        Index("ix_work_orders_tenant_status_created", "tenant_id", "status", "created_at"),
+        Index("ix_work_orders_tenant_asset_status", "tenant_id", "asset_id", "status"),
+        Index("ix_work_orders_tenant_created", "tenant_id", "created_at"),
+        # Delta sync feed; see alembic revision 0003_work_order_sync
+        Index("ix_work_orders_tenant_updated", "tenant_id", "updated_at", "id"),
+        # One work order per PM occurrence; see alembic revision 0005_pm_scheduler
+        Index("uq_work_orders_pm_occurrence", "pm_schedule_id", "pm_due_at", unique=True),
+    )
+
+    @validates("status", "priority")
+    def normalize_case(self, key, value):
+        # Stored lowercase at write time; see WorkOrderCreate/WorkOrderUpdate
+        if isinstance(value, str):
+            return value.lower()
+        return value
+
+class WorkOrderCounter(Base):
+    """
+    Materialized per-tenant work order counts by (status, priority).
+    Eventually consistent: applied by the outbox dispatcher from the events
+    work order writes record (services.work_order_events, services.outbox);
+    see services.work_order_counters.
+    """
+    __tablename__ = "work_order_counters"
+
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), primary_key=True)
+    status = Column(String, primary_key=True)
+    priority = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class WorkOrderDailyCounter(Base):
+    """
+    Completions per tenant per (UTC) day of completed_at, for the dashboard's "completed today".
+    """
+    __tablename__ = "work_order_daily_counters"
+
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    completed = Column(Integer, nullable=False, default=0)
+
+class AssetWorkOrderCounter(Base):
+    """
+    Open work orders per asset, so the asset's status can be derived without
+    rescanning its work orders. Eventually consistent, applied from the outbox
+    like WorkOrderCounter.
+    """
+    __tablename__ = "asset_work_order_counters"
+
+    asset_id = Column(UUID(as_uuid=True), ForeignKey("assets.id", ondelete="CASCADE"), primary_key=True)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False, index=True)
+    open_count = Column(Integer, nullable=False, default=0)
+    open_critical_count = Column(Integer, nullable=False, default=0)
+
 class WorkOrderSession(Base):
     __tablename__ = "work_order_sessions"
     
@@ -117,18 +177,52 @@ class PMSchedule(Base):
     description = Column(Text, nullable=True)
     frequency_type = Column(String, default="days") # days, weeks, months, years
     frequency_interval = Column(Integer, default=1)
+    # Occurrence 0 of the recurrence (services.recurrence). Set on create and
+    # when next_due or the frequency changes; NULL (not yet pinned) means next_due
+    recurrence_anchor = Column(DateTime, nullable=True)
     
     last_performed = Column(DateTime, nullable=True)
     next_due = Column(DateTime, nullable=True)
     
     assigned_to_user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     is_active = Column(Boolean, default=True)
+    # Labour per occurrence, for the workload forecast
+    estimated_hours = Column(Numeric(8, 2), nullable=True)
+    # The next_due the scheduler last generated a work order for
+    generated_through = Column(DateTime, nullable=True)
+    # How far ahead pm_occurrences holds this schedule's occurrences
+    occurrences_through = Column(DateTime, nullable=True)
 
     # Relationships
     asset = relationship("Asset")
     assigned_to = relationship("User")
     logs = relationship("PMLog", back_populates="pm_schedule", cascade="all, delete-orphan")
 
+    # Due-schedule scan; see services.pm_scheduler. Stale-occurrence scan; see services.pm_occurrences
+    __table_args__ = (
+        Index("ix_pm_schedules_tenant_active_due", "tenant_id", "is_active", "next_due"),
+        Index("ix_pm_schedules_occurrences_through", "occurrences_through"),
+    )
+
+class PMOccurrence(Base):
+    """
+    One upcoming occurrence of an active PM schedule, with the schedule's
+    asset, technician and hours copied on for the workload forecast.
+    Rewritten whenever the schedule changes; see services.pm_occurrences.
+    """
+    __tablename__ = "pm_occurrences"
+
+    pm_schedule_id = Column(UUID(as_uuid=True), ForeignKey("pm_schedules.id", ondelete="CASCADE"), primary_key=True)
+    due_at = Column(DateTime, primary_key=True)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
+    asset_id = Column(UUID(as_uuid=True), nullable=True)
+    assigned_to_user_id = Column(UUID(as_uuid=True), nullable=True)
+    estimated_hours = Column(Numeric(8, 2), nullable=True)
+
+    __table_args__ = (
+        Index("ix_pm_occurrences_tenant_due", "tenant_id", "due_at"),
+    )
+
 class PMLog(Base):
     __tablename__ = "pm_logs"
     
@@ -151,3 +245,51 @@ class Page(Base):
     key = Column(String, nullable=False)
     layout_json = Column(JSON, default={}) # Switched to generic JSON
     is_system_default = Column(Boolean, default=False)
+
+class CollectionVersion(Base):
+    """
+    Per-tenant change counter for a collection ("work_orders", "assets", ...),
+    bumped in the same transaction as every write. Backs ETags on the polled
+    read endpoints; see services.collection_versions.
+    """
+    __tablename__ = "collection_versions"
+
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), primary_key=True)
+    collection = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class WorkOrderTombstone(Base):
+    """
+    Left behind by a deleted work order so delta sync (/work-orders/changes)
+    can tell clients to drop it. Purged after SYNC_TOMBSTONE_RETENTION_DAYS.
+    """
+    __tablename__ = "work_order_tombstones"
+
+    work_order_id = Column(UUID(as_uuid=True), primary_key=True)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_work_order_tombstones_tenant_deleted", "tenant_id", "deleted_at"),
+    )
+
+class OutboxEvent(Base):
+    """
+    A committed change whose side effects (counters, asset status, search,
+    notifications) still have to run. Written in the same transaction as the
+    change and deleted once dispatched; see services.outbox.
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
+    event_type = Column(String, nullable=False)
+    aggregate_id = Column(UUID(as_uuid=True), nullable=True)
+    payload = Column(JSON, nullable=False, default=dict)
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_outbox_events_available", "available_at"),
+    )
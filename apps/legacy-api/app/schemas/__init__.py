@@ -1,5 +1,6 @@
 from .token import Token, TokenPayload
 from .user import User, UserCreate, UserUpdate
 from .tenant import Tenant, TenantCreate, TenantUpdate, TenantThemeUpdate
-from .work_order import WorkOrder, WorkOrderCreate, WorkOrderUpdate, WorkOrderStats
+from .work_order import WorkOrder, WorkOrderCreate, WorkOrderUpdate, WorkOrderStats, WorkOrderImportResult, WorkOrderChanges
 from .page import Page, PageCreate, PageUpdate
+from .search import SearchHit
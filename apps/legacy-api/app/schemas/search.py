@@ -0,0 +1,7 @@
+from pydantic import BaseModel, UUID4
+
+class SearchHit(BaseModel):
+    type: str # work_order, asset, inventory_item
+    id: UUID4
+    title: str
+    score: float
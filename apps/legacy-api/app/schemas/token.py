@@ -8,3 +8,6 @@ class Token(BaseModel):
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
     tenant_id: Optional[str] = None
+    role: Optional[str] = None
+    is_active: Optional[bool] = None
+    iat: Optional[int] = None
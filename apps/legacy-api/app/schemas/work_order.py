@@ -29,6 +29,13 @@ class WorkOrderUpdate(WorkOrderBase):
     signed_by_name: Optional[str] = None
     completed_at: Optional[datetime] = None # Allow manual override
 
+    @field_validator('status', 'priority', mode='before', check_fields=False)
+    @classmethod
+    def normalize_fields(cls, v):
+        if isinstance(v, str):
+            return v.lower()
+        return v
+
 from .user import User
 
 class WorkOrderSession(BaseModel):
@@ -58,6 +65,7 @@ class WorkOrder(WorkOrderBase):
     work_order_number: Optional[str] = None
     created_at: datetime
     completed_at: Optional[datetime] = None
+    pm_schedule_id: Optional[UUID4] = None # Generated from this PM schedule
     
     # Nested relationships for display
     assigned_to: Optional[User] = None
@@ -81,3 +89,27 @@ class WorkOrderStats(BaseModel):
     total: int
     by_status: dict
     by_priority: dict
+
+class WorkOrderImportError(BaseModel):
+    line: int
+    error: str
+
+class WorkOrderImportResult(BaseModel):
+    created: int
+    skipped: int
+    assets_updated: int
+    errors: List[WorkOrderImportError] = []
+
+    class Config:
+        from_attributes = True
+
+class WorkOrderTombstone(BaseModel):
+    id: UUID4
+    deleted_at: datetime
+
+class WorkOrderChanges(BaseModel):
+    changes: List[WorkOrder]
+    deleted: List[WorkOrderTombstone]
+    # Pass back as `since` on the next request
+    next_since: str
+    has_more: bool
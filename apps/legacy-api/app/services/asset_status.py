@@ -0,0 +1,180 @@
+"""
+Incremental asset status maintenance.
+
+Each asset keeps counts of its open and open-critical work orders in
+asset_work_order_counters. Deltas from work order writes arrive through the
+outbox (services.work_order_events) or directly from bulk imports; the asset's
+status is re-derived from the counters without loading any work orders.
+"""
+import uuid
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import case, delete, exists, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+from app.db import dialects
+from app.services import collection_versions
+
+CLOSED_STATUSES = ("completed", "cancelled")
+
+# (asset_id, is_critical) for an open work order attached to an asset
+AssetKey = Tuple[uuid.UUID, bool]
+
+
+def asset_key(wo: models.WorkOrder) -> Optional[AssetKey]:
+    if not wo.asset_id or (wo.status or "").lower() in CLOSED_STATUSES:
+        return None
+    return wo.asset_id, (wo.priority or "").lower() == "critical"
+
+
+def derive_status(open_count: int, open_critical_count: int) -> str:
+    if open_critical_count > 0:
+        return models.AssetStatus.breakdown.value
+    if open_count > 0:
+        return models.AssetStatus.running_with_issues.value
+    return models.AssetStatus.healthy.value
+
+
+def _insert(db: AsyncSession):
+    return dialects.insert_for(db.bind.dialect.name)
+
+
+async def _bump(db: AsyncSession, tenant_id: uuid.UUID, asset_id: uuid.UUID, d_open: int, d_critical: int) -> Tuple[int, int]:
+    counter = models.AssetWorkOrderCounter
+    stmt = _insert(db)(counter).values(
+        asset_id=asset_id,
+        tenant_id=tenant_id,
+        open_count=max(d_open, 0),
+        open_critical_count=max(d_critical, 0),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["asset_id"],
+        set_={
+            "open_count": counter.open_count + d_open,
+            "open_critical_count": counter.open_critical_count + d_critical,
+        },
+    ).returning(counter.open_count, counter.open_critical_count)
+    result = await db.execute(stmt)
+    return tuple(result.one())
+
+
+async def apply_asset_delta(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    before: Optional[AssetKey],
+    after: Optional[AssetKey],
+) -> None:
+    """
+    Move one work order between asset buckets and refresh affected asset statuses.
+    Pass before=None for inserts and after=None for deletes.
+    """
+    if before == after:
+        return
+
+    deltas: Dict[uuid.UUID, List[int]] = {}
+    accumulate(deltas, before, -1)
+    accumulate(deltas, after, 1)
+    await apply_asset_deltas(db, tenant_id, deltas)
+
+
+def accumulate(deltas: Dict[uuid.UUID, List[int]], key: Optional[AssetKey], sign: int = 1) -> None:
+    """
+    Fold one work order's asset key into per-asset [open, critical] deltas.
+    """
+    if key is None:
+        return
+    asset_id, critical = key
+    d = deltas.setdefault(asset_id, [0, 0])
+    d[0] += sign
+    d[1] += sign if critical else 0
+
+
+async def apply_asset_deltas(db: AsyncSession, tenant_id: uuid.UUID, deltas: Dict[uuid.UUID, List[int]]) -> None:
+    """
+    Apply accumulated deltas: one counter upsert and at most one status update per asset.
+    """
+    status_changed = False
+    for asset_id, (d_open, d_critical) in deltas.items():
+        if not d_open and not d_critical:
+            continue
+        open_count, open_critical_count = await _bump(db, tenant_id, asset_id, d_open, d_critical)
+        new_status = derive_status(open_count, open_critical_count)
+        # Only touches the row (and any loaded Asset) when the status actually changes
+        result = await db.execute(
+            update(models.Asset)
+            .where(
+                models.Asset.id == asset_id,
+                models.Asset.tenant_id == tenant_id,
+                models.Asset.status != new_status,
+            )
+            .values(status=new_status)
+        )
+        status_changed = status_changed or result.rowcount > 0
+    if status_changed:
+        # Core update, invisible to the flush hook
+        collection_versions.bump(db, tenant_id, collection_versions.ASSETS)
+
+
+async def rebuild_asset_counters(db: AsyncSession, tenant_id: Optional[uuid.UUID] = None) -> None:
+    """
+    Recompute all asset counters and statuses from work_orders. Caller commits.
+    """
+    wo = models.WorkOrder
+    counter = models.AssetWorkOrderCounter
+    is_open = func.lower(wo.status).notin_(CLOSED_STATUSES)
+
+    counter_del = delete(counter)
+    counts_q = (
+        select(
+            wo.asset_id,
+            wo.tenant_id,
+            func.count(wo.id),
+            func.sum(case((func.lower(wo.priority) == "critical", 1), else_=0)),
+        )
+        .where(wo.asset_id.isnot(None), is_open)
+        .group_by(wo.asset_id, wo.tenant_id)
+    )
+    if tenant_id:
+        counter_del = counter_del.where(counter.tenant_id == tenant_id)
+        counts_q = counts_q.where(wo.tenant_id == tenant_id)
+
+    await db.execute(counter_del)
+    rows = (await db.execute(counts_q)).all()
+    if rows:
+        db.add_all([
+            counter(asset_id=a, tenant_id=t, open_count=n, open_critical_count=c or 0)
+            for a, t, n, c in rows
+        ])
+        await db.flush()
+
+    # Re-derive every asset's status from its counter row in one statement
+    has_critical = exists().where(counter.asset_id == models.Asset.id, counter.open_critical_count > 0)
+    has_open = exists().where(counter.asset_id == models.Asset.id, counter.open_count > 0)
+    status_q = update(models.Asset).values(
+        status=case(
+            (has_critical, models.AssetStatus.breakdown.value),
+            (has_open, models.AssetStatus.running_with_issues.value),
+            else_=models.AssetStatus.healthy.value,
+        )
+    ).execution_options(synchronize_session=False)
+    if tenant_id:
+        status_q = status_q.where(models.Asset.tenant_id == tenant_id)
+    await db.execute(status_q)
+    if tenant_id:
+        collection_versions.bump(db, tenant_id, collection_versions.ASSETS)
+    else:
+        await collection_versions.bump_all(db, collection_versions.ASSETS)
+
+
+async def counters_missing(db: AsyncSession) -> bool:
+    """
+    True when open work orders reference assets but no counters were ever built.
+    """
+    has_counters = await db.execute(select(models.AssetWorkOrderCounter.asset_id).limit(1))
+    if has_counters.first():
+        return False
+    has_open = await db.execute(
+        select(models.WorkOrder.id)
+        .where(models.WorkOrder.asset_id.isnot(None), models.WorkOrder.status.notin_(CLOSED_STATUSES))
+        .limit(1)
+    )
+    return has_open.first() is not None
@@ -0,0 +1,120 @@
+"""
+Incremental CSV / NDJSON readers and writers for bulk endpoints.
+
+Readers consume an async byte stream (e.g. Request.stream()) and yield one
+(line_number, record) pair at a time, so request size never determines
+memory use. Writers turn dicts into encoded lines for StreamingResponse.
+"""
+import codecs
+import csv
+import io
+import json
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+
+FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+class RecordError(ValueError):
+    def __init__(self, line: int, message: str):
+        super().__init__(message)
+        self.line = line
+        self.message = message
+
+
+def detect_format(explicit: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    if explicit:
+        return explicit if explicit in FORMATS else None
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        return "ndjson"
+    return None
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # Incremental decoding so multi-byte characters may straddle chunks
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, dict]]:
+    line_no = 0
+    async for line in _lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise RecordError(line_no, f"Invalid JSON: {e}")
+        if not isinstance(record, dict):
+            raise RecordError(line_no, "Each line must be a JSON object")
+        yield line_no, record
+
+
+async def iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, dict]]:
+    """
+    Header row first. Quoted fields may contain newlines: physical lines are
+    grouped until the quotes balance, then parsed as one record. Empty cells
+    become None.
+    """
+    header: Optional[List[str]] = None
+    buffered: List[str] = []
+    quotes = 0
+    line_no = 0
+    record_line = 0
+    async for line in _lines(chunks):
+        line_no += 1
+        if not buffered:
+            record_line = line_no
+        buffered.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        text, buffered, quotes = "".join(buffered), [], 0
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader(io.StringIO(text)))
+        except csv.Error as e:
+            raise RecordError(record_line, f"Invalid CSV: {e}")
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        if len(values) > len(header):
+            raise RecordError(record_line, f"Expected {len(header)} columns, got {len(values)}")
+        yield record_line, {k: (v if v != "" else None) for k, v in zip(header, values)}
+    if buffered:
+        raise RecordError(record_line, "Unterminated quoted field")
+
+
+def iter_records(fmt: str, chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, dict]]:
+    return iter_csv(chunks) if fmt == "csv" else iter_ndjson(chunks)
+
+
+def _csv_value(value) -> str:
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def csv_line(values: Iterable) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\n").writerow([_csv_value(v) for v in values])
+    return buf.getvalue().encode("utf-8")
+
+
+def ndjson_line(record: dict) -> bytes:
+    return (json.dumps(record, default=str, separators=(",", ":")) + "\n").encode("utf-8")
@@ -0,0 +1,137 @@
+"""
+Per-tenant collection version counters for conditional GETs.
+
+Every flush that inserts, changes or deletes a tracked entity marks its
+tenant's collection as changed from an ORM after_flush hook. Core writes
+(imports, asset status updates) bypass the hook and call bump() themselves.
+The marks are written as one upsert just before the transaction commits, so
+a version is never seen before the data it describes, and the hot per-tenant
+version rows stay locked only for the end of the transaction.
+
+Read endpoints derive their ETag from the versions of the collections their
+response is built from; see app.api.conditional.
+"""
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import bindparam, event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app import models
+from app.db import dialects
+
+_PENDING = "collection_versions.pending"
+
+WORK_ORDERS = "work_orders"
+ASSETS = "assets"
+USERS = "users"
+TENANT = "tenant"
+PAGES = "pages"
+INVENTORY = "inventory"
+PM_SCHEDULES = "pm_schedules"
+
+_COLLECTION_BY_MODEL = {
+    models.WorkOrder: WORK_ORDERS,
+    models.WorkOrderSession: WORK_ORDERS,
+    models.Asset: ASSETS,
+    models.User: USERS,
+    models.Tenant: TENANT,
+    models.TenantTheme: TENANT,
+    models.Page: PAGES,
+    models.InventoryItem: INVENTORY,
+    models.PMSchedule: PM_SCHEDULES,
+}
+
+
+def _upsert(dialect: str):
+    insert = dialects.insert_for(dialect)
+    cv = models.CollectionVersion
+    stmt = insert(cv).values(
+        tenant_id=bindparam("tenant_id"),
+        collection=bindparam("collection"),
+        version=1,
+        updated_at=bindparam("now"),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=["tenant_id", "collection"],
+        set_={"version": cv.version + 1, "updated_at": stmt.excluded.updated_at},
+    )
+
+
+def _params(pairs: Iterable[Tuple[uuid.UUID, str]]) -> list:
+    # Sorted so concurrent writers lock version rows in the same order
+    now = datetime.utcnow()
+    return [{"tenant_id": tenant_id, "collection": collection, "now": now} for tenant_id, collection in sorted(pairs, key=str)]
+
+
+def bump(db: AsyncSession, tenant_id: uuid.UUID, *collections: str) -> None:
+    """
+    Mark collections changed by a Core write the flush hook cannot see.
+    Written when the caller commits.
+    """
+    db.info.setdefault(_PENDING, set()).update((tenant_id, c) for c in collections)
+
+
+async def bump_all(db: AsyncSession, collection: str) -> None:
+    """
+    Bump `collection` for every tenant right away, e.g. after a repair
+    script rewrote it.
+    """
+    cv = models.CollectionVersion
+    await db.execute(
+        update(cv)
+        .where(cv.collection == collection)
+        .values(version=cv.version + 1, updated_at=datetime.utcnow())
+    )
+
+
+async def read(db: AsyncSession, tenant_id: uuid.UUID, collections: Iterable[str]) -> Tuple[Dict[str, int], Optional[datetime]]:
+    """
+    Current versions (0 if never written) and the latest change time among them.
+    """
+    cv = models.CollectionVersion
+    collections = tuple(collections)
+    rows = (await db.execute(
+        select(cv.collection, cv.version, cv.updated_at)
+        .where(cv.tenant_id == tenant_id, cv.collection.in_(collections))
+    )).all()
+    versions = {c: 0 for c in collections}
+    last_modified = None
+    for collection, version, updated_at in rows:
+        versions[collection] = version
+        if updated_at and (last_modified is None or updated_at > last_modified):
+            last_modified = updated_at
+    return versions, last_modified
+
+
+def _tenant_of(obj) -> Optional[uuid.UUID]:
+    return obj.id if isinstance(obj, models.Tenant) else getattr(obj, "tenant_id", None)
+
+
+def _mark_changed(session: Session, flush_context) -> None:
+    pending = session.info.setdefault(_PENDING, set())
+    for objects, check in ((session.new, False), (session.dirty, True), (session.deleted, False)):
+        for obj in objects:
+            collection = _COLLECTION_BY_MODEL.get(type(obj))
+            if not collection or (check and not session.is_modified(obj, include_collections=False)):
+                continue
+            tenant_id = _tenant_of(obj)
+            if tenant_id:
+                pending.add((tenant_id, collection))
+
+
+def _write_pending(session: Session) -> None:
+    # Commit flushes after before_commit runs; flush first so nothing is missed
+    session.flush()
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        session.connection().execute(_upsert(session.get_bind().dialect.name), _params(pending))
+
+
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+event.listen(Session, "after_flush", _mark_changed)
+event.listen(Session, "before_commit", _write_pending)
+event.listen(Session, "after_rollback", _discard_pending)
@@ -0,0 +1,292 @@
+"""
+Transactional outbox for post-write side effects.
+
+Writers call add() inside the transaction that makes the change, so an event
+exists exactly when the change committed, and the request does none of the
+follow-up work itself. A Dispatcher task on every worker claims pending events
+in batches and runs the registered consumers:
+
+  - transactional consumers (counters, asset status, search index) run in
+    the transaction that deletes the claimed events, so a retried batch never
+    applies its effects twice;
+  - after-commit consumers (push notifications) run once that transaction
+    has committed, best effort.
+
+When a batch fails it is retried one event at a time, so a bad event cannot
+hold up the rest. A failing event backs off exponentially and is parked after
+OUTBOX_MAX_ATTEMPTS, kept with its last_error for inspection. Events within
+a batch are not ordered per entity, so consumers must not depend on order.
+
+A commit that wrote events wakes the local dispatcher at once. Otherwise it
+polls every OUTBOX_POLL_SECONDS, which picks up other workers' events and
+retries. On PostgreSQL, batches are claimed with FOR UPDATE SKIP LOCKED so
+workers never share an event. SQLite cannot lock rows, so two workers may
+read the same batch. Whichever deletes fewer events than it claimed (another
+worker got there first) rolls its batch back, so effects still apply once.
+"""
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+from sqlalchemy import delete, event, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app import models
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WROTE = "outbox.wrote"
+
+# How long stop() waits for the batch in flight before cancelling it
+_STOP_TIMEOUT_SECONDS = 10.0
+
+Handler = Callable[[AsyncSession, List[models.OutboxEvent]], Awaitable[None]]
+
+
+@dataclass
+class Consumer:
+    name: str
+    event_types: Tuple[str, ...]
+    handle: Handler
+    after_commit: bool = False
+
+
+_consumers: List[Consumer] = []
+
+
+def register(name: str, event_types: Sequence[str], handle: Handler, after_commit: bool = False) -> None:
+    """
+    Run `handle(db, events)` for each dispatched batch containing any of
+    `event_types`. Transactional handlers must not commit.
+    """
+    _consumers.append(Consumer(name, tuple(event_types), handle, after_commit))
+
+
+def add(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    event_type: str,
+    aggregate_id: Optional[uuid.UUID] = None,
+    payload: Optional[dict] = None,
+) -> None:
+    """
+    Queue an event in the caller's transaction; dispatched after it commits.
+    """
+    db.add(models.OutboxEvent(
+        tenant_id=tenant_id,
+        event_type=event_type,
+        aggregate_id=aggregate_id,
+        payload=payload or {},
+    ))
+    db.info[_WROTE] = True
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(2 ** attempts, settings.OUTBOX_MAX_BACKOFF_SECONDS))
+
+
+class Dispatcher:
+    def __init__(self, session_factory, batch_size: int, poll_seconds: float, max_attempts: int):
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Finish the batch in flight and exit. Cancelling mid-query would leave
+        its connection to be invalidated.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        try:
+            await asyncio.wait_for(self._task, _STOP_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning("Outbox dispatcher cancelled mid-batch at shutdown")
+        self._task = None
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                claimed = await self.run_once()
+            except Exception:
+                logger.exception("Outbox dispatch failed")
+                claimed = 0
+            if self._stopping:
+                break
+            if claimed >= self.batch_size:
+                continue  # more waiting
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def run_once(self) -> int:
+        """
+        Dispatch one batch. Returns how many events were claimed.
+        """
+        async with self._session_factory() as db:
+            batch = await self._claim(db)
+            claimed = [(e.id, e.attempts) for e in batch]
+            if not batch or await self._apply(db, batch, claimed) or len(claimed) == 1:
+                return len(claimed)
+        # Isolate the failure: retry each event on its own
+        for event_id, _ in claimed:
+            async with self._session_factory() as db:
+                batch = await self._claim(db, event_id)
+                if batch:
+                    await self._apply(db, batch, [(batch[0].id, batch[0].attempts)])
+        return len(claimed)
+
+    async def _claim(self, db: AsyncSession, event_id: Optional[uuid.UUID] = None) -> List[models.OutboxEvent]:
+        oe = models.OutboxEvent
+        query = (
+            select(oe)
+            .where(oe.available_at <= datetime.utcnow(), oe.attempts < self.max_attempts)
+            .order_by(oe.available_at, oe.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        if event_id is not None:
+            query = query.where(oe.id == event_id)
+        return list((await db.execute(query)).scalars())
+
+    async def _apply(self, db: AsyncSession, batch: List[models.OutboxEvent], claimed: List[Tuple[uuid.UUID, int]]) -> bool:
+        try:
+            await _run_consumers(db, batch, after_commit=False)
+            result = await db.execute(delete(models.OutboxEvent).where(models.OutboxEvent.id.in_([id for id, _ in claimed])))
+            if result.rowcount != len(claimed):
+                # Another worker consumed some of these since we read them
+                # (SQLite has no SKIP LOCKED). Undo our effects; whatever is
+                # left is claimed again on the next pass.
+                await db.rollback()
+                logger.info("Outbox batch already consumed elsewhere", extra={"claimed": len(claimed), "deleted": result.rowcount})
+                return True
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            if len(claimed) == 1:
+                await self._retry_later(db, *claimed[0], e)
+            return False
+        try:
+            await _run_consumers(db, batch, after_commit=True)
+        finally:
+            await db.rollback()
+        return True
+
+    async def _retry_later(self, db: AsyncSession, event_id: uuid.UUID, attempts: int, error: Exception) -> None:
+        attempts += 1
+        if attempts >= self.max_attempts:
+            logger.error("Outbox event parked", extra={"event_id": str(event_id), "attempts": attempts, "error": str(error)})
+        else:
+            logger.warning("Outbox event failed, will retry", extra={"event_id": str(event_id), "attempts": attempts, "error": str(error)})
+        await db.execute(
+            update(models.OutboxEvent)
+            .where(models.OutboxEvent.id == event_id)
+            .values(attempts=attempts, available_at=datetime.utcnow() + _backoff(attempts), last_error=repr(error)[:2000])
+        )
+        await db.commit()
+
+
+async def _run_consumers(db: AsyncSession, batch: List[models.OutboxEvent], after_commit: bool) -> None:
+    for consumer in _consumers:
+        if consumer.after_commit != after_commit:
+            continue
+        events = [e for e in batch if e.event_type in consumer.event_types]
+        if not events:
+            continue
+        if not after_commit:
+            await consumer.handle(db, events)
+            continue
+        # Already committed; a failure here only loses this side effect
+        try:
+            await consumer.handle(db, events)
+        except Exception:
+            logger.exception("Outbox after-commit consumer failed", extra={"consumer": consumer.name})
+
+
+_dispatcher: Optional[Dispatcher] = None
+
+
+def _dispatcher_for(session_factory=None) -> Dispatcher:
+    if session_factory is None:
+        from app.db.session import AsyncSessionLocal
+        session_factory = AsyncSessionLocal
+    return Dispatcher(
+        session_factory,
+        settings.OUTBOX_BATCH_SIZE,
+        settings.OUTBOX_POLL_SECONDS,
+        settings.OUTBOX_MAX_ATTEMPTS,
+    )
+
+
+def start_dispatcher() -> None:
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = _dispatcher_for()
+        _dispatcher.start()
+
+
+async def stop_dispatcher() -> None:
+    global _dispatcher
+    if _dispatcher is not None:
+        await _dispatcher.stop()
+        _dispatcher = None
+
+
+async def drain(session_factory=None) -> int:
+    """
+    Dispatch everything currently due, e.g. from scripts with no running
+    dispatcher. Returns how many events were claimed.
+    """
+    dispatcher = _dispatcher_for(session_factory)
+    total = 0
+    while True:
+        claimed = await dispatcher.run_once()
+        total += claimed
+        if claimed < dispatcher.batch_size:
+            return total
+
+
+async def stats(db: AsyncSession) -> dict:
+    oe = models.OutboxEvent
+    parked = oe.attempts >= settings.OUTBOX_MAX_ATTEMPTS
+    row = (await db.execute(select(
+        func.count().filter(~parked),
+        func.count().filter(parked),
+        func.min(oe.created_at).filter(~parked),
+    ))).one()
+    pending, parked_count, oldest = row
+    return {
+        "pending": pending,
+        "parked": parked_count,
+        "oldest_pending_age_s": round((datetime.utcnow() - oldest).total_seconds(), 3) if oldest else None,
+    }
+
+
+def _wake_dispatcher(session: Session) -> None:
+    if session.info.pop(_WROTE, False) and _dispatcher is not None:
+        _dispatcher.notify()
+
+
+def _discard(session: Session) -> None:
+    session.info.pop(_WROTE, None)
+
+
+event.listen(Session, "after_commit", _wake_dispatcher)
+event.listen(Session, "after_rollback", _discard)
@@ -0,0 +1,119 @@
+"""
+Precomputed PM occurrences for the workload forecast.
+
+pm_occurrences holds each active schedule's occurrences from now (or its
+next_due, if later) up to PM_OCCURRENCE_HORIZON_DAYS ahead. The schedule's
+asset, technician and estimated hours are copied onto every row, so
+/pm-schedules/workload is a few GROUP BYs over one indexed range instead of
+expanding every schedule on each request.
+
+refresh() rewrites a schedule's rows in the transaction that changes it
+(create, update, sign-off). The PM scheduler calls roll_forward() on every
+run. It re-expands schedules whose rows stop short of the horizon, which also
+drops rows that have fallen into the past and backfills schedules never
+indexed.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+from app.core.config import settings
+from app.services import recurrence
+
+# Rows are re-expanded once they cover less than the horizon minus this
+_ROLL_SLACK = timedelta(days=1)
+
+_COLUMNS = (
+    models.PMSchedule.id,
+    models.PMSchedule.tenant_id,
+    models.PMSchedule.asset_id,
+    models.PMSchedule.assigned_to_user_id,
+    models.PMSchedule.estimated_hours,
+    models.PMSchedule.is_active,
+    models.PMSchedule.frequency_type,
+    models.PMSchedule.frequency_interval,
+    models.PMSchedule.recurrence_anchor,
+    models.PMSchedule.next_due,
+)
+
+
+async def clear(db: AsyncSession, schedule_ids: Sequence) -> None:
+    await db.execute(delete(models.PMOccurrence).where(models.PMOccurrence.pm_schedule_id.in_(list(schedule_ids))))
+
+
+async def refresh(db: AsyncSession, schedules: Sequence, now: Optional[datetime] = None) -> None:
+    """
+    Rewrite the rows of `schedules` (PMSchedule objects, or rows with the
+    same columns). Caller commits.
+    """
+    if not schedules:
+        return
+    now = now or datetime.utcnow()
+    until = now + timedelta(days=settings.PM_OCCURRENCE_HORIZON_DAYS)
+    by_id = {s.id: s for s in schedules}
+
+    await clear(db, by_id)
+    active = (recurrence.schedule_series(s) for s in schedules if s.is_active and s.next_due)
+    rows = []
+    for schedule_id, dates in recurrence.occurrences(active, now, until).items():
+        s = by_id[schedule_id]
+        base = {
+            "pm_schedule_id": schedule_id,
+            "tenant_id": s.tenant_id,
+            "asset_id": s.asset_id,
+            "assigned_to_user_id": s.assigned_to_user_id,
+            "estimated_hours": s.estimated_hours,
+            "created_at": now,
+            "updated_at": now,
+        }
+        rows.extend({**base, "due_at": due} for due in dates)
+    if rows:
+        await db.execute(insert(models.PMOccurrence.__table__), rows)
+    await db.execute(
+        update(models.PMSchedule),
+        [{"id": s.id, "occurrences_through": until if s.is_active and s.next_due else None} for s in schedules],
+    )
+
+
+def _stale(threshold: datetime, limit: int):
+    ps = models.PMSchedule
+    return (
+        select(*_COLUMNS)
+        .where(
+            ps.is_active == True,
+            ps.next_due.isnot(None),
+            or_(ps.occurrences_through.is_(None), ps.occurrences_through < threshold),
+        )
+        .order_by(ps.occurrences_through, ps.id)
+        .limit(limit)
+        .with_for_update(of=ps, skip_locked=True)
+    )
+
+
+async def roll_forward(session_factory=None, now: Optional[datetime] = None, stop: Optional[asyncio.Event] = None) -> int:
+    """
+    Re-expand schedules whose rows no longer reach the horizon, in batches,
+    committing per batch, until done, out of time or `stop` is set. Returns
+    how many schedules were refreshed.
+    """
+    if session_factory is None:
+        from app.db.session import AsyncSessionLocal
+        session_factory = AsyncSessionLocal
+    started = time.monotonic()
+    now = now or datetime.utcnow()
+    threshold = now + timedelta(days=settings.PM_OCCURRENCE_HORIZON_DAYS) - _ROLL_SLACK
+    refreshed = 0
+    while time.monotonic() - started <= settings.PM_SCHEDULER_TIME_BUDGET_SECONDS and not (stop and stop.is_set()):
+        async with session_factory() as db:
+            schedules = (await db.execute(_stale(threshold, settings.PM_SCHEDULER_BATCH_SIZE))).all()
+            if not schedules:
+                break
+            await refresh(db, schedules, now)
+            await db.commit()
+        refreshed += len(schedules)
+        if len(schedules) < settings.PM_SCHEDULER_BATCH_SIZE:
+            break
+    return refreshed
@@ -0,0 +1,208 @@
+"""
+Turns due PM schedules into work orders.
+
+Each run walks tenants and, per tenant, takes batches of active schedules due
+within the horizon (now + PM_SCHEDULER_HORIZON_HOURS) that have no work order
+for their current next_due yet. The scan is a range on
+ix_pm_schedules_tenant_active_due. Each batch creates its work orders with one
+multi-row insert, records the outbox events that update counters, asset status,
+search and notifications, and moves the schedules' generated_through watermark
+to next_due, all in one transaction.
+
+Generation is idempotent. The watermark keeps a schedule out of later scans
+until sign-off (or an edit) moves next_due, and the unique
+(pm_schedule_id, pm_due_at) index stops concurrent runs from creating the same
+occurrence twice. On PostgreSQL, due schedules are claimed with
+FOR UPDATE SKIP LOCKED, so workers split the work instead of racing.
+
+A run starts no new batch once PM_SCHEDULER_TIME_BUDGET_SECONDS have passed.
+Whatever is left stays due, and the next run picks it up. After each run the
+loop also rolls the workload forecast index forward (services.pm_occurrences).
+"""
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+from app.core.config import settings
+from app.db import dialects
+from app.services import collection_versions, pm_occurrences, work_order_events
+from app.services.work_order_bulk import IMPORT_NUMBER_SUFFIX_LENGTH, new_work_order_number
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RunResult:
+    created: int = 0
+    # Schedules whose occurrence already had a work order
+    existing: int = 0
+    batches: int = 0
+    # False when the time budget ran out with schedules possibly still due
+    complete: bool = True
+    elapsed_s: float = 0.0
+
+
+def _insert(db: AsyncSession):
+    return dialects.insert_for(db.bind.dialect.name)
+
+
+def _due(tenant_id: uuid.UUID, horizon_end: datetime, limit: int):
+    ps = models.PMSchedule
+    return (
+        select(ps.id, ps.title, ps.description, ps.asset_id, ps.assigned_to_user_id, ps.next_due)
+        .where(
+            ps.tenant_id == tenant_id,
+            ps.is_active == True,
+            ps.next_due <= horizon_end,
+            or_(ps.generated_through.is_(None), ps.generated_through < ps.next_due),
+        )
+        .order_by(ps.next_due, ps.id)
+        .limit(limit)
+        .with_for_update(of=ps, skip_locked=True)
+    )
+
+
+async def generate_batch(db: AsyncSession, tenant_id: uuid.UUID, horizon_end: datetime, limit: int) -> Optional[RunResult]:
+    """
+    Create work orders for up to `limit` due schedules of one tenant. Caller
+    commits. Returns None when nothing was due.
+    """
+    schedules = (await db.execute(_due(tenant_id, horizon_end, limit))).all()
+    if not schedules:
+        return None
+
+    now = datetime.utcnow()
+    rows = [{
+        "id": uuid.uuid4(),
+        "tenant_id": tenant_id,
+        "title": s.title,
+        "description": s.description,
+        "asset_id": s.asset_id,
+        "assigned_to_user_id": s.assigned_to_user_id,
+        "status": models.WorkOrderStatus.new.value,
+        "priority": "low",
+        "work_order_number": new_work_order_number(IMPORT_NUMBER_SUFFIX_LENGTH),
+        "pm_schedule_id": s.id,
+        "pm_due_at": s.next_due,
+        "created_at": now,
+        "updated_at": now,
+    } for s in schedules]
+
+    # executemany form: the statement compiles once (cached) and the driver
+    # still sends the rows as batched multi-row INSERTs
+    wo = models.WorkOrder.__table__
+    stmt = (
+        _insert(db)(wo)
+        .on_conflict_do_nothing(index_elements=["pm_schedule_id", "pm_due_at"])
+        .returning(wo.c.id)
+    )
+    inserted = set((await db.execute(stmt, rows)).scalars())
+    for row in rows:
+        if row["id"] in inserted:
+            # Transient, only used to derive the event's snapshots
+            work_order_events.record(db, work_order_events.CREATED, models.WorkOrder(**row))
+    if inserted:
+        # Core insert, invisible to the flush hook
+        collection_versions.bump(db, tenant_id, collection_versions.WORK_ORDERS)
+
+    # Bulk UPDATE by primary key, one executemany
+    await db.execute(
+        update(models.PMSchedule),
+        [{"id": s.id, "generated_through": s.next_due} for s in schedules],
+    )
+    return RunResult(created=len(inserted), existing=len(rows) - len(inserted), batches=1)
+
+
+async def run(session_factory=None, now: Optional[datetime] = None, stop: Optional[asyncio.Event] = None) -> RunResult:
+    """
+    One scheduler pass over all tenants, committing per batch. Setting `stop`
+    ends it before the next batch, like the time budget.
+    """
+    if session_factory is None:
+        from app.db.session import AsyncSessionLocal
+        session_factory = AsyncSessionLocal
+    started = time.monotonic()
+    horizon_end = (now or datetime.utcnow()) + timedelta(hours=settings.PM_SCHEDULER_HORIZON_HOURS)
+    result = RunResult()
+
+    async with session_factory() as db:
+        tenant_ids = list((await db.execute(select(models.Tenant.id).order_by(models.Tenant.id))).scalars())
+
+    for tenant_id in tenant_ids:
+        while True:
+            if time.monotonic() - started > settings.PM_SCHEDULER_TIME_BUDGET_SECONDS or (stop and stop.is_set()):
+                result.complete = False
+                result.elapsed_s = round(time.monotonic() - started, 3)
+                return result
+            async with session_factory() as db:
+                batch = await generate_batch(db, tenant_id, horizon_end, settings.PM_SCHEDULER_BATCH_SIZE)
+                if batch is None:
+                    break
+                await db.commit()
+            result.created += batch.created
+            result.existing += batch.existing
+            result.batches += 1
+            if batch.created + batch.existing < settings.PM_SCHEDULER_BATCH_SIZE:
+                break
+
+    result.elapsed_s = round(time.monotonic() - started, 3)
+    return result
+
+
+_task: Optional[asyncio.Task] = None
+_stop: Optional[asyncio.Event] = None
+
+# How long stop_scheduler() waits for the run in flight before cancelling it
+_STOP_TIMEOUT_SECONDS = 10.0
+
+
+async def _loop(stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        try:
+            result = await run(stop=stop)
+            if result.created or not result.complete:
+                logger.info("PM work orders generated", extra={
+                    "created": result.created, "batches": result.batches,
+                    "complete": result.complete, "elapsed_s": result.elapsed_s,
+                })
+        except Exception:
+            logger.exception("PM scheduler run failed")
+        try:
+            refreshed = await pm_occurrences.roll_forward(stop=stop)
+            if refreshed:
+                logger.info("PM occurrence index rolled forward", extra={"schedules": refreshed})
+        except Exception:
+            logger.exception("PM occurrence roll-forward failed")
+        try:
+            await asyncio.wait_for(stop.wait(), settings.PM_SCHEDULER_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_scheduler() -> None:
+    global _task, _stop
+    if _task is None:
+        _stop = asyncio.Event()
+        _task = asyncio.create_task(_loop(_stop))
+
+
+async def stop_scheduler() -> None:
+    """
+    Let the run in flight finish its batch, then exit; cancelled mid-query,
+    its connection would be invalidated.
+    """
+    global _task, _stop
+    if _task is not None:
+        _stop.set()
+        try:
+            await asyncio.wait_for(_task, _STOP_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning("PM scheduler cancelled mid-run at shutdown")
+        _task = None
+        _stop = None
@@ -0,0 +1,154 @@
+"""
+PM schedule recurrence.
+
+A schedule's frequency_type/frequency_interval becomes a Rule: a step of N
+days or N calendar months. Occurrence k of a series is anchor + k steps,
+always counted from the anchor (the schedule's recurrence_anchor). Month
+steps therefore keep the anchor's day of month and clamp it to short months
+(Jan 31 -> Feb 28/29 -> Mar 31), and a year is 12 months, not 365 days.
+
+occurrences() expands many schedules in one call. Each series jumps straight
+to its first occurrence in the window with integer arithmetic instead of
+stepping from the anchor, so a long-lived or overdue schedule costs the same
+as a new one.
+"""
+import calendar
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+DAYS = "days"
+MONTHS = "months"
+
+
+class Rule(NamedTuple):
+    unit: str  # DAYS or MONTHS
+    step: int
+
+
+# Named frequencies (what the web app offers) ignore frequency_interval
+_NAMED = {
+    "daily": Rule(DAYS, 1),
+    "weekly": Rule(DAYS, 7),
+    "fortnightly": Rule(DAYS, 14),
+    "monthly": Rule(MONTHS, 1),
+    "quarterly": Rule(MONTHS, 3),
+    "6 monthly": Rule(MONTHS, 6),
+    "yearly": Rule(MONTHS, 12),
+}
+# Unit frequencies are multiplied by frequency_interval
+_UNITS = {
+    "days": Rule(DAYS, 1),
+    "weeks": Rule(DAYS, 7),
+    "months": Rule(MONTHS, 1),
+    "years": Rule(MONTHS, 12),
+}
+
+_DAY_US = 86_400_000_000
+
+
+def rule(frequency_type: Optional[str], interval: Optional[int] = 1) -> Rule:
+    f = (frequency_type or "days").lower()
+    if f in _NAMED:
+        return _NAMED[f]
+    # Unknown types fall back to days, as they always have
+    unit, step = _UNITS.get(f, _UNITS["days"])
+    return Rule(unit, step * max(interval or 1, 1))
+
+
+def add_months(anchor: datetime, months: int) -> datetime:
+    year, month = divmod(anchor.year * 12 + anchor.month - 1 + months, 12)
+    month += 1
+    return anchor.replace(year=year, month=month, day=min(anchor.day, calendar.monthrange(year, month)[1]))
+
+
+def nth(r: Rule, anchor: datetime, k: int) -> datetime:
+    """
+    Occurrence k of the series (k=0 is the anchor).
+    """
+    if r.unit == MONTHS:
+        return add_months(anchor, k * r.step)
+    return anchor + timedelta(days=k * r.step)
+
+
+def first_index(r: Rule, anchor: datetime, start: datetime) -> int:
+    """
+    Index of the first occurrence at or after `start`.
+    """
+    if start <= anchor:
+        return 0
+    if r.unit == DAYS:
+        delta_us = (start - anchor) // timedelta(microseconds=1)
+        return -(-delta_us // (r.step * _DAY_US))
+    # Month lengths vary, so estimate from calendar months and correct;
+    # clamping moves an occurrence by days, never by a whole step
+    k = max(((start.year - anchor.year) * 12 + start.month - anchor.month) // r.step, 0)
+    while k > 0 and nth(r, anchor, k - 1) >= start:
+        k -= 1
+    while nth(r, anchor, k) < start:
+        k += 1
+    return k
+
+
+def next_after(r: Rule, anchor: datetime, current: datetime) -> datetime:
+    """
+    The first occurrence strictly after `current`.
+    """
+    k = first_index(r, anchor, current)
+    occurrence = nth(r, anchor, k)
+    return occurrence if occurrence > current else nth(r, anchor, k + 1)
+
+
+# (key, rule, anchor, first): `first` is the earliest occurrence still
+# outstanding (the schedule's next_due); nothing before it is produced
+Series = Tuple[Hashable, Rule, datetime, datetime]
+
+
+def occurrences(
+    series: Iterable[Series],
+    start: datetime,
+    end: Optional[datetime] = None,
+    count: Optional[int] = None,
+) -> Dict[Hashable, List[datetime]]:
+    """
+    Occurrences from `start` (and before `end`) for every series, at most
+    `count` each; at least one of `end` and `count` is required. Series with
+    none in the window are left out.
+    """
+    if end is None and count is None:
+        raise ValueError("occurrences() needs an end or a count")
+    out: Dict[Hashable, List[datetime]] = {}
+    for key, r, anchor, first in series:
+        k = first_index(r, anchor, max(start, first))
+        if r.unit == DAYS:
+            # Fixed step: the last index is closed-form too
+            stop = first_index(r, anchor, end) if end is not None else k + count
+            if count is not None:
+                stop = min(stop, k + count)
+            step = timedelta(days=r.step)
+            dates = [anchor + step * i for i in range(k, stop)]
+            if dates:
+                out[key] = dates
+            continue
+        dates = []
+        while count is None or len(dates) < count:
+            occurrence = nth(r, anchor, k)
+            if end is not None and occurrence >= end:
+                break
+            dates.append(occurrence)
+            k += 1
+        if dates:
+            out[key] = dates
+    return out
+
+
+def schedule_series(schedule) -> Series:
+    """
+    Series for a PMSchedule (or a row with the same columns).
+    """
+    anchor = schedule.recurrence_anchor or schedule.next_due
+    return (
+        schedule.id,
+        rule(schedule.frequency_type, schedule.frequency_interval),
+        anchor,
+        schedule.next_due,
+    )
@@ -0,0 +1,379 @@
+"""
+Full-text search over work orders, assets and inventory.
+
+All searchable entities are projected into one `search_documents` table
+(title + body per entity) that is kept current from an ORM after_flush hook,
+so every write path updates the index inside its own transaction. Writers that
+hand indexing to the outbox call defer() and the hook skips those entities.
+
+Backends:
+  - postgresql: generated, weighted tsvector column with a GIN index
+  - sqlite: external-content FTS5 table kept in sync by triggers
+  - anything else (or SQLite built without FTS5): LIKE scan of the base tables
+"""
+import logging
+import re
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+from sqlalchemy import event, inspect, or_, select, text
+from sqlalchemy.orm import Session
+from app import models
+
+MAX_TOKENS = 8
+REINDEX_BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+ENTITY_TYPES = ("work_order", "asset", "inventory_item")
+
+
+@dataclass
+class SearchDocument:
+    entity_type: str
+    entity_id: uuid.UUID
+    tenant_id: uuid.UUID
+    title: str
+    body: str
+
+
+def _join(*parts) -> str:
+    return " ".join(p for p in parts if p)
+
+
+# entity_type -> (model, indexed attributes, document builder)
+SEARCHABLE = {
+    "work_order": (
+        models.WorkOrder,
+        ("title", "work_order_number", "description", "completion_notes"),
+        lambda wo: (wo.title, _join(wo.work_order_number, wo.description, wo.completion_notes)),
+    ),
+    "asset": (
+        models.Asset,
+        ("name", "code", "serial_number"),
+        lambda a: (a.name, _join(a.code, a.serial_number)),
+    ),
+    "inventory_item": (
+        models.InventoryItem,
+        ("name", "sku"),
+        lambda i: (i.name, i.sku or ""),
+    ),
+}
+_TYPE_BY_MODEL = {model: entity_type for entity_type, (model, _, _) in SEARCHABLE.items()}
+
+_DEFERRED = "search.deferred"
+
+
+def defer(db, model) -> None:
+    """
+    Leave `model` out of this session's flush-time indexing; the caller
+    indexes it later (index_documents / remove_documents).
+    """
+    db.info.setdefault(_DEFERRED, set()).add(model)
+
+
+def build_document(obj) -> Optional[SearchDocument]:
+    entity_type = _TYPE_BY_MODEL.get(type(obj))
+    if not entity_type:
+        return None
+    _, _, builder = SEARCHABLE[entity_type]
+    title, body = builder(obj)
+    return SearchDocument(entity_type, obj.id, obj.tenant_id, title or "", body or "")
+
+
+def tokenize(q: str) -> List[str]:
+    return re.findall(r"\w+", (q or "").lower())[:MAX_TOKENS]
+
+
+class SearchBackend(ABC):
+    name = "base"
+
+    def ddl(self) -> List[str]:
+        return []
+
+    def upsert_sql(self):
+        return None
+
+    def delete_sql(self):
+        return None
+
+    def params(self, doc: SearchDocument) -> dict:
+        return {
+            "entity_type": doc.entity_type,
+            "entity_id": self.key(doc.entity_id),
+            "tenant_id": self.key(doc.tenant_id),
+            "title": doc.title,
+            "body": doc.body,
+        }
+
+    def key(self, value: uuid.UUID):
+        return value
+
+    @abstractmethod
+    async def search(self, db, tenant_id: uuid.UUID, tokens: List[str], types: Iterable[str], limit: int) -> list:
+        """
+        Ranked (entity_type, entity_id, title, score) hits.
+        """
+
+
+class IndexedSearchBackend(SearchBackend):
+    """
+    Shared write path for backends that maintain search_documents.
+    """
+
+    def upsert_sql(self):
+        return text(
+            "INSERT INTO search_documents (entity_type, entity_id, tenant_id, title, body) "
+            "VALUES (:entity_type, :entity_id, :tenant_id, :title, :body) "
+            "ON CONFLICT (entity_type, entity_id) DO UPDATE SET "
+            "tenant_id = excluded.tenant_id, title = excluded.title, body = excluded.body"
+        )
+
+    def delete_sql(self):
+        return text("DELETE FROM search_documents WHERE entity_type = :entity_type AND entity_id = :entity_id")
+
+
+class PostgresSearchBackend(IndexedSearchBackend):
+    name = "postgresql"
+
+    def ddl(self) -> List[str]:
+        return [
+            """
+            CREATE TABLE IF NOT EXISTS search_documents (
+                entity_type VARCHAR(32) NOT NULL,
+                entity_id UUID NOT NULL,
+                tenant_id UUID NOT NULL,
+                title TEXT,
+                body TEXT,
+                tsv tsvector GENERATED ALWAYS AS (
+                    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('simple', coalesce(body, '')), 'B')
+                ) STORED,
+                PRIMARY KEY (entity_type, entity_id)
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS ix_search_documents_tsv ON search_documents USING GIN (tsv)",
+            "CREATE INDEX IF NOT EXISTS ix_search_documents_tenant ON search_documents (tenant_id, entity_type)",
+        ]
+
+    async def search(self, db, tenant_id, tokens, types, limit):
+        # Prefix match every token so partial codes/names work as you type
+        tsquery = " & ".join(f"{t}:*" for t in tokens)
+        stmt = text(
+            "SELECT entity_type, entity_id, title, ts_rank_cd(tsv, q) AS score "
+            "FROM search_documents, to_tsquery('simple', :tsquery) AS q "
+            "WHERE tenant_id = :tenant_id AND entity_type = ANY(:types) AND tsv @@ q "
+            "ORDER BY score DESC LIMIT :limit"
+        )
+        result = await db.execute(stmt, {"tsquery": tsquery, "tenant_id": tenant_id, "types": list(types), "limit": limit})
+        return [(t, i, title, float(score)) for t, i, title, score in result.all()]
+
+
+class SQLiteSearchBackend(IndexedSearchBackend):
+    name = "sqlite"
+
+    def key(self, value: uuid.UUID):
+        return str(value)
+
+    def ddl(self) -> List[str]:
+        return [
+            """
+            CREATE TABLE IF NOT EXISTS search_documents (
+                doc_id INTEGER PRIMARY KEY,
+                entity_type TEXT NOT NULL,
+                entity_id TEXT NOT NULL,
+                tenant_id TEXT NOT NULL,
+                title TEXT,
+                body TEXT,
+                UNIQUE (entity_type, entity_id)
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS ix_search_documents_tenant ON search_documents (tenant_id, entity_type)",
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+                title, body, content='search_documents', content_rowid='doc_id'
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN
+                INSERT INTO search_fts (rowid, title, body) VALUES (new.doc_id, new.title, new.body);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN
+                INSERT INTO search_fts (search_fts, rowid, title, body) VALUES ('delete', old.doc_id, old.title, old.body);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN
+                INSERT INTO search_fts (search_fts, rowid, title, body) VALUES ('delete', old.doc_id, old.title, old.body);
+                INSERT INTO search_fts (rowid, title, body) VALUES (new.doc_id, new.title, new.body);
+            END
+            """,
+        ]
+
+    async def search(self, db, tenant_id, tokens, types, limit):
+        match = " ".join(f'"{t}"*' for t in tokens)
+        type_params = {f"type_{n}": t for n, t in enumerate(types)}
+        placeholders = ", ".join(f":{k}" for k in type_params)
+        # bm25() is lower-is-better; title matches weigh 10x body matches
+        stmt = text(
+            "SELECT d.entity_type, d.entity_id, d.title, bm25(search_fts, 10.0, 1.0) AS score "
+            "FROM search_fts JOIN search_documents d ON d.doc_id = search_fts.rowid "
+            f"WHERE search_fts MATCH :match AND d.tenant_id = :tenant_id AND d.entity_type IN ({placeholders}) "
+            "ORDER BY score LIMIT :limit"
+        )
+        result = await db.execute(stmt, {"match": match, "tenant_id": str(tenant_id), "limit": limit, **type_params})
+        return [(t, uuid.UUID(i), title, -float(score)) for t, i, title, score in result.all()]
+
+
+class LikeSearchBackend(SearchBackend):
+    """
+    Index-less fallback: scans the base tables. Writes are no-ops.
+    """
+    name = "like"
+
+    async def search(self, db, tenant_id, tokens, types, limit):
+        hits = []
+        for entity_type in types:
+            model, fields, builder = SEARCHABLE[entity_type]
+            query = select(model).where(model.tenant_id == tenant_id).limit(limit)
+            for token in tokens:
+                query = query.where(or_(*[getattr(model, f).ilike(f"%{token}%") for f in fields]))
+            for obj in (await db.execute(query)).scalars():
+                title, _ = builder(obj)
+                score = sum(1.0 for t in tokens if t in (title or "").lower())
+                hits.append((entity_type, obj.id, title, score))
+        hits.sort(key=lambda h: h[3], reverse=True)
+        return hits[:limit]
+
+
+_BACKENDS = {
+    "postgresql": PostgresSearchBackend(),
+    "sqlite": SQLiteSearchBackend(),
+}
+_fallback = LikeSearchBackend()
+_disabled_dialects = set()
+
+
+def get_backend(dialect_name: str) -> SearchBackend:
+    if dialect_name in _disabled_dialects:
+        return _fallback
+    return _BACKENDS.get(dialect_name, _fallback)
+
+
+async def ensure_schema(conn) -> str:
+    """
+    Create the index tables for this dialect if missing. Returns the backend in use.
+    """
+    backend = get_backend(conn.dialect.name)
+    try:
+        for statement in backend.ddl():
+            await conn.execute(text(statement))
+    except Exception as e:
+        # e.g. SQLite compiled without FTS5
+        logger.warning("Search index unavailable, falling back to LIKE scans", extra={"backend": backend.name, "error": str(e)})
+        _disabled_dialects.add(conn.dialect.name)
+        return _fallback.name
+    return backend.name
+
+
+def _index_changes(session: Session, flush_context) -> None:
+    backend = get_backend(session.get_bind().dialect.name)
+    upsert, remove = backend.upsert_sql(), backend.delete_sql()
+    if upsert is None:
+        return
+
+    deferred = session.info.get(_DEFERRED, ())
+    upserts, deletes = [], []
+    for obj in session.new:
+        doc = build_document(obj) if type(obj) not in deferred else None
+        if doc:
+            upserts.append(backend.params(doc))
+    for obj in session.dirty:
+        entity_type = _TYPE_BY_MODEL.get(type(obj))
+        if not entity_type or type(obj) in deferred:
+            continue
+        state = inspect(obj)
+        if any(state.attrs[f].history.has_changes() for f in SEARCHABLE[entity_type][1]):
+            upserts.append(backend.params(build_document(obj)))
+    for obj in session.deleted:
+        entity_type = _TYPE_BY_MODEL.get(type(obj))
+        if entity_type and type(obj) not in deferred:
+            deletes.append({"entity_type": entity_type, "entity_id": backend.key(obj.id)})
+
+    connection = session.connection()
+    if upserts:
+        connection.execute(upsert, upserts)
+    if deletes:
+        connection.execute(remove, deletes)
+
+
+event.listen(Session, "after_flush", _index_changes)
+
+
+async def search(db, tenant_id: uuid.UUID, q: str, types: Optional[Iterable[str]] = None, limit: int = 20) -> list:
+    """
+    Ranked hits as (entity_type, entity_id, title, score), best first.
+    """
+    tokens = tokenize(q)
+    types = [t for t in (types or ENTITY_TYPES) if t in SEARCHABLE]
+    if not tokens or not types:
+        return []
+    backend = get_backend(db.bind.dialect.name)
+    return await backend.search(db, tenant_id, tokens, types, limit)
+
+
+async def index_documents(db, docs: List[SearchDocument]) -> None:
+    """
+    Upsert documents directly, for bulk writes that bypass the ORM flush hook.
+    """
+    backend = get_backend(db.bind.dialect.name)
+    upsert = backend.upsert_sql()
+    if upsert is None or not docs:
+        return
+    await db.execute(upsert, [backend.params(doc) for doc in docs])
+
+
+async def remove_documents(db, entity_type: str, entity_ids: List[uuid.UUID]) -> None:
+    backend = get_backend(db.bind.dialect.name)
+    remove = backend.delete_sql()
+    if remove is None or not entity_ids:
+        return
+    await db.execute(remove, [{"entity_type": entity_type, "entity_id": backend.key(id)} for id in entity_ids])
+
+
+async def index_empty(db) -> bool:
+    backend = get_backend(db.bind.dialect.name)
+    if backend.upsert_sql() is None:
+        return False
+    result = await db.execute(text("SELECT 1 FROM search_documents LIMIT 1"))
+    return result.first() is None
+
+
+async def reindex_all(db, tenant_id: Optional[uuid.UUID] = None) -> int:
+    """
+    Rebuild the index from the base tables in batches. Caller commits.
+    """
+    backend = get_backend(db.bind.dialect.name)
+    if backend.upsert_sql() is None:
+        return 0
+
+    if tenant_id:
+        await db.execute(text("DELETE FROM search_documents WHERE tenant_id = :tenant_id"), {"tenant_id": backend.key(tenant_id)})
+    else:
+        await db.execute(text("DELETE FROM search_documents"))
+
+    count = 0
+    for entity_type, (model, _, _) in SEARCHABLE.items():
+        query = select(model).execution_options(yield_per=REINDEX_BATCH_SIZE)
+        if tenant_id:
+            query = query.where(model.tenant_id == tenant_id)
+        stream = await db.stream_scalars(query)
+        async for batch in stream.partitions():
+            await index_documents(db, [build_document(obj) for obj in batch])
+            count += len(batch)
+            for obj in batch:
+                db.expunge(obj)
+    return count
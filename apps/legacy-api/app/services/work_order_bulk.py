@@ -0,0 +1,216 @@
+"""
+Bulk work order import and export.
+
+Import validates each record against schemas.WorkOrderCreate and inserts in
+batches (one executemany per batch). Stats counters, asset statuses and the
+search index are updated once per import rather than once per row. Export
+streams rows from a server-side cursor, one batch at a time.
+"""
+import random
+import string
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+from app.services import asset_status, bulk_io, collection_versions, search, work_order_counters
+
+IMPORT_BATCH_SIZE = 500
+# Numbers are minute-prefixed; a 4-char suffix collides within a few thousand
+# rows per minute, so imports use a longer one
+IMPORT_NUMBER_SUFFIX_LENGTH = 8
+EXPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+# Export columns; the importer accepts the same file back (unknown columns are ignored)
+EXPORT_COLUMNS = (
+    "id", "work_order_number", "title", "description", "status", "priority",
+    "asset_id", "asset_code", "assigned_to_user_id", "completed_by_user_id",
+    "completion_notes", "signed_by_name", "created_at", "completed_at",
+)
+
+
+def new_work_order_number(suffix_length: int = 4) -> str:
+    # WO-{YYMMDD}-{HHMM}-{RAND}
+    now_str = datetime.utcnow().strftime("%y%m%d-%H%M")
+    rand_suffix = ''.join(random.choices(string.ascii_uppercase + string.digits, k=suffix_length))
+    return f"WO-{now_str}-{rand_suffix}"
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    skipped: int = 0
+    assets_updated: int = 0
+    errors: List[dict] = field(default_factory=list)
+
+
+class _WorkOrderImporter:
+    def __init__(self, db: AsyncSession, tenant_id: uuid.UUID, user_id: uuid.UUID, skip_invalid: bool):
+        self.db = db
+        self.tenant_id = tenant_id
+        self.user_id = user_id
+        self.skip_invalid = skip_invalid
+        self.result = ImportResult()
+        self.pending: List[Tuple[int, schemas.WorkOrderCreate, Optional[str]]] = []
+        self.asset_by_code: Dict[str, uuid.UUID] = {}
+        self.known_assets: set = set()
+        self.known_users: set = set()
+        self.counter_deltas: Counter = Counter()
+        self.asset_deltas: Dict[uuid.UUID, List[int]] = {}
+
+    def error(self, line: int, message: str) -> None:
+        self.result.skipped += 1
+        if len(self.result.errors) < MAX_REPORTED_ERRORS:
+            self.result.errors.append({"line": line, "error": message})
+
+    async def add(self, line: int, record: dict) -> None:
+        asset_code = record.pop("asset_code", None)
+        try:
+            work_order = schemas.WorkOrderCreate.model_validate(record)
+        except ValidationError as e:
+            problems = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            self.error(line, problems)
+            return
+        self.pending.append((line, work_order, asset_code))
+        if len(self.pending) >= IMPORT_BATCH_SIZE:
+            await self.flush()
+
+    async def _load_references(self) -> None:
+        # At most three lookups per batch, only for ids/codes not seen before
+        asset_ids = {wo.asset_id for _, wo, _ in self.pending if wo.asset_id} - self.known_assets
+        codes = {code for _, wo, code in self.pending if code and not wo.asset_id} - set(self.asset_by_code)
+        user_ids = {wo.completed_by_user_id for _, wo, _ in self.pending if wo.completed_by_user_id} - self.known_users
+        if asset_ids:
+            rows = await self.db.execute(select(models.Asset.id).where(
+                models.Asset.tenant_id == self.tenant_id, models.Asset.id.in_(asset_ids)
+            ))
+            self.known_assets.update(rows.scalars())
+        if codes:
+            rows = await self.db.execute(select(models.Asset.code, models.Asset.id).where(
+                models.Asset.tenant_id == self.tenant_id, models.Asset.code.in_(codes)
+            ))
+            for code, asset_id in rows.all():
+                self.asset_by_code[code] = asset_id
+                self.known_assets.add(asset_id)
+        if user_ids:
+            rows = await self.db.execute(select(models.User.id).where(
+                models.User.tenant_id == self.tenant_id, models.User.id.in_(user_ids)
+            ))
+            self.known_users.update(rows.scalars())
+
+    async def flush(self) -> None:
+        if not self.pending:
+            return
+        await self._load_references()
+
+        rows = []
+        for line, wo_in, asset_code in self.pending:
+            values = wo_in.model_dump()
+            if not values["asset_id"] and asset_code:
+                values["asset_id"] = self.asset_by_code.get(asset_code)
+                if values["asset_id"] is None:
+                    self.error(line, f"Unknown asset_code '{asset_code}'")
+                    continue
+            if values["asset_id"] and values["asset_id"] not in self.known_assets:
+                self.error(line, "Unknown asset_id")
+                continue
+            if values["completed_by_user_id"] and values["completed_by_user_id"] not in self.known_users:
+                self.error(line, "Unknown completed_by_user_id")
+                continue
+            rows.append({
+                **values,
+                "id": uuid.uuid4(),
+                "tenant_id": self.tenant_id,
+                "work_order_number": new_work_order_number(IMPORT_NUMBER_SUFFIX_LENGTH),
+                "reported_by_user_id": self.user_id,
+            })
+        self.pending = []
+
+        # All-or-nothing imports stop writing at the first bad row; the caller rolls back
+        if not rows or (self.result.errors and not self.skip_invalid):
+            return
+
+        await self.db.execute(insert(models.WorkOrder), rows)
+
+        docs = []
+        for row in rows:
+            wo = models.WorkOrder(**row)  # transient, only used to derive keys
+            self.counter_deltas[work_order_counters.counter_key(wo)] += 1
+            asset_status.accumulate(self.asset_deltas, asset_status.asset_key(wo))
+            docs.append(search.build_document(wo))
+        await search.index_documents(self.db, docs)
+        self.result.created += len(rows)
+
+    async def finish(self) -> ImportResult:
+        await self.flush()
+        if self.result.created:
+            await work_order_counters.apply_counter_deltas(self.db, self.tenant_id, dict(self.counter_deltas))
+            await asset_status.apply_asset_deltas(self.db, self.tenant_id, self.asset_deltas)
+            collection_versions.bump(self.db, self.tenant_id, collection_versions.WORK_ORDERS)
+            self.result.assets_updated = len(self.asset_deltas)
+        return self.result
+
+
+async def import_work_orders(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    user_id: uuid.UUID,
+    records: AsyncIterator[Tuple[int, dict]],
+    skip_invalid: bool = False,
+) -> ImportResult:
+    """
+    Insert work orders from (line_number, record) pairs. Caller commits, or
+    rolls back when errors were reported and skip_invalid is off.
+    Raises bulk_io.RecordError for malformed input.
+    """
+    importer = _WorkOrderImporter(db, tenant_id, user_id, skip_invalid)
+    async for line, record in records:
+        await importer.add(line, record)
+    return await importer.finish()
+
+
+def _export_query(tenant_id: uuid.UUID, status: Optional[str], priority: Optional[str]):
+    wo = models.WorkOrder
+    query = (
+        select(
+            wo.id, wo.work_order_number, wo.title, wo.description, wo.status, wo.priority,
+            wo.asset_id, models.Asset.code, wo.assigned_to_user_id, wo.completed_by_user_id,
+            wo.completion_notes, wo.signed_by_name, wo.created_at, wo.completed_at,
+        )
+        .outerjoin(models.Asset, models.Asset.id == wo.asset_id)
+        .where(wo.tenant_id == tenant_id)
+        .order_by(wo.created_at, wo.id)
+    )
+    if status:
+        query = query.where(wo.status == status.lower())
+    if priority:
+        query = query.where(wo.priority == priority.lower())
+    return query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+async def export_work_orders(
+    tenant_id: uuid.UUID,
+    fmt: str,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Encoded export, one chunk per batch. Uses its own session so the cursor
+    outlives the request handler.
+    """
+    from app.db.session import AsyncSessionLocal
+
+    if fmt == "csv":
+        yield bulk_io.csv_line(EXPORT_COLUMNS)
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(_export_query(tenant_id, status, priority))
+        async for batch in result.partitions():
+            if fmt == "csv":
+                yield b"".join(bulk_io.csv_line(row) for row in batch)
+            else:
+                yield b"".join(bulk_io.ndjson_line(dict(zip(EXPORT_COLUMNS, row))) for row in batch)
@@ -0,0 +1,194 @@
+"""
+Materialized work order counters backing /work-orders/stats.
+
+Work order writes record before/after snapshots in the outbox and the
+dispatcher folds them into apply_counter_deltas() (services.work_order_events);
+bulk imports apply their deltas directly. rebuild_counters() recomputes
+everything from the work_orders table for repairs.
+"""
+import uuid
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import delete, func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+from app.db import dialects
+from app.services import collection_versions
+
+INACTIVE_STATUSES = ("completed", "cancelled")
+
+# (status, priority, completed_day)
+CounterKey = Tuple[str, str, Optional[date]]
+
+
+def counter_key(wo: models.WorkOrder) -> CounterKey:
+    status = (wo.status or "").lower()
+    priority = (wo.priority or "").lower()
+    completed_day = None
+    if status == "completed" and wo.completed_at:
+        completed_day = wo.completed_at.date()
+    return status, priority, completed_day
+
+
+def _upsert(db: AsyncSession, model, index_elements: list, values: dict, column: str, delta: int):
+    insert = dialects.insert_for(db.bind.dialect.name)
+    col = getattr(model, column)
+    stmt = insert(model).values(**values, **{column: delta})
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: col + delta, "updated_at": datetime.utcnow()},
+    )
+
+
+async def _bump(db: AsyncSession, tenant_id: uuid.UUID, key: CounterKey, delta: int) -> None:
+    status, priority, completed_day = key
+    await db.execute(_upsert(
+        db,
+        models.WorkOrderCounter,
+        ["tenant_id", "status", "priority"],
+        {"tenant_id": tenant_id, "status": status, "priority": priority},
+        "count",
+        delta,
+    ))
+    if completed_day:
+        await db.execute(_upsert(
+            db,
+            models.WorkOrderDailyCounter,
+            ["tenant_id", "day"],
+            {"tenant_id": tenant_id, "day": completed_day},
+            "completed",
+            delta,
+        ))
+
+
+async def apply_counter_delta(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    before: Optional[CounterKey],
+    after: Optional[CounterKey],
+) -> None:
+    """
+    Move one work order from the `before` bucket to the `after` bucket.
+    Pass before=None for inserts and after=None for deletes.
+    """
+    if before == after:
+        return
+    if before is not None:
+        await _bump(db, tenant_id, before, -1)
+    if after is not None:
+        await _bump(db, tenant_id, after, 1)
+
+
+async def apply_counter_deltas(db: AsyncSession, tenant_id: uuid.UUID, deltas: Dict[CounterKey, int]) -> None:
+    """
+    Bulk variant: one upsert per distinct bucket, e.g. {key: +500} for an import.
+    """
+    for key, delta in deltas.items():
+        if delta:
+            await _bump(db, tenant_id, key, delta)
+
+
+async def read_stats(db: AsyncSession, tenant_id: uuid.UUID, today: date) -> dict:
+    """
+    Build the WorkOrderStats payload from the counter tables in one statement.
+    """
+    counters = select(
+        models.WorkOrderCounter.status.label("status"),
+        models.WorkOrderCounter.priority.label("priority"),
+        models.WorkOrderCounter.count.label("n"),
+    ).where(models.WorkOrderCounter.tenant_id == tenant_id)
+    completed_today = select(
+        literal(None).label("status"),
+        literal(None).label("priority"),
+        models.WorkOrderDailyCounter.completed.label("n"),
+    ).where(
+        models.WorkOrderDailyCounter.tenant_id == tenant_id,
+        models.WorkOrderDailyCounter.day == today,
+    )
+    result = await db.execute(union_all(counters, completed_today))
+
+    by_status: dict = {}
+    by_priority: dict = {}
+    total = 0
+    completed = 0
+    for status, priority, n in result.all():
+        if status is None:
+            completed += n
+            continue
+        total += n
+        if n <= 0 or status in INACTIVE_STATUSES:
+            continue
+        by_status[status] = by_status.get(status, 0) + n
+        by_priority[priority] = by_priority.get(priority, 0) + n
+
+    active_total = sum(by_status.values())
+    by_status["completed"] = completed
+    return {
+        "active_total": active_total,
+        "total": total,
+        "by_status": by_status,
+        "by_priority": by_priority,
+    }
+
+
+async def rebuild_counters(db: AsyncSession, tenant_id: Optional[uuid.UUID] = None) -> None:
+    """
+    Recompute counters from scratch, for one tenant or all of them.
+    Caller commits.
+    """
+    wo = models.WorkOrder
+    status = func.lower(func.coalesce(wo.status, ""))
+    priority = func.lower(func.coalesce(wo.priority, ""))
+    completed_day = func.date(wo.completed_at)
+
+    counter_del = delete(models.WorkOrderCounter)
+    daily_del = delete(models.WorkOrderDailyCounter)
+    counter_q = select(wo.tenant_id, status, priority, func.count(wo.id)).group_by(wo.tenant_id, status, priority)
+    daily_q = (
+        select(wo.tenant_id, completed_day, func.count(wo.id))
+        .where(status == "completed", wo.completed_at.isnot(None))
+        .group_by(wo.tenant_id, completed_day)
+    )
+    if tenant_id:
+        counter_del = counter_del.where(models.WorkOrderCounter.tenant_id == tenant_id)
+        daily_del = daily_del.where(models.WorkOrderDailyCounter.tenant_id == tenant_id)
+        counter_q = counter_q.where(wo.tenant_id == tenant_id)
+        daily_q = daily_q.where(wo.tenant_id == tenant_id)
+
+    await db.execute(counter_del)
+    await db.execute(daily_del)
+
+    counter_rows = (await db.execute(counter_q)).all()
+    if counter_rows:
+        db.add_all([
+            models.WorkOrderCounter(tenant_id=t, status=s, priority=p, count=n)
+            for t, s, p, n in counter_rows
+        ])
+    daily_rows = (await db.execute(daily_q)).all()
+    if daily_rows:
+        db.add_all([
+            models.WorkOrderDailyCounter(
+                tenant_id=t,
+                # SQLite returns DATE() as text
+                day=date.fromisoformat(d) if isinstance(d, str) else d,
+                completed=n,
+            )
+            for t, d, n in daily_rows
+        ])
+    await db.flush()
+    # Stats responses may change even though no work order did
+    if tenant_id:
+        collection_versions.bump(db, tenant_id, collection_versions.WORK_ORDERS)
+    else:
+        await collection_versions.bump_all(db, collection_versions.WORK_ORDERS)
+
+
+async def counters_missing(db: AsyncSession) -> bool:
+    """
+    True when work orders exist but the counter table was never populated.
+    """
+    has_counters = await db.execute(select(models.WorkOrderCounter.tenant_id).limit(1))
+    if has_counters.first():
+        return False
+    has_orders = await db.execute(select(models.WorkOrder.id).limit(1))
+    return has_orders.first() is not None
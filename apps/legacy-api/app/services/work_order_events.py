@@ -0,0 +1,148 @@
+"""
+Work order lifecycle events and the outbox consumers that act on them.
+
+Write endpoints call record() next to the change instead of updating counters,
+asset statuses and the search index inline. The event carries the before/after
+snapshots the consumers need, and the consumers fold a whole batch into one
+set of deltas. Deltas add up in any order, and search and notifications read
+the work order's current state, so the consumers do not depend on event order.
+"""
+import uuid
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+from app.core import events as event_stream
+from app.services import asset_status, collection_versions, outbox, search, work_order_counters, work_order_serializer
+
+CREATED = "work_order.created"
+UPDATED = "work_order.updated"
+DELETED = "work_order.deleted"
+SESSION_JOINED = "work_order.session_joined"
+SESSION_LEFT = "work_order.session_left"
+IMPORTED = "work_order.imported"
+
+_CHANGES = (CREATED, UPDATED, DELETED)
+
+# (counter key, asset key) of a work order at one point in time
+Snapshot = Tuple[work_order_counters.CounterKey, Optional[asset_status.AssetKey]]
+
+
+def snapshot(wo: models.WorkOrder) -> Snapshot:
+    return work_order_counters.counter_key(wo), asset_status.asset_key(wo)
+
+
+def _encode(snap: Optional[Snapshot]) -> Optional[dict]:
+    if snap is None:
+        return None
+    (status, priority, completed_day), asset = snap
+    return {
+        "counter": [status, priority, completed_day.isoformat() if completed_day else None],
+        "asset": [str(asset[0]), asset[1]] if asset else None,
+    }
+
+
+def _decode(data: Optional[dict]) -> Optional[Snapshot]:
+    if data is None:
+        return None
+    status, priority, completed_day = data["counter"]
+    asset = data["asset"]
+    return (
+        (status, priority, date.fromisoformat(completed_day) if completed_day else None),
+        (uuid.UUID(asset[0]), asset[1]) if asset else None,
+    )
+
+
+def record(db: AsyncSession, event_type: str, wo: models.WorkOrder, before: Optional[Snapshot] = None) -> None:
+    """
+    Queue `event_type` for `wo` in the current transaction. For created,
+    updated and deleted, `before` is snapshot(wo) taken before the change
+    (None for created).
+    """
+    payload = {}
+    if event_type in _CHANGES:
+        after = None if event_type == DELETED else snapshot(wo)
+        payload = {"before": _encode(before), "after": _encode(after)}
+        search.defer(db, models.WorkOrder)
+    outbox.add(db, wo.tenant_id, event_type, wo.id, payload)
+
+
+def record_import(db: AsyncSession, tenant_id: uuid.UUID, created: int) -> None:
+    """
+    One event for a bulk import, which maintains counters and the index itself.
+    """
+    outbox.add(db, tenant_id, IMPORTED, payload={"created": created})
+
+
+def _snapshots(event: models.OutboxEvent) -> Tuple[Optional[Snapshot], Optional[Snapshot]]:
+    return _decode(event.payload.get("before")), _decode(event.payload.get("after"))
+
+
+async def _apply_counters(db: AsyncSession, batch: List[models.OutboxEvent]) -> None:
+    by_tenant: Dict[uuid.UUID, Dict[work_order_counters.CounterKey, int]] = {}
+    for event in batch:
+        deltas = by_tenant.setdefault(event.tenant_id, {})
+        for snap, sign in zip(_snapshots(event), (-1, 1)):
+            if snap is not None:
+                deltas[snap[0]] = deltas.get(snap[0], 0) + sign
+    for tenant_id, deltas in by_tenant.items():
+        # Same bucket order in every worker so concurrent batches don't deadlock
+        deltas = {key: d for key, d in sorted(deltas.items(), key=lambda item: str(item[0])) if d}
+        if deltas:
+            await work_order_counters.apply_counter_deltas(db, tenant_id, deltas)
+            # /work-orders/stats is read through the work_orders ETag
+            collection_versions.bump(db, tenant_id, collection_versions.WORK_ORDERS)
+
+
+async def _apply_asset_status(db: AsyncSession, batch: List[models.OutboxEvent]) -> None:
+    by_tenant: Dict[uuid.UUID, Dict[uuid.UUID, List[int]]] = {}
+    for event in batch:
+        deltas = by_tenant.setdefault(event.tenant_id, {})
+        for snap, sign in zip(_snapshots(event), (-1, 1)):
+            if snap is not None:
+                asset_status.accumulate(deltas, snap[1], sign)
+    for tenant_id, deltas in by_tenant.items():
+        await asset_status.apply_asset_deltas(db, tenant_id, dict(sorted(deltas.items(), key=lambda item: str(item[0]))))
+
+
+async def _index_search(db: AsyncSession, batch: List[models.OutboxEvent]) -> None:
+    changed = {e.aggregate_id for e in batch if e.event_type != DELETED}
+    deleted = {e.aggregate_id for e in batch if e.event_type == DELETED}
+    if changed:
+        result = await db.execute(select(models.WorkOrder).where(models.WorkOrder.id.in_(changed)))
+        await search.index_documents(db, [search.build_document(wo) for wo in result.scalars()])
+    await search.remove_documents(db, "work_order", sorted(deleted, key=str))
+
+
+async def _notify(db: AsyncSession, batch: List[models.OutboxEvent]) -> None:
+    ids = {e.aggregate_id for e in batch if e.aggregate_id and e.event_type != DELETED}
+    by_id = {}
+    if ids:
+        result = await db.execute(
+            select(models.WorkOrder)
+            .where(models.WorkOrder.id.in_(ids))
+            .options(*work_order_serializer.load_options())
+        )
+        by_id = {wo.id: wo for wo in result.scalars().unique()}
+    for event in batch:
+        if event.event_type == DELETED:
+            data = work_order_serializer.dumps({"id": event.aggregate_id})
+        elif event.event_type == IMPORTED:
+            data = work_order_serializer.dumps(event.payload)
+        elif event.aggregate_id in by_id:
+            data = work_order_serializer.dump_work_order(by_id[event.aggregate_id])
+        else:
+            continue  # deleted since; its own event follows
+        await event_stream.publish(event.tenant_id, event.event_type, data)
+
+
+outbox.register("work_order_counters", _CHANGES, _apply_counters)
+outbox.register("asset_status", _CHANGES, _apply_asset_status)
+outbox.register("search_index", _CHANGES, _index_search)
+outbox.register(
+    "notifications",
+    (CREATED, UPDATED, DELETED, SESSION_JOINED, SESSION_LEFT, IMPORTED),
+    _notify,
+    after_commit=True,
+)
@@ -0,0 +1,137 @@
+"""
+Sparse fieldsets for the work order list (`fields=`).
+
+Selects only the requested columns, with outer joins for the many-to-one
+relationships, in one statement instead of loading whole WorkOrder entities
+plus their relationship loads. active_sessions is a collection, so asking for
+it costs one more statement per page.
+
+Field names are those of schemas.WorkOrder. Nested objects can be narrowed
+with a dot, e.g. fields=title,status,asset.name,assigned_to.full_name.
+Output keys keep the schema's order whatever order they were requested in.
+"""
+import uuid
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from app import models, schemas
+from app.schemas.work_order import WorkOrderAsset, WorkOrderSession
+
+# relationship -> (model, foreign key on WorkOrder, fields of its response schema)
+_NESTED = {
+    "asset": (models.Asset, "asset_id", tuple(WorkOrderAsset.model_fields)),
+    "assigned_to": (models.User, "assigned_to_user_id", tuple(schemas.User.model_fields)),
+    "completed_by": (models.User, "completed_by_user_id", tuple(schemas.User.model_fields)),
+}
+_SESSIONS = "active_sessions"
+_SESSION_FIELDS = tuple(WorkOrderSession.model_fields)
+_USER_FIELDS = tuple(schemas.User.model_fields)
+_ORDER = tuple(schemas.WorkOrder.model_fields)
+_SCALARS = tuple(name for name in _ORDER if name not in _NESTED and name != _SESSIONS)
+
+
+class Projection:
+    def __init__(self, fields: Dict[str, Optional[List[str]]]):
+        # top-level name -> requested subfields (None for scalars)
+        self.fields = {name: fields[name] for name in _ORDER if name in fields}
+
+    @property
+    def wants_sessions(self) -> bool:
+        return _SESSIONS in self.fields
+
+    def apply(self, query):
+        """
+        Narrow a select(WorkOrder) (filters already applied) to the requested
+        columns. id and created_at are always selected for the cursor.
+        """
+        wo = models.WorkOrder
+        columns = [wo.id, wo.created_at]
+        columns += [getattr(wo, name) for name in self.fields if name in _SCALARS and name not in ("id", "created_at")]
+        joins = []
+        for name, subfields in self.fields.items():
+            if name not in _NESTED:
+                continue
+            model, fk, _ = _NESTED[name]
+            alias = aliased(model, name=name)
+            # id tells a missing relationship apart from one with null columns
+            columns += [getattr(alias, f).label(f"{name}__{f}") for f in ("id", *[f for f in subfields if f != "id"])]
+            joins.append((alias, alias.id == getattr(wo, fk)))
+        query = query.with_only_columns(*columns)
+        for alias, onclause in joins:
+            query = query.outerjoin(alias, onclause)
+        return query
+
+    def row_dict(self, row, sessions: Optional[list] = None) -> dict:
+        """
+        Shape one result row; `sessions` is only used when active_sessions was requested.
+        """
+        mapping = row._mapping
+        item = {}
+        for name, subfields in self.fields.items():
+            if name in _NESTED:
+                item[name] = None if mapping[f"{name}__id"] is None else {
+                    f: mapping[f"{name}__{f}"] for f in subfields
+                }
+            elif name == _SESSIONS:
+                item[name] = sessions or []
+            else:
+                item[name] = mapping[name]
+        return item
+
+    async def to_dicts(self, db: AsyncSession, rows: Sequence) -> List[dict]:
+        sessions = await self._load_sessions(db, [row.id for row in rows]) if self.wants_sessions else {}
+        return [self.row_dict(row, sessions.get(row.id, [])) for row in rows]
+
+    async def _load_sessions(self, db: AsyncSession, work_order_ids: List[uuid.UUID]) -> Dict[uuid.UUID, list]:
+        if not work_order_ids:
+            return {}
+        ws = models.WorkOrderSession
+        subfields = self.fields[_SESSIONS]
+        columns = [ws.work_order_id] + [getattr(ws, f) for f in subfields if f != "user"]
+        if "user" in subfields:
+            columns += [getattr(models.User, f).label(f"user__{f}") for f in _USER_FIELDS]
+        query = select(*columns).where(ws.work_order_id.in_(work_order_ids)).order_by(ws.start_time)
+        if "user" in subfields:
+            query = query.outerjoin(models.User, models.User.id == ws.user_id)
+
+        by_work_order: Dict[uuid.UUID, list] = {}
+        for row in (await db.execute(query)).all():
+            mapping = row._mapping
+            session = {}
+            for f in subfields:
+                if f == "user":
+                    session[f] = None if mapping["user__id"] is None else {
+                        uf: mapping[f"user__{uf}"] for uf in _USER_FIELDS
+                    }
+                else:
+                    session[f] = mapping[f]
+            by_work_order.setdefault(row.work_order_id, []).append(session)
+        return by_work_order
+
+
+def parse_fields(spec: str) -> Projection:
+    """
+    Parse a comma-separated fieldset. Raises ValueError naming the first
+    unknown field.
+    """
+    fields: Dict[str, Optional[List[str]]] = {}
+    for raw in spec.split(","):
+        raw = raw.strip()
+        if not raw:
+            continue
+        name, _, sub = raw.partition(".")
+        if name in _NESTED or name == _SESSIONS:
+            allowed = _SESSION_FIELDS if name == _SESSIONS else _NESTED[name][2]
+            if sub and sub not in allowed:
+                raise ValueError(f"Unknown field '{raw}'")
+            current = fields.get(name) or []
+            wanted = [sub] if sub else list(allowed)
+            fields[name] = [f for f in allowed if f in current or f in wanted]
+        elif name in _SCALARS and not sub:
+            fields[name] = None
+        else:
+            raise ValueError(f"Unknown field '{raw}'")
+    if not fields:
+        raise ValueError("fields must name at least one field")
+    return Projection(fields)
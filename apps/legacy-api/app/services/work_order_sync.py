@@ -0,0 +1,186 @@
+"""
+Delta sync feed for offline-capable clients (/work-orders/changes).
+
+Work orders are ordered by (updated_at, id) and deletions by (deleted_at,
+work_order_id) from work_order_tombstones; the two are merged into one feed.
+The server hands out an opaque token after each page, and the next request
+returns only what changed after it.
+
+updated_at is stamped when a row is written, not when its transaction
+commits, so a slow transaction can commit a row "behind" a token that was
+already issued. To cover that, a caught-up token remembers when its scan
+started, and the next request rescans from SYNC_OVERLAP_SECONDS before that
+point. Rows changed in that window may therefore be sent twice; clients apply
+changes by id, so repeats are harmless. Changes to an embedded asset or user
+do not re-emit the work orders that reference them.
+
+Besides its feed position, a token records when the client's view was last
+complete (`issued`, the start of the last scan that caught up). Expiry is
+judged on that, not on the position: a tenant with no changes for months
+still gets fresh tokens, while a client that stopped syncing for longer than
+the tombstone retention must start over.
+"""
+import base64
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import Boolean, and_, delete, literal, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+from app.core.config import settings
+
+
+class SyncTokenExpired(Exception):
+    """
+    The token predates tombstone retention; the client must resync from scratch.
+    """
+
+
+@dataclass
+class SyncToken:
+    # Feed position: the last (timestamp, id) delivered
+    ts: Optional[datetime] = None
+    id: Optional[uuid.UUID] = None
+    # When set, the next request rescans everything changed after `floor`
+    floor: Optional[datetime] = None
+    # Start of the scan a continuation page belongs to
+    started: Optional[datetime] = None
+    # The client has every change up to this time (minus the overlap window)
+    issued: Optional[datetime] = None
+
+    def encode(self) -> str:
+        raw = json.dumps(
+            [
+                _iso(self.ts), str(self.id) if self.id else None,
+                _iso(self.floor), _iso(self.started), _iso(self.issued),
+            ],
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "SyncToken":
+        """
+        Raises ValueError for anything this server did not issue.
+        """
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            # Tokens issued before `issued` existed have four fields
+            ts, id, floor, started, *rest = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            issued = rest[0] if len(rest) == 1 else None
+            if len(rest) > 1:
+                raise ValueError
+            return cls(_dt(ts), uuid.UUID(id) if id else None, _dt(floor), _dt(started), _dt(issued))
+        except (ValueError, TypeError):
+            raise ValueError("Invalid sync token")
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _dt(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+@dataclass
+class ChangeSet:
+    changes: List[models.WorkOrder] = field(default_factory=list)
+    deleted: List[Tuple[uuid.UUID, datetime]] = field(default_factory=list)
+    next_token: str = ""
+    has_more: bool = False
+
+
+def _after(ts_col, id_col, token: SyncToken):
+    if token.floor:
+        return ts_col > token.floor
+    if token.ts:
+        return or_(ts_col > token.ts, and_(ts_col == token.ts, id_col > token.id))
+    return None
+
+
+def _feed(tenant_id: uuid.UUID, token: SyncToken):
+    wo, tomb = models.WorkOrder, models.WorkOrderTombstone
+    changed = select(
+        wo.id.label("id"), wo.updated_at.label("ts"), literal(False, Boolean).label("deleted")
+    ).where(wo.tenant_id == tenant_id)
+    deleted = select(
+        tomb.work_order_id.label("id"), tomb.deleted_at.label("ts"), literal(True, Boolean).label("deleted")
+    ).where(tomb.tenant_id == tenant_id)
+
+    changed_after = _after(wo.updated_at, wo.id, token)
+    if changed_after is not None:
+        changed = changed.where(changed_after)
+        deleted = deleted.where(_after(tomb.deleted_at, tomb.work_order_id, token))
+    return union_all(changed, deleted).subquery()
+
+
+async def changes_since(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    token: Optional[SyncToken],
+    limit: int,
+    options=(),
+) -> ChangeSet:
+    """
+    One page of the feed after `token` (None for a full initial sync).
+    `options` are loader options for the returned work orders.
+    """
+    now = datetime.utcnow()
+    token = token or SyncToken()
+    # Old-format tokens fall back to their scan start or position
+    complete_as_of = token.issued or token.floor or token.started or token.ts
+    retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    overlap = timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+    if complete_as_of and complete_as_of - overlap < now - retention:
+        raise SyncTokenExpired()
+
+    feed = _feed(tenant_id, token)
+    rows = (await db.execute(select(feed).order_by(feed.c.ts, feed.c.id).limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    result = ChangeSet(has_more=has_more)
+    changed_ids = [row.id for row in rows if not row.deleted]
+    if changed_ids:
+        loaded = await db.execute(
+            select(models.WorkOrder).where(models.WorkOrder.id.in_(changed_ids)).options(*options)
+        )
+        by_id = {wo.id: wo for wo in loaded.scalars().unique()}
+        result.changes = [by_id[id] for id in changed_ids if id in by_id]
+    result.deleted = [(row.id, row.ts) for row in rows if row.deleted]
+
+    # A rescan (floor) starts a new scan; continuation pages keep the original
+    # start and what the client had before it (a full sync had nothing)
+    new_scan = token.floor is not None or not token.started
+    started = now if new_scan else token.started
+    issued = (complete_as_of or now) if new_scan else (token.issued or token.started)
+    last_ts, last_id = (rows[-1].ts, rows[-1].id) if rows else (token.ts, token.id)
+    if has_more:
+        next_token = SyncToken(last_ts, last_id, started=started, issued=issued)
+    else:
+        floor = started - overlap
+        # Only rescan when rows were delivered inside the overlap window
+        next_token = SyncToken(last_ts, last_id, floor=floor if last_ts and last_ts > floor else None, issued=started)
+    result.next_token = next_token.encode()
+    return result
+
+
+def record_deletion(db: AsyncSession, wo: models.WorkOrder) -> None:
+    """
+    Leave a tombstone for a work order being deleted; written with the delete.
+    """
+    db.add(models.WorkOrderTombstone(work_order_id=wo.id, tenant_id=wo.tenant_id, deleted_at=datetime.utcnow()))
+
+
+async def purge_tombstones(db: AsyncSession, before: Optional[datetime] = None) -> int:
+    """
+    Drop tombstones older than the retention window. Caller commits.
+    """
+    before = before or datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    result = await db.execute(
+        delete(models.WorkOrderTombstone).where(models.WorkOrderTombstone.deleted_at < before)
+    )
+    return result.rowcount
@@ -0,0 +1,93 @@
+"""
+Requests/second of an authenticated list endpoint under different logging setups.
+
+Each mode runs in its own process (settings are read at import) against a
+throwaway SQLite database, with the app's stdout sent to a file so the
+write cost is real:
+    python scripts/bench_logging.py [requests] [concurrency]
+
+Modes:
+  sync-debug     synchronous handler at DEBUG, text format - closest to the old print() calls
+  queue-info     queued JSON logging at INFO (default settings)
+  queue-sampled  as queue-info, keeping 10% of access log lines
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = {
+    "sync-debug": {"LOG_QUEUE": "false", "LOG_LEVEL": "DEBUG", "LOG_FORMAT": "text"},
+    "queue-info": {"LOG_QUEUE": "true", "LOG_LEVEL": "INFO", "LOG_FORMAT": "json"},
+    "queue-sampled": {"LOG_QUEUE": "true", "LOG_LEVEL": "INFO", "LOG_FORMAT": "json", "LOG_ACCESS_SAMPLE_RATE": "0.1"},
+}
+
+
+async def worker_main(requests: int, concurrency: int) -> None:
+    sys.path.append(os.environ["BENCH_APP_DIR"])
+    import httpx
+    from app.main import app
+
+    tenant = {"X-Tenant-Slug": "default"}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            login = await client.post("/api/v1/auth/login", data={"username": "admin@example.com", "password": "admin123"}, headers=tenant)
+            headers = {**tenant, "Authorization": f"Bearer {login.json()['access_token']}"}
+
+            # Warm caches and connections
+            for _ in range(20):
+                await client.get("/api/v1/work-orders/", headers=headers)
+
+            remaining = requests
+
+            async def run():
+                nonlocal remaining
+                while remaining > 0:
+                    remaining -= 1
+                    response = await client.get("/api/v1/work-orders/", headers=headers)
+                    assert response.status_code == 200, response.text
+
+            start = time.perf_counter()
+            await asyncio.gather(*(run() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+
+    sys.stderr.write(f"RESULT {requests / elapsed:.1f}\n")
+
+
+def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    app_dir = os.getcwd()
+
+    print(f"{requests} requests, concurrency {concurrency}")
+    for mode, overrides in MODES.items():
+        work_dir = tempfile.mkdtemp()
+        env = {
+            **os.environ,
+            **overrides,
+            "BENCH_APP_DIR": app_dir,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite+aiosqlite:///{work_dir}/bench.db",
+        }
+        log_path = os.path.join(work_dir, "app.log")
+        with open(log_path, "w") as log_file:
+            proc = subprocess.run(
+                [sys.executable, "-W", "ignore", __file__, "--worker", str(requests), str(concurrency)],
+                cwd=work_dir, env=env, stdout=log_file, stderr=subprocess.PIPE, text=True,
+            )
+        result = [line for line in proc.stderr.splitlines() if line.startswith("RESULT")]
+        if proc.returncode != 0 or not result:
+            print(f"{mode:14} failed:\n{proc.stderr[-2000:]}")
+            continue
+        rps = float(result[-1].split()[1])
+        print(f"{mode:14} {rps:8.1f} req/s   log: {os.path.getsize(log_path) / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    if "--worker" in sys.argv:
+        idx = sys.argv.index("--worker")
+        asyncio.run(worker_main(int(sys.argv[idx + 1]), int(sys.argv[idx + 2])))
+    else:
+        main()
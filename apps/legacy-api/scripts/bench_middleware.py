@@ -0,0 +1,120 @@
+"""
+Per-request overhead of the middleware stack, before and after the move to
+pure ASGI middleware.
+
+Calls the ASGI app directly (no HTTP, no database) on a trivial route:
+    python scripts/bench_middleware.py [requests]
+
+Stacks:
+  none         bare FastAPI app
+  base-http    previous shape: @app.middleware("http") access log + a
+               BaseHTTPMiddleware query metrics layer
+  pure-asgi    current shape: TenantMiddleware + AccessLogMiddleware +
+               QueryMetricsMiddleware
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+
+# Adapt path to allow imports from app
+sys.path.append(os.getcwd())
+
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.core import query_metrics
+from app.core.cache import tenant_cache
+from app.middleware.access_log import AccessLogMiddleware
+from app.middleware.query_metrics import QueryMetricsMiddleware, route_template
+from app.middleware.tenant import TenantMiddleware
+
+# Keep log I/O out of the measurement; this compares middleware mechanics
+logging.getLogger("app").setLevel(logging.WARNING)
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+class LegacyQueryMetricsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start = time.perf_counter()
+        with query_metrics.track_queries() as stats:
+            response = await call_next(request)
+        route_key = f"{request.method} {route_template(request.scope)}"
+        query_metrics.route_metrics.record(route_key, stats, time.perf_counter() - start)
+        return response
+
+
+def base_http_stack() -> FastAPI:
+    app = make_app()
+    access_logger = logging.getLogger("app.access")
+
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        if access_logger.isEnabledFor(logging.INFO):
+            access_logger.info("request", extra={"status": response.status_code, "duration_ms": time.perf_counter() - start})
+        return response
+
+    app.add_middleware(LegacyQueryMetricsMiddleware)
+    return app
+
+
+def pure_asgi_stack() -> FastAPI:
+    app = make_app()
+    app.add_middleware(TenantMiddleware)
+    app.add_middleware(AccessLogMiddleware)
+    app.add_middleware(QueryMetricsMiddleware)
+    return app
+
+
+async def drive(app, requests: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/ping", "raw_path": b"/ping",
+        "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"x-tenant-slug", b"bench")],
+        "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    # Tenant resolution is a cache hit in steady state
+    tenant_cache.set("bench", type("Tenant", (), {"id": None})())
+
+    results = {}
+    for name, factory in (("none", make_app), ("base-http", base_http_stack), ("pure-asgi", pure_asgi_stack)):
+        elapsed = asyncio.run(drive(factory(), requests))
+        results[name] = elapsed / requests * 1e6
+
+    print(f"{requests} requests")
+    for name, us in results.items():
+        overhead = us - results["none"]
+        print(f"{name:10} {us:8.1f} us/request   middleware overhead {overhead:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
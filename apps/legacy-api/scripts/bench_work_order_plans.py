@@ -0,0 +1,120 @@
+"""
+Compare query plans and timings for the work order list filters before and
+after the composite indexes / normalized-case columns.
+
+Runs against a throwaway SQLite database so it can be used anywhere:
+    python scripts/bench_work_order_plans.py [rows_per_tenant] [tenants]
+"""
+import random
+import sys
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Adapt path to allow imports from app
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine, func, insert, select, text
+from app.db.base import Base
+from app import models
+
+STATUSES = ["new", "in_progress", "waiting_parts", "on_hold", "completed", "cancelled"]
+PRIORITIES = ["low", "medium", "high", "critical"]
+NEW_INDEXES = [ix.name for ix in models.WorkOrder.__table__.indexes if ix.name.startswith("ix_work_orders_tenant_")]
+
+
+def populate(conn, rows_per_tenant: int, tenants: int):
+    tenant_ids = [uuid.uuid4() for _ in range(tenants)]
+    asset_ids = [uuid.uuid4() for _ in range(50)]
+    now = datetime.utcnow()
+    for tenant_id in tenant_ids:
+        batch = [
+            {
+                "id": uuid.uuid4(),
+                "tenant_id": tenant_id,
+                "asset_id": random.choice(asset_ids),
+                "title": f"Job {i}",
+                "status": random.choice(STATUSES),
+                "priority": random.choice(PRIORITIES),
+                "created_at": now - timedelta(minutes=i),
+            }
+            for i in range(rows_per_tenant)
+        ]
+        conn.execute(insert(models.WorkOrder.__table__), batch)
+    return tenant_ids[0], asset_ids[0]
+
+
+def old_query(tenant_id):
+    wo = models.WorkOrder
+    return (
+        select(wo.id)
+        .where(wo.tenant_id == tenant_id)
+        .where(func.lower(wo.status) == "in_progress")
+        .where(func.lower(wo.priority) == "high")
+        .order_by(wo.created_at.desc())
+        .limit(100)
+    )
+
+
+def new_query(tenant_id):
+    wo = models.WorkOrder
+    return (
+        select(wo.id)
+        .where(wo.tenant_id == tenant_id)
+        .where(wo.status == "in_progress")
+        .where(wo.priority == "high")
+        .order_by(wo.created_at.desc())
+        .limit(100)
+    )
+
+
+def asset_sync_query(tenant_id, asset_id):
+    wo = models.WorkOrder
+    return select(wo.priority).where(
+        wo.tenant_id == tenant_id,
+        wo.asset_id == asset_id,
+        wo.status.notin_(["completed", "cancelled"]),
+    )
+
+
+def run(conn, label, stmt, repeat=50):
+    compiled = stmt.compile(conn, compile_kwargs={"literal_binds": True})
+    plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(stmt).all()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    print(f"\n[{label}] {elapsed:.3f} ms/query")
+    for row in plan:
+        print(f"    {row[-1]}")
+
+
+def main():
+    rows_per_tenant = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    tenants = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn, tables=[models.WorkOrder.__table__])
+        print(f"Populating {rows_per_tenant * tenants} work orders across {tenants} tenants...")
+        tenant_id, asset_id = populate(conn, rows_per_tenant, tenants)
+
+        for name in NEW_INDEXES:
+            conn.execute(text(f"DROP INDEX {name}"))
+        conn.execute(text("ANALYZE"))
+        print("\n=== BEFORE (tenant_id index only, lower() filters) ===")
+        run(conn, "list filter", old_query(tenant_id))
+        run(conn, "asset sync", asset_sync_query(tenant_id, asset_id))
+
+        for ix in models.WorkOrder.__table__.indexes:
+            if ix.name in NEW_INDEXES:
+                ix.create(conn)
+        conn.execute(text("ANALYZE"))
+        print("\n=== AFTER (composite indexes, normalized columns) ===")
+        run(conn, "list filter", new_query(tenant_id))
+        run(conn, "asset sync", asset_sync_query(tenant_id, asset_id))
+
+
+if __name__ == "__main__":
+    main()
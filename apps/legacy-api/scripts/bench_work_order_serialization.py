@@ -0,0 +1,124 @@
+"""
+Work order list serialization: pydantic response_model path vs the fast path
+in app.services.work_order_serializer.
+
+Builds in-memory ORM rows (no database) with an asset, assignee, completer and
+active sessions, checks that both paths produce the same JSON and times them:
+    python scripts/bench_work_order_serialization.py [repeat]
+
+Paths:
+  pydantic       what FastAPI does for response_model=List[schemas.WorkOrder]:
+                 validate from attributes, then dump_json
+  fast           work_order_serializer.dump_work_orders (orjson when installed)
+  fast-stdlib    the same with the standard library encoder
+"""
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+# Adapt path to allow imports from app
+sys.path.append(os.getcwd())
+
+from pydantic import TypeAdapter
+from app import models, schemas
+from app.models.user import UserRole
+from app.services import work_order_serializer
+
+SIZES = (100, 1_000, 10_000)
+STATUSES = ["new", "in_progress", "waiting_parts", "completed"]
+
+
+def build_rows(count: int) -> list:
+    tenant_id = uuid.uuid4()
+    users = [
+        models.User(id=uuid.uuid4(), tenant_id=tenant_id, email=f"tech{i}@example.com",
+                    full_name=f"Tech {i}", role=UserRole.TECHNICIAN, is_active=True)
+        for i in range(20)
+    ]
+    assets = [
+        models.Asset(id=uuid.uuid4(), tenant_id=tenant_id, name=f"Press {i}", code=f"P{i}",
+                     location="Line 1", status="Healthy")
+        for i in range(50)
+    ]
+    now = datetime.utcnow()
+    rows = []
+    for i in range(count):
+        asset, assignee = assets[i % len(assets)], users[i % len(users)]
+        completed = i % 4 == 3
+        wo = models.WorkOrder(
+            id=uuid.uuid4(), tenant_id=tenant_id, work_order_number=f"WO-{i:06d}",
+            title=f"Job {i}", description="Hydraulic leak near the main cylinder",
+            status=STATUSES[i % len(STATUSES)], priority="high",
+            asset_id=asset.id, asset=asset,
+            assigned_to_user_id=assignee.id, assigned_to=assignee,
+            completed_by_user_id=assignee.id if completed else None,
+            completed_by=assignee if completed else None,
+            created_at=now - timedelta(minutes=i),
+            completed_at=now if completed else None,
+        )
+        wo.active_sessions = [
+            models.WorkOrderSession(id=uuid.uuid4(), tenant_id=tenant_id, user_id=u.id, user=u,
+                                    start_time=now - timedelta(minutes=5))
+            for u in users[i % 3: i % 3 + (i % 3)]
+        ]
+        rows.append(wo)
+    return rows
+
+
+_adapter = TypeAdapter(List[schemas.WorkOrder])
+
+
+def pydantic_path(rows) -> bytes:
+    return _adapter.dump_json(_adapter.validate_python(rows, from_attributes=True))
+
+
+def fast_stdlib_path(rows) -> bytes:
+    saved, work_order_serializer.orjson = work_order_serializer.orjson, None
+    try:
+        return work_order_serializer.dump_work_orders(rows)
+    finally:
+        work_order_serializer.orjson = saved
+
+
+PATHS = (
+    ("pydantic", pydantic_path),
+    ("fast", work_order_serializer.dump_work_orders),
+    ("fast-stdlib", fast_stdlib_path),
+)
+
+
+def best_of(fn, rows, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"encoder: {'orjson' if work_order_serializer.orjson else 'json (orjson not installed)'}")
+
+    for size in SIZES:
+        rows = build_rows(size)
+        expected = pydantic_path(rows)
+        for name, fn in PATHS[1:]:
+            if json.loads(fn(rows)) != json.loads(expected):
+                print(f"MISMATCH: {name} output differs from the pydantic response model at {size} rows")
+                return 1
+
+        timings = {name: best_of(fn, rows, repeat) for name, fn in PATHS}
+        print(f"\n{size} rows ({len(expected) / 1024:.0f} KiB)")
+        for name, seconds in timings.items():
+            speedup = timings["pydantic"] / seconds
+            print(f"  {name:12} {seconds * 1000:9.2f} ms   {seconds / size * 1e6:7.2f} us/row   x{speedup:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
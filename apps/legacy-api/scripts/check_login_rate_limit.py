@@ -0,0 +1,69 @@
+"""
+Login throttling check against spoofed X-Forwarded-For.
+
+Boots the app against a throwaway SQLite database with a small per-IP login
+burst and sends failed logins from the same peer, each claiming a different
+client address:
+    python scripts/check_login_rate_limit.py
+
+The peer is not in FORWARDED_ALLOW_IPS, so the header must be ignored and
+the attempts must share one bucket (429 once the burst is used up). With
+FORWARDED_ALLOW_IPS unset the per-IP bucket must stay off.
+"""
+import os
+import sys
+import tempfile
+
+# Throwaway database; must be configured before the app is imported
+_db_dir = tempfile.mkdtemp()
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite+aiosqlite:///{_db_dir}/login.db"
+os.environ["PM_SCHEDULER_ENABLED"] = "false"
+os.environ["LOGIN_IP_BURST"] = "3"
+os.environ["FORWARDED_ALLOW_IPS"] = "127.0.0.1"
+
+# Adapt path to allow imports from app
+sys.path.append(os.getcwd())
+os.chdir(_db_dir)
+
+from fastapi.testclient import TestClient
+from app.core import rate_limit
+from app.core.config import settings
+from app.main import app
+
+TENANT = {"X-Tenant-Slug": "default"}
+
+
+def main() -> int:
+    failures = []
+
+    def check(label, ok):
+        print(f"{'OK  ' if ok else 'FAIL'} {label}")
+        if not ok:
+            failures.append(label)
+
+    def attempts(client):
+        statuses = []
+        for i in range(5):
+            # Distinct emails so only the per-IP bucket can trip
+            response = client.post(
+                "/api/v1/auth/login",
+                data={"username": f"nobody{i}@example.com", "password": "wrong"},
+                headers={**TENANT, "X-Forwarded-For": f"203.0.113.{i}"},
+            )
+            statuses.append(response.status_code)
+        return statuses
+
+    with TestClient(app) as client:
+        statuses = attempts(client)
+        check(f"spoofed X-Forwarded-For shares the peer's bucket: {statuses}", statuses[-1] == 429)
+
+        rate_limit.set_store(None)
+        settings.FORWARDED_ALLOW_IPS = None
+        statuses = attempts(client)
+        check(f"no trusted proxies, per-IP bucket off: {statuses}", 429 not in statuses)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Stateless auth revocation check.
+
+Boots the app with STATELESS_AUTH against a throwaway SQLite database:
+    python scripts/check_principal_revocations.py
+
+  - deactivating a user rejects the access token it was issued before;
+  - an unreachable revocation store falls back to the user row;
+  - startup refuses in-memory revocations with more than one worker.
+"""
+import os
+import sys
+import tempfile
+
+# Throwaway database; must be configured before the app is imported
+_db_dir = tempfile.mkdtemp()
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite+aiosqlite:///{_db_dir}/revocations.db"
+os.environ["PM_SCHEDULER_ENABLED"] = "false"
+os.environ["STATELESS_AUTH"] = "true"
+
+# Adapt path to allow imports from app
+sys.path.append(os.getcwd())
+os.chdir(_db_dir)
+
+from fastapi.testclient import TestClient
+from app.core import revocations
+from app.core.config import settings
+from app.main import app
+
+TENANT = {"X-Tenant-Slug": "default"}
+WORK_ORDERS = "/api/v1/work-orders/"
+
+
+class UnreachableStore(revocations.RevocationStore):
+    async def revoke(self, user_id, at):
+        raise ConnectionError("store down")
+
+    async def revoked_at(self, user_id):
+        raise ConnectionError("store down")
+
+
+def _login(client, email: str, password: str) -> dict:
+    login = client.post("/api/v1/auth/login", data={"username": email, "password": password}, headers=TENANT)
+    return {**TENANT, "Authorization": f"Bearer {login.json()['access_token']}"}
+
+
+def main() -> int:
+    failures = []
+
+    def check(label, ok):
+        print(f"{'OK  ' if ok else 'FAIL'} {label}")
+        if not ok:
+            failures.append(label)
+
+    with TestClient(app) as client:
+        admin = _login(client, "admin@example.com", "admin123")
+        users = []
+        for name in ("revoked", "fallback"):
+            email = f"{name}@example.com"
+            user = client.post("/api/v1/users/", json={"email": email, "password": "secret123"}, headers=admin).json()
+            users.append((user["id"], _login(client, email, "secret123")))
+        (revoked_id, revoked), (fallback_id, fallback) = users
+
+        check("token works before revocation", client.get(WORK_ORDERS, headers=revoked).status_code == 200)
+        client.put(f"/api/v1/users/{revoked_id}", json={"is_active": False}, headers=admin)
+        response = client.get(WORK_ORDERS, headers=revoked)
+        check(f"deactivated user's old token: {response.status_code}", response.status_code == 400)
+
+        revocations.set_store(UnreachableStore())
+        try:
+            response = client.get(WORK_ORDERS, headers=fallback)
+            check(f"store down, active user: {response.status_code}", response.status_code == 200)
+            response = client.get(WORK_ORDERS, headers=revoked)
+            check(f"store down, deactivated user: {response.status_code}", response.status_code == 400)
+        finally:
+            revocations.set_store(None)
+
+    backend, workers = settings.PRINCIPAL_REVOCATION_BACKEND, settings.WEB_CONCURRENCY
+    try:
+        settings.WEB_CONCURRENCY = 4
+        try:
+            revocations.check_settings()
+            check("memory backend with 4 workers refused", False)
+        except RuntimeError:
+            check("memory backend with 4 workers refused", True)
+        settings.PRINCIPAL_REVOCATION_BACKEND = "redis"
+        revocations.check_settings()
+        check("redis backend with 4 workers accepted", True)
+    finally:
+        settings.PRINCIPAL_REVOCATION_BACKEND, settings.WEB_CONCURRENCY = backend, workers
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
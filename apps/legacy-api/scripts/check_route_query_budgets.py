@@ -0,0 +1,90 @@
+"""
+Per-route query budget check.
+
+Boots the app against a throwaway SQLite database, drives the main API
+routes and fails when a route issues more SQL statements than its
+@query_budget declares:
+    python scripts/check_route_query_budgets.py [-v]
+
+-v prints the count for every request, including routes without a budget.
+"""
+import os
+import sys
+import tempfile
+
+# Throwaway database and dev headers; must be configured before the app is imported
+_db_dir = tempfile.mkdtemp()
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite+aiosqlite:///{_db_dir}/budget.db"
+os.environ["QUERY_METRICS_HEADERS"] = "true"
+
+# Adapt path to allow imports from app
+sys.path.append(os.getcwd())
+os.chdir(_db_dir)
+
+from fastapi.testclient import TestClient
+from app.core.cache import tenant_cache
+from app.main import app
+
+TENANT = {"X-Tenant-Slug": "default"}
+
+
+def main() -> int:
+    verbose = "-v" in sys.argv
+    failures = []
+
+    with TestClient(app) as client:
+        login = client.post("/api/v1/auth/login", data={"username": "admin@example.com", "password": "admin123"}, headers=TENANT)
+        headers = {**TENANT, "Authorization": f"Bearer {login.json()['access_token']}"}
+
+        def call(method, url, **kwargs):
+            response = client.request(method, url, headers=headers, **kwargs)
+            count = int(response.headers.get("X-Query-Count", 0))
+            budget = response.headers.get("X-Query-Budget")
+            over = budget is not None and count > int(budget)
+            if over:
+                failures.append(f"{method} {url}: {count} statements (budget {budget})")
+            if verbose or over:
+                print(f"{'FAIL' if over else 'OK  '} {method:6} {url}: {count} statements (budget {budget or '-'})")
+            return response
+
+        # Warm the tenant cache so every route is measured in steady state
+        call("GET", "/api/v1/tenants/me")
+
+        asset = call("POST", "/api/v1/assets/", json={"name": "Press", "code": "P1"}).json()
+        call("GET", "/api/v1/assets/")
+        call("GET", f"/api/v1/assets/{asset['id']}")
+
+        wo = call("POST", "/api/v1/work-orders/", json={"title": "Leak", "priority": "critical", "asset_id": asset["id"]}).json()
+        call("GET", "/api/v1/work-orders/")
+        call("GET", "/api/v1/work-orders/", params={"fields": "title,status,asset.name,assigned_to.full_name"})
+        call("GET", "/api/v1/work-orders/", params={"fields": "title,active_sessions"})
+        call("GET", "/api/v1/work-orders/stats")
+        call("GET", "/api/v1/work-orders/changes")
+        call("GET", f"/api/v1/work-orders/{wo['id']}")
+        call("PUT", f"/api/v1/work-orders/{wo['id']}", json={"status": "in_progress"})
+        call("POST", f"/api/v1/work-orders/{wo['id']}/join")
+        # Every relationship populated: the list's full selectin shape
+        call("PUT", f"/api/v1/work-orders/{wo['id']}", json={"status": "completed"})
+        call("GET", "/api/v1/work-orders/")
+        call("POST", f"/api/v1/work-orders/{wo['id']}/leave")
+        # Tenant cache miss: the rest of AUTH_QUERIES
+        tenant_cache.clear()
+        call("GET", "/api/v1/work-orders/stats")
+
+        call("GET", "/api/v1/inventory/")
+        call("GET", "/api/v1/pm-schedules/")
+        call("POST", "/api/v1/pm-schedules/", json={"title": "Lube press", "frequency_type": "weekly", "asset_id": asset["id"], "estimated_hours": 1.5})
+        call("GET", "/api/v1/pm-schedules/")
+        call("GET", "/api/v1/pm-schedules/forecast")
+        call("GET", "/api/v1/pm-schedules/workload")
+        call("GET", "/api/v1/search/", params={"q": "leak"})
+
+        call("DELETE", f"/api/v1/work-orders/{wo['id']}")
+
+    for failure in failures:
+        print(f"over budget: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
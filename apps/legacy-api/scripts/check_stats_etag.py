@@ -0,0 +1,76 @@
+"""
+Conditional GET check for /work-orders/stats across UTC midnight.
+
+Boots the app against a throwaway SQLite database, completes a work order,
+then moves the conditional-GET clock to the next UTC day with no writes in
+between:
+    python scripts/check_stats_etag.py
+
+The stale ETag and Last-Modified must no longer get 304, and the fresh body
+must report no completions for the new day.
+"""
+import os
+import sys
+import tempfile
+from datetime import timedelta
+
+# Throwaway database; must be configured before the app is imported
+_db_dir = tempfile.mkdtemp()
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite+aiosqlite:///{_db_dir}/stats.db"
+os.environ["PM_SCHEDULER_ENABLED"] = "false"
+
+# Adapt path to allow imports from app
+sys.path.append(os.getcwd())
+os.chdir(_db_dir)
+
+from fastapi.testclient import TestClient
+from app.api import conditional
+from app.main import app
+from app.services import outbox
+
+TENANT = {"X-Tenant-Slug": "default"}
+STATS = "/api/v1/work-orders/stats"
+
+
+def main() -> int:
+    failures = []
+
+    def check(label, ok):
+        print(f"{'OK  ' if ok else 'FAIL'} {label}")
+        if not ok:
+            failures.append(label)
+
+    with TestClient(app) as client:
+        login = client.post("/api/v1/auth/login", data={"username": "admin@example.com", "password": "admin123"}, headers=TENANT)
+        headers = {**TENANT, "Authorization": f"Bearer {login.json()['access_token']}"}
+
+        wo = client.post("/api/v1/work-orders/", json={"title": "Done today"}, headers=headers).json()
+        client.put(f"/api/v1/work-orders/{wo['id']}", json={"status": "completed"}, headers=headers)
+        client.portal.call(outbox.drain)
+
+        today = client.get(STATS, headers=headers)
+        etag, last_modified = today.headers["ETag"], today.headers["Last-Modified"]
+        check(f"completed today before midnight: {today.json()['by_status']['completed']}", today.json()["by_status"]["completed"] == 1)
+        check("same day revalidates to 304", client.get(STATS, headers={**headers, "If-None-Match": etag}).status_code == 304)
+
+        real_utc_day = conditional.utc_day
+        conditional.utc_day = lambda: real_utc_day() + timedelta(days=1)
+        try:
+            by_etag = client.get(STATS, headers={**headers, "If-None-Match": etag})
+            check(f"after midnight If-None-Match: {by_etag.status_code}", by_etag.status_code == 200)
+            check(
+                f"after midnight completed today: {by_etag.json()['by_status'].get('completed')}",
+                by_etag.status_code == 200 and by_etag.json()["by_status"]["completed"] == 0,
+            )
+            by_date = client.get(STATS, headers={**headers, "If-Modified-Since": last_modified})
+            check(f"after midnight If-Modified-Since: {by_date.status_code}", by_date.status_code == 200)
+            fresh = client.get(STATS, headers={**headers, "If-None-Match": by_etag.headers["ETag"]})
+            check("new day's ETag revalidates to 304", fresh.status_code == 304)
+        finally:
+            conditional.utc_day = real_utc_day
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
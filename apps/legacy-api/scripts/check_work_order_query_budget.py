@@ -0,0 +1,116 @@
+"""
+Round-trip budget check for the work order mutation handlers.
+
+Runs each handler against a throwaway SQLite database, counts the SQL
+statements it issues and exits non-zero if any exceeds its budget:
+    python scripts/check_work_order_query_budget.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+# Throwaway database; must be configured before the app modules are imported
+_db_dir = tempfile.mkdtemp()
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite+aiosqlite:///{_db_dir}/budget.db"
+
+# Adapt path to allow imports from app
+sys.path.append(os.getcwd())
+
+from app import models, schemas
+from app.api.api_v1.endpoints import work_orders
+from app.core import query_metrics
+from app.db.base import Base
+from app.db.session import AsyncSessionLocal, engine
+from app.services import search
+
+# Statements per handler call, including the writes themselves. Tighter than
+# the route-level @query_budget, which also covers auth dependencies. Each
+# write includes one collection_versions upsert at commit (ETags) and one
+# outbox insert (counters, asset status and search run from the outbox);
+# join/leave also touch the work order's updated_at for delta sync.
+BUDGETS = {
+    "create_work_order": 4,
+    "update_work_order": 5,
+    "join_work_order": 6,
+    "leave_work_order": 6,
+}
+
+
+async def measure(name, coro_factory, results):
+    async with AsyncSessionLocal() as db:
+        tenant, user = await coro_factory.setup(db)
+        with query_metrics.track_queries(keep_statements=True) as stats:
+            response = await coro_factory(db, tenant, user)
+            # Serializing must not trigger lazy loads
+            schemas.WorkOrder.model_validate(response)
+        results[name] = (stats.count, [s.split("\n")[0][:100] for s in stats.statements])
+
+
+async def main() -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await search.ensure_schema(conn)
+
+    async with AsyncSessionLocal() as db:
+        tenant = models.Tenant(name="Budget", slug="budget")
+        db.add(tenant)
+        await db.flush()
+        user = models.User(email="tech@budget.test", password_hash="x", tenant_id=tenant.id, role=models.UserRole.TECHNICIAN)
+        asset = models.Asset(name="Press", code="P1", tenant_id=tenant.id)
+        db.add_all([user, asset])
+        await db.commit()
+        ids = {"tenant": tenant.id, "user": user.id, "asset": asset.id}
+
+    async def load(db):
+        tenant = await db.get(models.Tenant, ids["tenant"])
+        user = await db.get(models.User, ids["user"])
+        return tenant, user
+
+    state = {}
+
+    async def create(db, tenant, user):
+        wo = await work_orders.create_work_order(
+            db=db,
+            work_order_in=schemas.WorkOrderCreate(title="Leak", priority="critical", asset_id=ids["asset"]),
+            current_user=user,
+            current_tenant=tenant,
+        )
+        state["wo"] = wo.id
+        return wo
+
+    async def update(db, tenant, user):
+        return await work_orders.update_work_order(
+            db=db,
+            work_order_id=state["wo"],
+            work_order_in=schemas.WorkOrderUpdate(status="in_progress", priority="high"),
+            current_user=user,
+            current_tenant=tenant,
+        )
+
+    async def join(db, tenant, user):
+        return await work_orders.join_work_order(db=db, work_order_id=state["wo"], current_user=user, current_tenant=tenant)
+
+    async def leave(db, tenant, user):
+        return await work_orders.leave_work_order(db=db, work_order_id=state["wo"], current_user=user, current_tenant=tenant)
+
+    results = {}
+    for name, fn in (("create_work_order", create), ("update_work_order", update), ("join_work_order", join), ("leave_work_order", leave)):
+        fn.setup = load
+        await measure(name, fn, results)
+
+    failed = False
+    for name, (count, statements) in results.items():
+        budget = BUDGETS[name]
+        ok = count <= budget
+        failed |= not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {name}: {count} statements (budget {budget})")
+        if not ok or "-v" in sys.argv:
+            for s in statements:
+                print(f"       {s}")
+    await engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
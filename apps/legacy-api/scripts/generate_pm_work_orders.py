@@ -0,0 +1,25 @@
+import asyncio
+import sys
+import os
+
+# Adapt path to allow imports from app
+sys.path.append(os.getcwd())
+
+from app.core.config import settings
+from app.services import outbox, pm_occurrences, pm_scheduler, work_order_events  # registers the outbox consumers
+
+async def generate():
+    result = await pm_scheduler.run()
+    print(
+        f"PM: Created {result.created} work orders in {result.batches} batches "
+        f"({result.existing} already existed), horizon {settings.PM_SCHEDULER_HORIZON_HOURS}h, {result.elapsed_s}s."
+    )
+    if not result.complete:
+        print("PM: Time budget reached; run again to continue.")
+    # Counters, asset status and search for the new work orders
+    print(f"PM: Dispatched {await outbox.drain()} outbox events.")
+    print(f"PM: Rolled the workload forecast index forward for {await pm_occurrences.roll_forward()} schedules.")
+
+if __name__ == "__main__":
+    # Usage: python scripts/generate_pm_work_orders.py  (when the in-app scheduler is disabled, e.g. from cron)
+    asyncio.run(generate())
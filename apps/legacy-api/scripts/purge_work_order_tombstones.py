@@ -0,0 +1,20 @@
+import asyncio
+import sys
+import os
+
+# Adapt path to allow imports from app
+sys.path.append(os.getcwd())
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.work_order_sync import purge_tombstones
+
+async def purge():
+    async with AsyncSessionLocal() as db:
+        removed = await purge_tombstones(db)
+        await db.commit()
+        print(f"PURGE: Removed {removed} work order tombstones older than {settings.SYNC_TOMBSTONE_RETENTION_DAYS} days.")
+
+if __name__ == "__main__":
+    # Usage: python scripts/purge_work_order_tombstones.py  (e.g. daily from cron)
+    asyncio.run(purge())
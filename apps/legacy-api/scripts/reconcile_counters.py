@@ -0,0 +1,38 @@
+import asyncio
+import sys
+import os
+
+# Adapt path to allow imports from app
+sys.path.append(os.getcwd())
+
+from app.db.session import AsyncSessionLocal
+from app.models import Tenant
+from app.services.work_order_counters import rebuild_counters
+from app.services.asset_status import rebuild_asset_counters
+from app.services import outbox, work_order_events  # registers the consumers
+from sqlalchemy import select
+
+async def reconcile(slug: str = None):
+    # Queued deltas would be applied twice on top of a rebuild; run them first.
+    # Events committed while the rebuild runs can still skew it, so prefer a quiet moment.
+    print(f"RECONCILE: Dispatched {await outbox.drain()} pending outbox events.")
+    async with AsyncSessionLocal() as db:
+        tenant_id = None
+        if slug:
+            res = await db.execute(select(Tenant).where(Tenant.slug == slug))
+            tenant = res.scalars().first()
+            if not tenant:
+                print(f"RECONCILE: Tenant '{slug}' not found.")
+                return
+            tenant_id = tenant.id
+
+        print(f"RECONCILE: Rebuilding work order counters ({slug or 'all tenants'})...")
+        await rebuild_counters(db, tenant_id)
+        print("RECONCILE: Rebuilding asset counters and statuses...")
+        await rebuild_asset_counters(db, tenant_id)
+        await db.commit()
+        print("RECONCILE: Done.")
+
+if __name__ == "__main__":
+    # Usage: python scripts/reconcile_counters.py [tenant_slug]
+    asyncio.run(reconcile(sys.argv[1] if len(sys.argv) > 1 else None))
@@ -0,0 +1,34 @@
+import asyncio
+import sys
+import os
+
+# Adapt path to allow imports from app
+sys.path.append(os.getcwd())
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models import Tenant
+from app.services import search
+from sqlalchemy import select
+
+async def reindex(slug: str = None):
+    async with engine.begin() as conn:
+        backend = await search.ensure_schema(conn)
+    print(f"REINDEX: Using '{backend}' search backend")
+
+    async with AsyncSessionLocal() as db:
+        tenant_id = None
+        if slug:
+            res = await db.execute(select(Tenant).where(Tenant.slug == slug))
+            tenant = res.scalars().first()
+            if not tenant:
+                print(f"REINDEX: Tenant '{slug}' not found.")
+                return
+            tenant_id = tenant.id
+
+        count = await search.reindex_all(db, tenant_id)
+        await db.commit()
+        print(f"REINDEX: Indexed {count} records ({slug or 'all tenants'}).")
+
+if __name__ == "__main__":
+    # Usage: python scripts/reindex_search.py [tenant_slug]
+    asyncio.run(reindex(sys.argv[1] if len(sys.argv) > 1 else None))